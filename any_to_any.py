@@ -145,6 +145,19 @@ if __name__ == "__main__":
         required=False,
     )
 
+    parser.add_argument(
+        "--single-file",
+        help="Package DASH/CMAF renditions as one byte-range addressed file each",
+        action="store_true",
+        required=False,
+    )
+    parser.add_argument(
+        "--sub-lang",
+        help="Only extract subtitle streams in this language (e.g. eng) when converting to srt",
+        type=str,
+        required=False,
+    )
+
     args = vars(parser.parse_args())
 
     if args["language"] in lang.LANGUAGE_CODES.keys():
@@ -188,4 +201,6 @@ if __name__ == "__main__":
             preserve_meta=args["preserve_meta"],
             add_tag=args["add_tag"],
             strip_meta=args["strip_meta"],
+            single_file=args["single_file"],
+            sub_lang=args["sub_lang"],
         )
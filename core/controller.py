@@ -1,13 +1,14 @@
 import os
 import re
 import fitz
-import time
 import logging
-import threading
+import tempfile
 import utils.language_support as lang
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils.category import Category
 from utils.prog_logger import ProgLogger
+from core.utils import ffmpeg_utils, workload
 from core.utils.exit import end_with_msg
 from core.converter.audio_converter import AudioConverter
 from core.converter.movie_converter import MovieConverter
@@ -17,11 +18,7 @@ from core.converter.doc_converter import DocumentConverter
 from core.utils.directory_watcher import DirectoryWatcher
 from core.utils.metadata_handler import MetadataHandler
 from moviepy import (
-    AudioFileClip,
-    VideoFileClip,
     ImageClip,
-    concatenate_videoclips,
-    concatenate_audioclips,
     clips_array,
 )
 
@@ -44,6 +41,7 @@ class Controller:
         )
         self.event_logger = logging.getLogger(__name__)
         self.file_handler = FileHandler(self.event_logger, self.locale)
+        self.file_handler.on_processed = self.prog_logger.file_done
         self.metadata_handler = MetadataHandler(self.event_logger, self.locale)
 
         self.audio_converter = AudioConverter(
@@ -190,6 +188,7 @@ class Controller:
             Category.PROTOCOLS: {
                 "hls": ["hls", "mkv"],
                 "dash": ["dash", "mkv"],
+                "cmaf": ["cmaf", "mkv"],
             },
         }
 
@@ -224,6 +223,9 @@ class Controller:
         self.custom_tags = {}
         self.strip_meta = False
 
+        # Byte-range single file per rendition for DASH/CMAF packaging
+        self.single_file = False
+
     def _audio_bitrate(self, format: str, quality: str) -> str:
         # Return bitrate for audio conversion
         # If formats allow for a higher bitrate, we shift our scale accordingly
@@ -270,6 +272,8 @@ class Controller:
         preserve_meta: bool = False,
         add_tag: list = None,
         strip_meta: bool = False,
+        single_file: bool = False,
+        sub_lang: str = None,
     ) -> None:
         # Convert media files to defined formats or
         # merge or concatenate, according to the arguments
@@ -324,6 +328,8 @@ class Controller:
         self.page_ranges = split
         self.framerate = framerate
         self.delete = delete
+        self.single_file = single_file
+        self.doc_converter.subtitle_language = sub_lang
         self.quality = (
             (
                 quality.lower()
@@ -457,9 +463,10 @@ class Controller:
                 if self.preserve_meta or self.custom_tags:
                     self.metadata_handler.set_metadata_dir(str(self.output))
                 # Process each format sequentially
+                weights = self._batch_weights(file_paths)
                 for fmt in formats:
                     self.target_format = fmt.lower() if fmt else None
-                    self.process_file_paths(file_paths)
+                    self._process_batch(file_paths, weights)
                 found_files = len(file_paths) > 0 if not found_files else found_files
                 file_paths = {}
 
@@ -472,9 +479,10 @@ class Controller:
                 self.metadata_handler.set_metadata_dir(str(self.output))
 
             # Process each format sequentially
+            weights = self._batch_weights(file_paths)
             for fmt in formats:
                 self.target_format = fmt.lower() if fmt else None
-                self.process_file_paths(file_paths)
+                self._process_batch(file_paths, weights)
 
         if (across and len(file_paths) == 0) or not found_files:
             self.event_logger.warning(
@@ -488,6 +496,29 @@ class Controller:
             f"[+] {lang.get_translation('job_finished', self.locale)}"
         )
 
+    def _batch_weights(self, file_paths: dict) -> dict:
+        # Expected work per file, only probed when several files share a progress display:
+        # the job's progress entry or the total bar. A lone file, or a batch nobody watches
+        # the progress of, weighs every file the same without opening it.
+        path_sets = [tuple(p) for path_sets in file_paths.values() for p in path_sets]
+        logger = self.prog_logger
+        has_job = (
+            getattr(logger, "job_id", None) is not None
+            and getattr(logger, "shared_progress_dict", None) is not None
+        )
+        has_bar = not getattr(logger, "is_web", False)
+        if len(path_sets) > 1 and (has_job or has_bar):
+            return workload.estimate_all(file_paths)
+        return {path_set: 1.0 for path_set in path_sets}
+
+    def _process_batch(self, file_paths: dict, weights: dict) -> None:
+        # Progress and ETA across the batch go by the expected work of each file
+        self.prog_logger.start_batch(weights)
+        try:
+            self.process_file_paths(file_paths)
+        finally:
+            self.prog_logger.end_batch()
+
     def process_file_paths(self, file_paths: dict) -> None:
         # Check if value associated to format is tuple/string or function to call specific conversion
         if self.merging:
@@ -552,6 +583,7 @@ class Controller:
                     self.target_format
                 ],
                 delete=self.delete,
+                single_file=self.single_file,
             )
         elif self.page_ranges is not None:
             self.split(file_paths, self.page_ranges)
@@ -679,20 +711,7 @@ class Controller:
 
     def split(self, file_paths: dict, page_ranges) -> None:
         for doc_path_set in file_paths[Category.DOCUMENT]:
-            if (
-                hasattr(self.prog_logger, "shared_progress_dict")
-                and self.prog_logger.shared_progress_dict
-            ):
-                with threading.Lock():
-                    if self.prog_logger.job_id in self.prog_logger.shared_progress_dict:
-                        self.prog_logger.shared_progress_dict[
-                            self.prog_logger.job_id
-                        ].update(
-                            {
-                                "status": f"splitting {doc_path_set[1]}",
-                                "last_updated": time.time(),
-                            }
-                        )
+            self.prog_logger.update_job(status=f"splitting {doc_path_set[1]}")
             if doc_path_set[2] == "pdf":
                 self.doc_converter.split_pdf(
                     output=self.output,
@@ -702,54 +721,211 @@ class Controller:
                     page_ranges=page_ranges,
                 )
 
+    def _concat_signature(self, info: dict, category: str) -> tuple:
+        # Everything that has to be identical across inputs for a lossless stream copy
+        audio = ffmpeg_utils.first_stream(info, "audio")
+        audio_sig = (
+            (audio["codec"], audio["sample_rate"], audio["channels"]) if audio else None
+        )
+        if category == Category.AUDIO:
+            return (audio_sig,)
+        video = ffmpeg_utils.first_stream(info, "video")
+        return (
+            video["codec"],
+            video["width"],
+            video["height"],
+            video["pix_fmt"],
+            video["fps"],
+            audio_sig,
+        )
+
+    def _can_stream_copy(self, signatures: list, format: str, category: str) -> bool:
+        # Stream copy if all inputs match each other and the target container takes them as-is
+        if len(set(signatures)) != 1:
+            return False
+        signature = signatures[0]
+        audio_sig = signature[-1]
+        encoder = self._supported_formats[category][format]
+        if category == Category.AUDIO:
+            # A requested quality means a new bitrate, which needs an encode
+            return (
+                audio_sig is not None
+                and self.quality is None
+                and audio_sig[0] == ffmpeg_utils.codec_for_encoder(encoder)
+            )
+        if self.framerate is not None and signature[4] != float(self.framerate):
+            return False
+        if signature[0] != ffmpeg_utils.codec_for_encoder(encoder):
+            return False
+        return (
+            audio_sig is None
+            or ffmpeg_utils.audio_codec_for_container(format, audio_sig[0]) == "copy"
+        )
+
+    def _normalise_args(
+        self, path: str, info: dict, target: dict, out_path: str, category: str
+    ) -> list:
+        # ffmpeg args re-encoding one input to the shared target parameters
+        audio = ffmpeg_utils.first_stream(info, "audio")
+        args = ["-i", path]
+        if category == Category.MOVIE and target["audio"] and audio is None:
+            # Silent filler keeps audio and video in step for inputs without sound
+            args += [
+                "-f",
+                "lavfi",
+                "-t",
+                f"{info['duration'] or 0:.3f}",
+                "-i",
+                f"anullsrc=r={target['sample_rate']}:cl=stereo",
+            ]
+        if category == Category.MOVIE:
+            chain = [
+                f"scale={target['width']}:{target['height']}"
+                ":force_original_aspect_ratio=decrease",
+                f"pad={target['width']}:{target['height']}:(ow-iw)/2:(oh-ih)/2",
+                "setsar=1",
+                f"fps={target['fps']}",
+            ]
+            if target["video_encoder"] in ffmpeg_utils.YUV420_ENCODERS:
+                chain.append("format=yuv420p")
+            args += ["-map", "0:v:0", "-vf", ",".join(chain)]
+            args += ["-c:v", target["video_encoder"]]
+            if target["audio"]:
+                args += ["-map", "0:a:0" if audio is not None else "1:a:0"]
+        else:
+            args += ["-map", "0:a:0", "-vn"]
+        if target["audio"]:
+            args += [
+                "-af",
+                f"aresample={target['sample_rate']}:async=1",
+                "-ac",
+                "2",
+                "-c:a",
+                target["audio_encoder"],
+            ]
+            if target["audio_bitrate"] is not None:
+                args += ["-b:a", target["audio_bitrate"]]
+        return args + ["-sn", "-dn", out_path]
+
+    def _concat_streams(
+        self, paths: list, out_name: str, format: str, category: str
+    ) -> None:
+        # Concat audio or movie files through ffmpeg's concat demuxer.
+        # Inputs sharing codec parameters are stream-copied in a single pass. Otherwise each
+        # input is re-encoded once, one after the other, to common parameters and the
+        # normalised parts are stream-copied together. Only one decoder is alive at a time,
+        # so memory and open files stay constant regardless of the number of inputs.
+        # ffmpeg_utils.probe raises OSError for unreadable inputs
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+            infos = list(ex.map(ffmpeg_utils.probe, paths))
+        for path, info in zip(paths, infos):
+            kind = "video" if category == Category.MOVIE else "audio"
+            if ffmpeg_utils.first_stream(info, kind) is None:
+                raise OSError(f"No {kind} stream found in '{path}'")
+
+        out_path = os.path.join(self.output, out_name)
+        total = sum(info["duration"] or 0 for info in infos)
+        audio_maps = (
+            ["-map", "0:v:0", "-map", "0:a:0?"]
+            if category == Category.MOVIE
+            else ["-map", "0:a:0"]
+        )
+        with tempfile.TemporaryDirectory(prefix="any2any_concat_") as tmp_dir:
+            list_path = os.path.join(tmp_dir, "inputs.txt")
+            signatures = [self._concat_signature(info, category) for info in infos]
+            if self._can_stream_copy(signatures, format, category):
+                ffmpeg_utils.write_concat_list(
+                    [os.path.abspath(p) for p in paths], list_path
+                )
+                ffmpeg_utils.run(
+                    ["-f", "concat", "-safe", "0", "-i", list_path]
+                    + audio_maps
+                    + ["-c", "copy", out_path],
+                    logger=self.prog_logger,
+                    duration=total,
+                )
+                return
+
+            # Targets are taken from the first input, so the common case of one odd clip
+            # among many similar ones is brought in line with the rest
+            first_video = ffmpeg_utils.first_stream(infos[0], "video") or {}
+            first_audio = next(
+                (
+                    a
+                    for a in (ffmpeg_utils.first_stream(i, "audio") for i in infos)
+                    if a is not None
+                ),
+                None,
+            )
+            target = {
+                "width": (first_video.get("width") or 2) // 2 * 2,
+                "height": (first_video.get("height") or 2) // 2 * 2,
+                "fps": self.framerate or first_video.get("fps") or 30,
+                "video_encoder": self._supported_formats[Category.MOVIE].get(format),
+                "audio": first_audio is not None,
+            }
+            if category == Category.AUDIO:
+                target["sample_rate"] = first_audio.get("sample_rate") or 44100
+                target["audio_encoder"] = self._supported_formats[Category.AUDIO][
+                    format
+                ]
+                target["audio_bitrate"] = (
+                    self._audio_bitrate(format, self.quality)
+                    if self.quality is not None
+                    else "192k"
+                )
+            else:
+                target["sample_rate"] = 48000
+                target["audio_encoder"] = ffmpeg_utils.audio_codec_for_container(
+                    format, None
+                )
+                target["audio_bitrate"] = None
+
+            # NUT carries any codec ffmpeg can encode, so parts never depend on the target muxer
+            parts, done = [], 0.0
+            for i, (path, info) in enumerate(zip(paths, infos)):
+                part_path = os.path.join(tmp_dir, f"{i:06d}.nut")
+                ffmpeg_utils.run(
+                    self._normalise_args(path, info, target, part_path, category),
+                    logger=self.prog_logger,
+                    duration=info["duration"] or 0,
+                    offset=done,
+                    total=total,
+                )
+                done += info["duration"] or 0
+                parts.append(part_path)
+            ffmpeg_utils.write_concat_list(parts, list_path)
+            ffmpeg_utils.run(
+                ["-f", "concat", "-safe", "0", "-i", list_path]
+                + audio_maps
+                + ["-c", "copy", out_path]
+            )
+
     def concat(self, file_paths: dict, format: str) -> None:
         # Concat files of same type (img/movie/audio) back to back
         # Concat audio files
         if file_paths[Category.AUDIO] and (
             format is None or format in self._supported_formats[Category.AUDIO]
         ):
-            concat_audio = concatenate_audioclips(
-                [
-                    AudioFileClip(self.file_handler.join_back(audio_path_set))
-                    for audio_path_set in file_paths[Category.AUDIO]
-                ]
-            )
             format = "mp3" if format is None else format
-            audio_out_path = os.path.join(self.output, f"concatenated_audio.{format}")
-            concat_audio.write_audiofile(
-                audio_out_path,
-                codec=self._supported_formats[Category.AUDIO][format],
-                bitrate=self._audio_bitrate(format, self.quality)
-                if self.quality is not None
-                else getattr(concat_audio, "bitrate", "192k"),
-                logger=self.prog_logger,
+            self._concat_streams(
+                [self.file_handler.join_back(p) for p in file_paths[Category.AUDIO]],
+                f"concatenated_audio.{format}",
+                format,
+                Category.AUDIO,
             )
-            concat_audio.close()
 
         # Concat movie files
         if file_paths[Category.MOVIE] and (
             format is None or format in self._supported_formats[Category.MOVIE]
         ):
-            concat_vid = concatenate_videoclips(
-                [
-                    VideoFileClip(
-                        self.file_handler.join_back(movie_path_set),
-                        audio=True,
-                        fps_source="tbr",
-                    )
-                    for movie_path_set in file_paths[Category.MOVIE]
-                ],
-                method="compose",
-            )
             format = "mp4" if format is None else format
-            video_out_path = os.path.join(self.output, f"concatenated_video.{format}")
-            concat_vid.write_videofile(
-                video_out_path,
-                fps=concat_vid.fps if self.framerate is None else self.framerate,
-                codec=self._supported_formats[Category.MOVIE][format],
-                logger=self.prog_logger,
+            self._concat_streams(
+                [self.file_handler.join_back(p) for p in file_paths[Category.MOVIE]],
+                f"concatenated_video.{format}",
+                format,
+                Category.MOVIE,
             )
-            concat_vid.close()
 
         # Concat image files (make a gif out of them)
         if file_paths[Category.IMAGE] and (
@@ -804,25 +980,11 @@ class Controller:
                     total_pdfs = len(pdfs)
                     for i, doc_path_set in enumerate(pdfs):
                         # Update progress manually since PDF operations don't have built-in progress
-                        if (
-                            hasattr(self.prog_logger, "shared_progress_dict")
-                            and self.prog_logger.shared_progress_dict
-                        ):
-                            with threading.Lock():
-                                if (
-                                    self.prog_logger.job_id
-                                    in self.prog_logger.shared_progress_dict
-                                ):
-                                    self.prog_logger.shared_progress_dict[
-                                        self.prog_logger.job_id
-                                    ].update(
-                                        {
-                                            "progress": i,
-                                            "total": total_pdfs,
-                                            "status": f"processing PDF {i + 1}/{total_pdfs}",
-                                            "last_updated": time.time(),
-                                        }
-                                    )
+                        self.prog_logger.update_job(
+                            progress=i,
+                            total=total_pdfs,
+                            status=f"processing PDF {i + 1}/{total_pdfs}",
+                        )
 
                 doc = fitz.open()
                 for doc_path_set in pdfs:
@@ -839,25 +1001,11 @@ class Controller:
                     total_srts = len(srts)
                     for i, doc_path_set in enumerate(srts):
                         # Update progress manually
-                        if (
-                            hasattr(self.prog_logger, "shared_progress_dict")
-                            and self.prog_logger.shared_progress_dict
-                        ):
-                            with threading.Lock():
-                                if (
-                                    self.prog_logger.job_id
-                                    in self.prog_logger.shared_progress_dict
-                                ):
-                                    self.prog_logger.shared_progress_dict[
-                                        self.prog_logger.job_id
-                                    ].update(
-                                        {
-                                            "progress": i,
-                                            "total": total_srts,
-                                            "status": f"processing SRT {i + 1}/{total_srts}",
-                                            "last_updated": time.time(),
-                                        }
-                                    )
+                        self.prog_logger.update_job(
+                            progress=i,
+                            total=total_srts,
+                            status=f"processing SRT {i + 1}/{total_srts}",
+                        )
 
                 for doc_path_set in srts:
                     # Produce a single srt file
@@ -877,26 +1025,11 @@ class Controller:
             # Iterate over each input category and post-process respective files
             for i, file_path in enumerate(file_paths[category]):
                 # Manual progress update for post-processing
-                if hasattr(self.prog_logger, "job_id") and self.prog_logger.job_id:
-                    if (
-                        hasattr(self.prog_logger, "shared_progress_dict")
-                        and self.prog_logger.shared_progress_dict
-                    ):
-                        with threading.Lock():
-                            if (
-                                self.prog_logger.job_id
-                                in self.prog_logger.shared_progress_dict
-                            ):
-                                self.prog_logger.shared_progress_dict[
-                                    self.prog_logger.job_id
-                                ].update(
-                                    {
-                                        "progress": processed_files,
-                                        "total": total_categories,
-                                        "status": f"post-processing files ({processed_files + 1}/{total_categories})",
-                                        "last_updated": time.time(),
-                                    }
-                                )
+                self.prog_logger.update_job(
+                    progress=processed_files,
+                    total=total_categories,
+                    status=f"post-processing files ({processed_files + 1}/{total_categories})",
+                )
 
                 self.file_handler.post_process(
                     file_path, self.output, self.delete, show_status=(i == 0)
@@ -907,13 +1040,113 @@ class Controller:
             f"[+] {lang.get_translation('concat_success', self.locale)}"
         )
 
+    def _pair_movies_with_audio(self, file_paths: dict, across: bool) -> list:
+        # Match every movie with its equally named audio file, (movie_path_set, audio_path_set).
+        # Lookups go through dicts built once, so pairing stays linear in library size.
+        by_dir_and_name, by_name = {}, {}
+        for audio_set in file_paths.get(Category.AUDIO, []):
+            # First occurrence wins, as with the input order before
+            by_dir_and_name.setdefault((audio_set[0], audio_set[1]), audio_set)
+            by_name.setdefault(audio_set[1], audio_set)
+
+        # Audio files lying next to the movies, one directory listing per folder.
+        # Extension preference follows the order of supported audio formats.
+        ext_rank = {
+            ext: rank
+            for rank, ext in enumerate(self._supported_formats[Category.AUDIO])
+        }
+        dir_listings = {}
+
+        def _audio_in_dir(directory: str) -> dict:
+            if directory not in dir_listings:
+                found = {}
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            # Extensions match in any case, the path keeps the one on disk
+                            name, dot, ext = entry.name.rpartition(".")
+                            rank = ext_rank.get(ext.lower())
+                            if not dot or rank is None or not entry.is_file():
+                                continue
+                            if name not in found or rank < ext_rank[found[name].lower()]:
+                                found[name] = ext
+                except OSError:
+                    pass
+                dir_listings[directory] = found
+            return dir_listings[directory]
+
+        pairs = []
+        for movie_path_set in file_paths[Category.MOVIE]:
+            # Try to find a corresponding audio file in the input set
+            # (e.g. "-1 path1 -2 path2 -n pathn")
+            if across:
+                # Allow matching audio from any input directory
+                audio_fit = by_name.get(movie_path_set[1])
+            else:
+                # Only match audio from the same directory as the video
+                audio_fit = by_dir_and_name.get((movie_path_set[0], movie_path_set[1]))
+
+            # If not found, look for a matching audio file in the video's directory
+            if audio_fit is None:
+                ext = _audio_in_dir(movie_path_set[0]).get(movie_path_set[1])
+                if ext is not None:
+                    audio_fit = (movie_path_set[0], movie_path_set[1], ext)
+
+            if audio_fit is not None:
+                pairs.append((movie_path_set, audio_fit))
+        return pairs
+
+    def _update_merge_progress(self, processed: int, total: int) -> None:
+        # Manual progress update for merge operations
+        self.prog_logger.update_job(
+            progress=processed,
+            total=total,
+            status=f"merging video {min(processed + 1, total)}/{total}",
+        )
+
+    def _mux_audio(self, movie_path_set: tuple, audio_path_set: tuple, logger=None) -> str:
+        # Put the audio file's track under the movie's video stream.
+        # The video stream is copied as-is, audio is only transcoded if the movie's container
+        # can't carry its codec. Output keeps the movie's length, like with_audio did.
+        movie_path = self.file_handler.join_back(movie_path_set)
+        audio_path = self.file_handler.join_back(audio_path_set)
+        # ffmpeg_utils.probe raises OSError for unreadable inputs
+        movie_info = ffmpeg_utils.probe(movie_path)
+        audio_info = ffmpeg_utils.probe(audio_path)
+        video = ffmpeg_utils.first_stream(movie_info, "video")
+        audio = ffmpeg_utils.first_stream(audio_info, "audio")
+        if video is None:
+            raise OSError(f"No video stream found in '{movie_path}'")
+        if audio is None:
+            raise OSError(f"No audio stream found in '{audio_path}'")
+
+        container = movie_path_set[2]
+        merged_out_path = os.path.join(
+            self.output, f"{movie_path_set[1]}_merged.{container}"
+        )
+        args = ["-i", movie_path, "-i", audio_path, "-map", "0:v:0", "-map", "1:a:0"]
+        if self.framerate is not None and video["fps"] != float(self.framerate):
+            # A requested frame rate can't be met without re-encoding the video
+            args += [
+                "-r",
+                self.framerate,
+                "-c:v",
+                self._supported_formats[Category.MOVIE][container],
+            ]
+        else:
+            args += ["-c:v", "copy"]
+        args += ["-c:a", ffmpeg_utils.audio_codec_for_container(container, audio["codec"])]
+        if movie_info["duration"]:
+            args += ["-t", f"{movie_info['duration']:.3f}"]
+        ffmpeg_utils.run(
+            args + [merged_out_path], logger=logger, duration=movie_info["duration"]
+        )
+        return merged_out_path
+
     def merge(self, file_paths: dict, across: bool = False) -> None:
         # For movie files and equally named audio file, merge them together under same name
         # (movie with audio with '_merged' addition to name)
         # If only a video file is provided, look for a matching audio file in the same directory
-        found_audio = False
-        audio_exts = list(self._supported_formats[Category.AUDIO].keys())
-
         try:
             total_movies = len(file_paths[Category.MOVIE])
         except KeyError:
@@ -923,108 +1156,63 @@ class Controller:
                 msg=f"[!] {lang.get_translation('error', self.locale)}: {lang.get_translation('merge_advice', self.locale)}.",
             )
 
-        processed_movies = 0
-
-        for movie_path_set in file_paths[Category.MOVIE]:
-            # Manual progress update for merge operations
-            if hasattr(self.prog_logger, "job_id") and self.prog_logger.job_id:
-                if (
-                    hasattr(self.prog_logger, "shared_progress_dict")
-                    and self.prog_logger.shared_progress_dict
-                ):
-                    with threading.Lock():
-                        if (
-                            self.prog_logger.job_id
-                            in self.prog_logger.shared_progress_dict
-                        ):
-                            self.prog_logger.shared_progress_dict[
-                                self.prog_logger.job_id
-                            ].update(
-                                {
-                                    "progress": processed_movies,
-                                    "total": total_movies,
-                                    "status": f"merging video {processed_movies + 1}/{total_movies}",
-                                    "last_updated": time.time(),
-                                }
-                            )
+        # Decide worker count with env variable if present
+        try:
+            env_workers = max(
+                1,
+                min(
+                    int(os.environ.get("Any2Any_MAX_WORKERS", "1")),
+                    (os.cpu_count() or 2) - 1,
+                ),
+            )
+        except ValueError:
+            env_workers = 1
 
-            # Try to find a corresponding audio file in the input set
-            # (e.g. "-1 path1 -2 path2 -n pathn")
-            if across:
-                # Allow matching audio from any input directory
-                audio_fit = next(
-                    (
-                        audio_set
-                        for audio_set in file_paths[Category.AUDIO]
-                        if audio_set[1] == movie_path_set[1]
-                    ),
-                    None,
-                )
-            else:
-                # Only match audio from the same directory as the video
-                audio_fit = next(
-                    (
-                        audio_set
-                        for audio_set in file_paths[Category.AUDIO]
-                        if audio_set[1] == movie_path_set[1]
-                        and audio_set[0] == movie_path_set[0]
-                    ),
-                    None,
-                )
+        # Pair up movies and audio files first, merging happens afterwards
+        pairs = self._pair_movies_with_audio(file_paths, across)
+        input_audio = {tuple(a) for a in file_paths.get(Category.AUDIO, [])}
 
-            # If not found, look for a matching audio file in the video's directory
-            if audio_fit is None:
-                video_dir = movie_path_set[0]
-                video_basename = movie_path_set[1]
-                for ext in audio_exts:
-                    candidate = os.path.join(video_dir, f"{video_basename}.{ext}")
-                    if os.path.isfile(candidate):
-                        audio_fit = (video_dir, video_basename, ext)
-                        break
+        found_audio = len(pairs) > 0
+        processed_movies = total_movies - len(pairs)
+        self._update_merge_progress(processed_movies, total_movies)
 
-            if audio_fit is not None:
-                found_audio = True
-                # Merge movie and audio file
-                audio = None
-                video = None
-                try:
-                    video = VideoFileClip(self.file_handler.join_back(movie_path_set))
-                    audio = AudioFileClip(self.file_handler.join_back(audio_fit))
-                    video = video.with_audio(audio)
-                    merged_out_path = os.path.join(
-                        self.output, f"{movie_path_set[1]}_merged.{movie_path_set[2]}"
-                    )
-                    video.write_videofile(
-                        merged_out_path,
-                        fps=video.fps if self.framerate is None else self.framerate,
-                        codec=self._supported_formats[Category.MOVIE][
-                            movie_path_set[2]
-                        ],
-                        logger=self.prog_logger,
+        def _merge_pair(pair: tuple) -> tuple:
+            movie_path_set, audio_fit = pair
+            try:
+                merged_out_path = self._mux_audio(
+                    movie_path_set,
+                    audio_fit,
+                    logger=self.prog_logger if len(pairs) == 1 else None,
+                )
+            except Exception as e:
+                # Handle errors gracefully and update progress logger
+                if hasattr(self.prog_logger, "set_error"):
+                    self.prog_logger.set_error(
+                        f"Error merging {movie_path_set[1]}: {str(e)}"
                     )
-                except Exception as e:
-                    # Handle errors gracefully and update progress logger
-                    if hasattr(self.prog_logger, "set_error"):
-                        self.prog_logger.set_error(
-                            f"Error merging {movie_path_set[1]}: {str(e)}"
-                        )
-                    raise
-                finally:
-                    if audio is not None:
-                        audio.close()
-                    if video is not None:
-                        video.close()
-
+                raise
+            return movie_path_set, audio_fit, merged_out_path
+
+        def _finish_pair(result: tuple) -> None:
+            nonlocal processed_movies
+            movie_path_set, audio_fit, merged_out_path = result
+            self.file_handler.post_process(movie_path_set, merged_out_path, self.delete)
+            # Only delete the audio file if it was in the input set, not if just found in dir
+            if tuple(audio_fit) in input_audio:
                 self.file_handler.post_process(
-                    movie_path_set, merged_out_path, self.delete
+                    audio_fit, merged_out_path, self.delete, show_status=False
                 )
-                # Only delete the audio file if it was in the input set, not if just found in dir
-                if audio_fit in file_paths[Category.AUDIO]:
-                    self.file_handler.post_process(
-                        audio_fit, merged_out_path, self.delete, show_status=False
-                    )
-
             processed_movies += 1
+            self._update_merge_progress(processed_movies, total_movies)
+
+        if len(pairs) <= 1 or env_workers == 1:
+            for pair in pairs:
+                _finish_pair(_merge_pair(pair))
+        else:
+            with ThreadPoolExecutor(max_workers=env_workers) as ex:
+                futures = [ex.submit(_merge_pair, pair) for pair in pairs]
+                for fut in as_completed(futures):
+                    _finish_pair(fut.result())
 
         if not found_audio:
             self.event_logger.warning(
@@ -1032,20 +1220,6 @@ class Controller:
             )
 
         # Final progress update
-        if hasattr(self.prog_logger, "job_id") and self.prog_logger.job_id:
-            if (
-                hasattr(self.prog_logger, "shared_progress_dict")
-                and self.prog_logger.shared_progress_dict
-            ):
-                with threading.Lock():
-                    if self.prog_logger.job_id in self.prog_logger.shared_progress_dict:
-                        self.prog_logger.shared_progress_dict[
-                            self.prog_logger.job_id
-                        ].update(
-                            {
-                                "progress": total_movies,
-                                "total": total_movies,
-                                "status": "merge completed",
-                                "last_updated": time.time(),
-                            }
-                        )
+        self.prog_logger.update_job(
+            progress=total_movies, total=total_movies, status="merge completed"
+        )
@@ -1,13 +1,11 @@
 import os
-import sys
 import utils.language_support as lang
 
 from utils.category import Category
+from utils.prog_logger import run_as_task
 from moviepy import AudioFileClip, VideoFileClip
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 
 class AudioConverter:
     def __init__(
@@ -100,7 +98,7 @@ class AudioConverter:
         else:
             max_workers = env_workers if env_workers > 1 else 1
             with ThreadPoolExecutor(max_workers=max_workers) as ex:
-                futures = [ex.submit(_convert_audio_file, a) for a in audio_items]
+                futures = [ex.submit(run_as_task, self.prog_logger, _convert_audio_file, a) for a in audio_items]
                 for fut in as_completed(futures):
                     res = fut.result()
                     if res is None:
@@ -179,7 +177,7 @@ class AudioConverter:
                 self.file_handler.post_process(src, out_path, delete)
         else:
             with ThreadPoolExecutor(max_workers=env_workers) as ex:
-                futures = [ex.submit(_extract_from_movie, m) for m in movie_items]
+                futures = [ex.submit(run_as_task, self.prog_logger, _extract_from_movie, m) for m in movie_items]
                 for fut in as_completed(futures):
                     res = fut.result()
                     if res is None:
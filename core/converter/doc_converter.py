@@ -1,13 +1,12 @@
 import io
 import os
-import sys
 import fitz
 import docx
 import pptx
 import shutil
 import mammoth
-import subprocess
 import platform
+import threading
 import utils.language_support as lang
 
 from PIL import Image
@@ -18,9 +17,11 @@ from utils.category import Category
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
 from reportlab.lib.pagesizes import A4
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from core.utils import ffmpeg_utils
 from core.converter.image_converter import gif_to_frames
+from core.utils.frame_adapter import frame_to_image, frame_to_pixmap
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 try:
     if platform.system() != "Windows":
@@ -39,6 +40,8 @@ class DocumentConverter:
         self.prog_logger = prog_logger
         self.event_logger = event_logger
         self.locale = locale
+        # Subtitle stream language to extract (e.g. "eng"), None extracts all
+        self.subtitle_language = None
 
     def to_markdown(
         self, output: str, file_paths: dict, format: str, delete: bool
@@ -147,11 +150,13 @@ class DocumentConverter:
                 )
 
                 doc = fitz.open()
+                pix = None
                 for _, frame in tqdm(
                     enumerate(clip.iter_frames(fps=clip.fps, dtype="uint8")),
                 ):
                     h, w = frame.shape[:2]
-                    pix = fitz.Pixmap(fitz.csRGB, w, h, frame.tobytes(), stride=w * 3)
+                    # One pixmap is refilled per frame, insert_image copies it into the page
+                    pix = frame_to_pixmap(frame, pix)
                     rect = fitz.Rect(0, 0, w, h)
                     page = doc.new_page(width=rect.width, height=rect.height)
                     page.insert_image(rect, pixmap=pix)
@@ -255,74 +260,121 @@ class DocumentConverter:
         c.save()
 
     def to_subtitles(
-        self, output: str, file_paths: dict, format: str, delete: bool
+        self,
+        output: str,
+        file_paths: dict,
+        format: str,
+        delete: bool,
+        language: str = None,
     ) -> None:
-        # Extract subtitles from movies
-        for movie_path_set in file_paths[Category.MOVIE]:
-            input_path = self.file_handler.join_back(movie_path_set)
-            out_path = self.file_handler._resolve_output_file_conflict(
-                os.path.abspath(os.path.join(output, f"{movie_path_set[1]}.srt"))
+        # Extract subtitles from movies.
+        # Subtitle streams are looked up by probing first, files without any are skipped
+        # without being read further. All wanted streams of a file (every text stream, or
+        # only those in language, e.g. "eng") come out of a single demux pass.
+        language = language or self.subtitle_language
+        try:
+            env_workers = max(
+                1,
+                min(
+                    int(os.environ.get("Any2Any_MAX_WORKERS", "1")),
+                    (os.cpu_count() or 2) - 1,
+                ),
             )
+        except ValueError:
+            env_workers = 1
+        # Output paths handed out in this batch. Nothing is on disk yet when they are picked,
+        # so conflict resolution alone would give two streams (or movies) the same file.
+        chosen, chosen_lock = set(), threading.Lock()
 
+        def _extract_from_movie(movie_path_set: tuple) -> tuple:
+            input_path = self.file_handler.join_back(movie_path_set)
             self.event_logger.info(
                 f"[>] {lang.get_translation('extract_subtitles', self.locale)} '{input_path}'"
             )
-            try:
-                # Use FFmpeg to extract subtitles
-                _ = subprocess.run(
-                    [
-                        "ffmpeg",
-                        "-i",
-                        input_path,
-                        "-map",
-                        "0:s:0",  # Selects first subtitle stream
-                        "-c:s",
-                        "srt",
-                        out_path,
-                    ],
-                    capture_output=True,
-                    text=True,
+            streams = [
+                s
+                for s in ffmpeg_utils.probe(input_path)["streams"]
+                if s["type"] == "subtitle"
+                and s["codec"] in ffmpeg_utils.TEXT_SUBTITLE_CODECS
+                and (language is None or (s["language"] or "").lower() == language.lower())
+            ]
+            if not streams:
+                self.event_logger.info(
+                    f"[!] {lang.get_translation('embed_subtitles_fail', self.locale)} '{input_path}'"
                 )
-
-                if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
-                    self.event_logger.info(
-                        f"[>] {lang.get_translation('subtitles_success', self.locale)} '{out_path}'"
-                    )
-                    self.file_handler.post_process(
-                        movie_path_set, out_path, delete, show_status=False
-                    )
+                return movie_path_set, []
+
+            # A single stream keeps the plain name, several get their language (or index) added.
+            # Languages found more than once (e.g. English and English SDH) get the index too.
+            languages = [s["language"] for s in streams]
+            out_paths, args = [], ["-i", input_path]
+            for stream in streams:
+                if len(streams) == 1:
+                    suffix = ""
+                elif not stream["language"]:
+                    suffix = f".{stream['index']}"
+                elif languages.count(stream["language"]) > 1:
+                    suffix = f".{stream['language']}.{stream['index']}"
                 else:
-                    # Try extracting closed captions when direct extract fails (found mostly in MP4 and MKV)
-                    self.event_logger.info(
-                        f"[!] {lang.get_translation('extract_subtitles_alt', self.locale)}"
-                    )
-                    _ = subprocess.run(
-                        ["ffmpeg", "-i", input_path, "-c:s", format, out_path],
-                        capture_output=True,
-                        text=True,
-                    )
-                    if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
-                        self.event_logger.info(
-                            f"[>] {lang.get_translation('embed_subtitles_success', self.locale)} '{out_path}'"
+                    suffix = f".{stream['language']}"
+                with chosen_lock:
+                    out_path = self.file_handler._resolve_output_file_conflict(
+                        os.path.abspath(
+                            os.path.join(output, f"{movie_path_set[1]}{suffix}.{format}")
                         )
-                        self.file_handler.post_process(
-                            movie_path_set, out_path, delete, show_status=False
-                        )
-                    else:
-                        self.event_logger.info(
-                            f"[!] {lang.get_translation('embed_subtitles_fail', self.locale)} '{input_path}'"
-                        )
-            except Exception as e:
+                    )
+                    base, ext = os.path.splitext(out_path)
+                    n = 1
+                    while out_path in chosen:
+                        out_path = f"{base}_{n}{ext}"
+                        n += 1
+                    chosen.add(out_path)
+                args += ["-map", f"0:{stream['index']}", "-c:s", format, out_path]
+                out_paths.append(out_path)
+            ffmpeg_utils.run(args)
+            return movie_path_set, out_paths
+
+        def _finish(result: tuple) -> None:
+            movie_path_set, out_paths = result
+            for out_path in out_paths:
                 self.event_logger.info(
-                    f"[!] {lang.get_translation('extract_subtitles_fail', self.locale)} {str(e)}"
+                    f"[>] {lang.get_translation('subtitles_success', self.locale)} '{out_path}'"
                 )
+                self.file_handler.post_process(
+                    movie_path_set, out_path, delete, show_status=False
+                )
+
+        def _report(exception: Exception) -> bool:
+            # Log a failed extraction, True if there's no point in trying further files
+            if isinstance(exception, FileNotFoundError):
+                self.event_logger.info(
+                    f"[!] {lang.get_translation('ffmpeg_not_found', self.locale)}"
+                )
+                return True
+            self.event_logger.info(
+                f"[!] {lang.get_translation('extract_subtitles_fail', self.locale)} {str(exception)}"
+            )
+            return False
+
+        movie_items = list(file_paths[Category.MOVIE])
+        if len(movie_items) <= 1 or env_workers == 1:
+            for movie_path_set in movie_items:
                 try:
-                    subprocess.run(["ffmpeg", "-version"], capture_output=True)
-                except FileNotFoundError:
-                    self.event_logger.info(
-                        f"[!] {lang.get_translation('ffmpeg_not_found', self.locale)}"
-                    )
-                    break
+                    _finish(_extract_from_movie(movie_path_set))
+                except Exception as e:
+                    if _report(e):
+                        break
+        else:
+            with ThreadPoolExecutor(max_workers=env_workers) as ex:
+                futures = [ex.submit(_extract_from_movie, m) for m in movie_items]
+                for fut in as_completed(futures):
+                    try:
+                        _finish(fut.result())
+                    except Exception as e:
+                        if _report(e):
+                            for pending in futures:
+                                pending.cancel()
+                            break
 
     def to_office(
         self, output: str, file_paths: dict, format: str, delete: bool
@@ -408,7 +460,7 @@ class DocumentConverter:
                 enumerate(clip.iter_frames(fps=clip.fps, dtype="uint8"))
             ):
                 buf = io.BytesIO()
-                Image.fromarray(frame).save(buf, format="PNG")
+                frame_to_image(frame).save(buf, format="PNG")
                 buf.seek(0)
                 page = _add_page(container)
                 _place_img(page, buf, full_page=format == "pptx")
@@ -1,5 +1,4 @@
 import os
-import sys
 import docx
 import pptx
 import fitz
@@ -10,10 +9,10 @@ from tqdm import tqdm
 from io import BytesIO
 from moviepy import VideoFileClip
 from utils.category import Category
+from utils.prog_logger import run_as_task
+from core.utils.frame_adapter import frame_to_image, pixmap_to_image, as_rgb
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 
 def office_to_frames(
     doc_path_set: tuple,
@@ -88,7 +87,7 @@ def gif_to_frames(output: str, file_paths: dict, file_handler) -> None:
             total_frames = int(clip.duration * clip.fps)
             num_digits = len(str(total_frames))
             for i, frame in enumerate(clip.iter_frames(fps=clip.fps, dtype="uint8")):
-                Image.fromarray(frame).save(
+                frame_to_image(frame).save(
                     os.path.join(out_dir, f"{image_path_set[1]}-{i:0{num_digits}d}.png")
                 )
         finally:
@@ -221,7 +220,7 @@ class ImageConverter:
 
                 for page_num in range(total_pages):
                     pix = pdf_document[page_num].get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                    img = pixmap_to_image(pix)
                     img_file = img_path_pattern % (page_num + 1)
                     img.save(img_file, format.upper())
 
@@ -276,7 +275,7 @@ class ImageConverter:
                     self.file_handler.post_process(res[0], res[1], delete)
         else:
             with ThreadPoolExecutor(max_workers=max_workers) as ex:
-                futures = [ex.submit(_movie_to_frames, m) for m in movie_items]
+                futures = [ex.submit(run_as_task, self.prog_logger, _movie_to_frames, m) for m in movie_items]
                 for fut in as_completed(futures):
                     res = fut.result()
                     if res is not None:
@@ -305,7 +304,7 @@ class ImageConverter:
                 for _, frame in enumerate(
                     video.iter_frames(fps=video.fps, dtype="uint8")
                 ):
-                    frame.save(
+                    frame_to_image(frame).save(
                         f"{bmp_path}-%{len(str(int(video.duration * video.fps)))}d.{format}",
                         format=format,
                     )
@@ -327,7 +326,7 @@ class ImageConverter:
                 os.path.abspath(os.path.join(output, f"{image_path_set[1]}.{format}"))
             )
             with Image.open(self.file_handler.join_back(image_path_set)) as img:
-                img.convert("RGB").save(bmp_path, format=format)
+                as_rgb(img).save(bmp_path, format=format)
             return (image_path_set, bmp_path)
 
         max_workers = _max_workers()
@@ -359,9 +358,7 @@ class ImageConverter:
                         output,
                         f"{image_path_set[1]}-%{len(str(int(clip.duration * clip.fps)))}d.{format}",
                     )
-                    Image.fromarray(frame).convert("RGB").save(
-                        frame_path, format=format
-                    )
+                    frame_to_image(frame).save(frame_path, format=format)
                 self.file_handler.post_process(image_path_set, frame_path, delete)
             else:
                 # Handle unsupported file types here
@@ -397,7 +394,7 @@ class ImageConverter:
                         output = input
                 for i, page_num in enumerate(range(len(doc))):
                     pix = doc.load_page(page_num).get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                    img = pixmap_to_image(pix)
                     # Save each page as a separate BMP file
                     img.save(
                         os.path.join(
@@ -466,7 +463,7 @@ class ImageConverter:
                 os.path.abspath(os.path.join(output, f"{image_path_set[1]}.{format}"))
             )
             with Image.open(self.file_handler.join_back(image_path_set)) as img:
-                img.convert("RGB").save(webp_path, format=format)
+                as_rgb(img).save(webp_path, format=format)
             return (image_path_set, webp_path)
 
         max_workers = _max_workers()
@@ -497,9 +494,7 @@ class ImageConverter:
                         output,
                         f"{image_path_set[1]}-%{len(str(int(clip.duration * clip.fps)))}d.{format}",
                     )
-                    Image.fromarray(frame).convert("RGB").save(
-                        frame_path, format=format
-                    )
+                    frame_to_image(frame).save(frame_path, format=format)
                 self.file_handler.post_process(image_path_set, frame_path, delete)
             else:
                 # Handle unsupported file types here
@@ -536,7 +531,7 @@ class ImageConverter:
                         output = input
                 for i, page_num in enumerate(range(len(doc))):
                     pix = doc.load_page(page_num).get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                    img = pixmap_to_image(pix)
                     # Save each page as a separate BMP file
                     img.save(
                         os.path.join(
@@ -698,9 +693,8 @@ class ImageConverter:
                 doc = fitz.open(pdf_path)
                 images = []
                 for page_num in range(len(doc)):
-                    pix = doc.load_page(page_num).get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    images.append(img)
+                    # RGB pixmaps, the images get their own copy of each
+                    images.append(pixmap_to_image(doc.load_page(page_num).get_pixmap()))
                 if images:
                     images[0].save(
                         gif_path,
@@ -1,14 +1,15 @@
 import os
-import sys
 import fitz
 import shutil
 import subprocess
 import numpy as np
 import utils.language_support as lang
-from PIL import Image
 from tqdm import tqdm
 from utils.category import Category
+from utils.prog_logger import run_as_task
+from core.utils import ffmpeg_utils
 from core.utils.exit import end_with_msg
+from core.utils.frame_adapter import pixmap_to_image
 from core.converter.image_converter import office_to_frames
 from moviepy import (
     VideoFileClip,
@@ -18,7 +19,16 @@ from moviepy import (
 )
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Rendition ladder for adaptive streaming, (height, video kb/s, audio kb/s)
+_HLS_LADDER = [
+    (240, 400, 64),
+    (360, 800, 96),
+    (480, 1400, 128),
+    (720, 2800, 128),
+    (1080, 5000, 192),
+]
+_SEGMENT_SECONDS = 4
 
 
 class MovieConverter:
@@ -108,7 +118,7 @@ class MovieConverter:
                 self.file_handler.post_process(src, out_path, delete)
         elif len(img_lists["gif"]) > 1:
             with ThreadPoolExecutor(max_workers=env_workers) as ex:
-                futures = [ex.submit(_gif_to_video, g) for g in img_lists["gif"]]
+                futures = [ex.submit(run_as_task, self.prog_logger, _gif_to_video, g) for g in img_lists["gif"]]
                 for fut in as_completed(futures):
                     res = fut.result()
                     if res is None:
@@ -199,7 +209,7 @@ class MovieConverter:
                 self.file_handler.post_process(src, out_path, delete)
         elif len(movie_items) > 1:
             with ThreadPoolExecutor(max_workers=env_workers) as ex:
-                futures = [ex.submit(_movie_to_movie, m) for m in movie_items]
+                futures = [ex.submit(run_as_task, self.prog_logger, _movie_to_movie, m) for m in movie_items]
                 for fut in as_completed(futures):
                     res = fut.result()
                     if res is None:
@@ -264,10 +274,8 @@ class MovieConverter:
                         output = input
                 for i, page_num in tqdm(enumerate(range(len(doc)))):
                     pix = doc.load_page(page_num).get_pixmap()
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    img = img.convert("RGB")
                     # Save each page as a separate JPEG file
-                    img.save(
+                    pixmap_to_image(pix).save(
                         os.path.join(
                             output,
                             doc_path_set[1],
@@ -384,8 +392,11 @@ class MovieConverter:
         supported_formats: dict,  # self._supported_formats
         protocol: list,
         delete: bool,
+        single_file: bool = False,
     ) -> None:
-        # Convert movie files into adaptive streaming formats HLS (.m3u8) or DASH (.mpd).
+        # Convert movie files into adaptive streaming formats HLS (.m3u8), DASH (.mpd)
+        # or CMAF (fMP4 segments shared by an HLS and a DASH manifest).
+        # single_file packs each DASH/CMAF rendition into one file addressed by byte ranges.
         if protocol[0] not in list(supported_formats[Category.PROTOCOLS].keys()):
             end_with_msg(
                 self.event_logger,
@@ -395,7 +406,7 @@ class MovieConverter:
 
         for movie_path_set in file_paths[Category.MOVIE]:
             input_file = os.path.abspath(self.file_handler.join_back(movie_path_set))
-            base_name = os.path.splitext(movie_path_set[-1])[0]
+            base_name = movie_path_set[1]
             current_out_dir = os.path.abspath(
                 os.path.join(output, f"{base_name}_{protocol[0]}")
             )
@@ -403,68 +414,29 @@ class MovieConverter:
             if current_out_dir is not None and not os.path.exists(current_out_dir):
                 os.makedirs(current_out_dir)
 
-            if protocol[0] == "hls":
-                renditions = [
-                    ("426x240", "400k", "64k"),
-                    ("640x360", "800k", "96k"),
-                    ("842x480", "1400k", "128k"),
-                    ("1280x720", "2800k", "128k"),
-                    ("1920x1080", "5000k", "192k"),
-                ]
-                variant_playlist = "#EXTM3U\n"
-                cmd = ["ffmpeg", "-y", "-i", input_file]
+            try:
+                source = ffmpeg_utils.probe(input_file)
+            except Exception:
+                # Unknown source, fall back to the full ladder and let ffmpeg report
+                source = None
+            rungs = self._hls_ladder(source)
+            has_audio = (
+                source is None or ffmpeg_utils.first_stream(source, "audio") is not None
+            )
 
-                for i, (resolution, v_bitrate, a_bitrate) in enumerate(renditions):
-                    if not os.path.exists(
-                        os.path.join(current_out_dir, f"{renditions[i][0]}")
-                    ):
-                        os.makedirs(
-                            os.path.join(current_out_dir, f"{renditions[i][0]}"),
-                            exist_ok=True,
-                        )
+            if protocol[0] == "hls":
+                for height, v_bitrate, a_bitrate in rungs:
                     self.event_logger.info(
-                        f"[>] {lang.get_translation('get_hls', self.locale)} {self.file_handler.join_back(movie_path_set)}: {resolution} at {v_bitrate} video, {a_bitrate} audio"
+                        f"[>] {lang.get_translation('get_hls', self.locale)} {self.file_handler.join_back(movie_path_set)}: {height}p at {v_bitrate}k video, {a_bitrate}k audio"
                     )
-                    stream = [
-                        "-map",
-                        "0:v:0",
-                        "-map",
-                        "0:a:0",
-                        "-c:v",
-                        "h264",
-                        "-b:v",
-                        v_bitrate,
-                        "-s",
-                        resolution,
-                        "-c:a",
-                        "aac",
-                        "-b:a",
-                        a_bitrate,
-                        "-hls_time",
-                        "4",
-                        "-hls_playlist_type",
-                        "vod",
-                        "-hls_segment_filename",
-                        os.path.join(
-                            os.path.join(current_out_dir, f"{renditions[i][0]}"),
-                            f"{renditions[i][0]}_%03d.ts",
-                        ),
-                        os.path.join(
-                            os.path.join(current_out_dir, f"{renditions[i][0]}"),
-                            f"{renditions[i][0]}.m3u8",
-                        ),
-                    ]
-                    cmd += stream
-                    variant_playlist += f"#EXT-X-STREAM-INF:BANDWIDTH={int(v_bitrate[:-1]) * 1000},RESOLUTION={resolution}\n{i}.m3u8\n"
                 self.event_logger.info(
                     f"[>] {lang.get_translation('get_hls_master', self.locale)} {self.file_handler.join_back(movie_path_set)}"
                 )
                 master_playlist_path = os.path.join(current_out_dir, "master.m3u8")
+                cmd = self._hls_command(input_file, current_out_dir, rungs, has_audio)
 
                 try:
                     self._run_command(cmd)
-                    with open(master_playlist_path, "w") as f:
-                        f.write(variant_playlist)
                     self.file_handler.post_process(
                         movie_path_set, master_playlist_path, delete
                     )
@@ -474,46 +446,20 @@ class MovieConverter:
                         None,
                         f"{lang.get_translation('get_hls_fail', self.locale)} {e}",
                     )
-            elif protocol[0] == "dash":
+            elif protocol[0] in ("dash", "cmaf"):
+                cmaf = protocol[0] == "cmaf"
                 self.event_logger.info(
-                    f"[>] {lang.get_translation('create_dash', self.locale)} {self.file_handler.join_back(movie_path_set)}"
+                    f"[>] {lang.get_translation('create_cmaf' if cmaf else 'create_dash', self.locale)} {self.file_handler.join_back(movie_path_set)}"
                 )
                 out_path = os.path.join(current_out_dir, "manifest.mpd")
-                cmd = [
-                    "ffmpeg",
-                    "-y",
-                    "-i",
+                cmd = self._dash_command(
                     input_file,
-                    "-map",
-                    "0",
-                    "-b:v",
-                    "1500k",
-                    "-c:v",
-                    "libx264",
-                    "-c:a",
-                    "aac",
-                    "-bf",
-                    "1",
-                    "-keyint_min",
-                    "120",
-                    "-g",
-                    "120",
-                    "-sc_threshold",
-                    "0",
-                    "-b_strategy",
-                    "0",
-                    "-ar",
-                    "48000",
-                    "-use_timeline",
-                    "1",
-                    "-use_template",
-                    "1",
-                    "-adaptation_sets",
-                    "id=0,streams=v id=1,streams=a",
-                    "-f",
-                    "dash",
                     out_path,
-                ]
+                    rungs,
+                    has_audio,
+                    hls_playlist=cmaf,
+                    single_file=single_file,
+                )
                 try:
                     self._run_command(cmd)
                     self.file_handler.post_process(movie_path_set, out_path, delete)
@@ -521,9 +467,147 @@ class MovieConverter:
                     end_with_msg(
                         self.event_logger,
                         None,
-                        f"{lang.get_translation('dash_fail', self.locale)} {e}",
+                        f"{lang.get_translation('cmaf_fail' if cmaf else 'dash_fail', self.locale)} {e}",
                     )
 
+    def _hls_ladder(self, source: dict = None) -> list:
+        # Renditions (height, video kb/s, audio kb/s) worth producing for a source:
+        # Nothing above the source's height, no rung with more bitrate than the source has
+        if source is None:
+            return list(_HLS_LADDER)
+        video = ffmpeg_utils.first_stream(source, "video")
+        if video is None or not video.get("height"):
+            return list(_HLS_LADDER)
+        src_height = video["height"]
+        src_bitrate = video.get("bitrate") or source.get("bitrate")
+
+        rungs = [rung for rung in _HLS_LADDER if rung[0] <= src_height]
+        if not rungs:
+            # Smaller than the lowest rung, package it at its own size
+            rungs = [(src_height // 2 * 2, _HLS_LADDER[0][1], _HLS_LADDER[0][2])]
+        if src_bitrate:
+            rungs = [(h, min(v, src_bitrate), a) for h, v, a in rungs]
+        return rungs
+
+    def _ladder_encode_args(
+        self, input_file: str, rungs: list, has_audio: bool, shared_audio: bool
+    ) -> list:
+        # ffmpeg input and encoder args for a whole ladder: The source is decoded once
+        # and split into a scaler per rung. Each encoder runs on its own thread, the CPU
+        # budget is shared out between them. Keyframes are forced on segment boundaries
+        # so all renditions switch cleanly. With shared_audio, a single audio stream
+        # serves all renditions (DASH/CMAF adaptation set), else each rung gets its own.
+        n = len(rungs)
+        threads = max(1, (os.cpu_count() or 1) // n)
+        graph = f"[0:v:0]split={n}" + "".join(f"[s{i}]" for i in range(n))
+        graph += "".join(
+            f";[s{i}]scale=-2:{height}[v{i}]" for i, (height, _, _) in enumerate(rungs)
+        )
+        cmd = [
+            ffmpeg_utils.FFMPEG_BINARY,
+            "-y",
+            "-i",
+            input_file,
+            "-filter_complex",
+            graph,
+        ]
+        for i in range(n):
+            cmd += ["-map", f"[v{i}]"]
+        audio_streams = 0 if not has_audio else 1 if shared_audio else n
+        for i in range(audio_streams):
+            cmd += ["-map", "0:a:0"]
+        cmd += ["-c:v", "libx264", "-pix_fmt", "yuv420p"]
+        for i, (_, v_bitrate, _) in enumerate(rungs):
+            cmd += [
+                f"-b:v:{i}",
+                f"{v_bitrate}k",
+                f"-maxrate:v:{i}",
+                f"{int(v_bitrate * 1.07)}k",
+                f"-bufsize:v:{i}",
+                f"{v_bitrate * 2}k",
+                f"-threads:v:{i}",
+                str(threads),
+            ]
+        if audio_streams:
+            cmd += ["-c:a", "aac"]
+            if shared_audio:
+                cmd += ["-b:a", f"{rungs[-1][2]}k"]
+            else:
+                for i, (_, _, a_bitrate) in enumerate(rungs):
+                    cmd += [f"-b:a:{i}", f"{a_bitrate}k"]
+        return cmd + [
+            "-force_key_frames",
+            f"expr:gte(t,n_forced*{_SEGMENT_SECONDS})",
+            "-sc_threshold",
+            "0",
+        ]
+
+    def _hls_command(
+        self, input_file: str, out_dir: str, rungs: list, has_audio: bool
+    ) -> list:
+        # MPEG-TS HLS, one folder per rendition. ffmpeg writes the master playlist itself.
+        stream_map = " ".join(
+            f"v:{i},a:{i},name:{h}p" if has_audio else f"v:{i},name:{h}p"
+            for i, (h, _, _) in enumerate(rungs)
+        )
+        return self._ladder_encode_args(
+            input_file, rungs, has_audio, shared_audio=False
+        ) + [
+            "-f",
+            "hls",
+            "-hls_time",
+            str(_SEGMENT_SECONDS),
+            "-hls_playlist_type",
+            "vod",
+            "-hls_segment_filename",
+            os.path.join(out_dir, "%v", "segment_%03d.ts"),
+            "-master_pl_name",
+            "master.m3u8",
+            "-var_stream_map",
+            stream_map,
+            os.path.join(out_dir, "%v", "index.m3u8"),
+        ]
+
+    def _dash_command(
+        self,
+        input_file: str,
+        out_path: str,
+        rungs: list,
+        has_audio: bool,
+        hls_playlist: bool = False,
+        single_file: bool = False,
+    ) -> list:
+        # fMP4 (CMAF) segments with a DASH manifest. With hls_playlist, HLS media playlists
+        # and a master.m3u8 are written over the very same segments, so one encode serves
+        # both protocols. single_file keeps one file per rendition, segments are byte ranges.
+        cmd = self._ladder_encode_args(input_file, rungs, has_audio, shared_audio=True)
+        cmd += [
+            "-f",
+            "dash",
+            "-seg_duration",
+            str(_SEGMENT_SECONDS),
+            "-use_template",
+            "1",
+            "-use_timeline",
+            "1",
+            "-adaptation_sets",
+            "id=0,streams=v id=1,streams=a" if has_audio else "id=0,streams=v",
+            "-init_seg_name",
+            "init_$RepresentationID$.m4s",
+            "-media_seg_name",
+            "chunk_$RepresentationID$_$Number%05d$.m4s",
+        ]
+        if hls_playlist:
+            cmd += ["-hls_playlist", "1", "-hls_master_name", "master.m3u8"]
+        if single_file:
+            cmd += [
+                "-single_file",
+                "1",
+                "-single_file_name",
+                "stream_$RepresentationID$.mp4",
+            ]
+        return cmd + [out_path]
+
     def _run_command(self, command: list) -> None:
         try:
             _ = subprocess.run(
@@ -0,0 +1,221 @@
+import re
+import subprocess
+import tempfile
+
+from moviepy.config import FFMPEG_BINARY
+
+# Direct ffmpeg access for jobs that shouldn't be routed through moviepy frame by frame
+# (stream copies, muxing, packaging). Uses the same binary moviepy resolved, so a system
+# ffmpeg and the bundled imageio-ffmpeg build both work. ffprobe is not guaranteed to be
+# available alongside, so probing parses the stream listing of `ffmpeg -i` instead.
+
+# Encoder name -> codec name as reported by ffmpeg for encoded streams
+_ENCODER_CODECS = {
+    "libx264": "h264",
+    "libx264rgb": "h264",
+    "h264_nvenc": "h264",
+    "libx265": "hevc",
+    "libvpx": "vp8",
+    "libvpx-vp9": "vp9",
+    "libaom-av1": "av1",
+    "libxvid": "mpeg4",
+    "libtheora": "theora",
+    "libmp3lame": "mp3",
+    "libvorbis": "vorbis",
+    "libopus": "opus",
+}
+
+# Container -> (audio codecs it can carry without transcoding, encoder to fall back to)
+CONTAINER_AUDIO = {
+    "mp4": ({"aac", "mp3", "ac3", "eac3", "alac", "opus", "flac"}, "aac"),
+    "m4v": ({"aac", "mp3", "ac3", "eac3", "alac"}, "aac"),
+    "mov": ({"aac", "mp3", "ac3", "eac3", "alac", "pcm_s16le", "pcm_s24le"}, "aac"),
+    "3gp": ({"aac", "amr_nb", "amr_wb"}, "aac"),
+    "3g2": ({"aac", "amr_nb", "amr_wb"}, "aac"),
+    "f4v": ({"aac", "mp3"}, "aac"),
+    "flv": ({"aac", "mp3"}, "aac"),
+    "webm": ({"opus", "vorbis"}, "libopus"),
+    "ogv": ({"opus", "vorbis", "flac"}, "libvorbis"),
+    "avi": ({"mp3", "ac3", "pcm_s16le", "mp2"}, "libmp3lame"),
+    "wmv": ({"wmav2", "wmav1"}, "wmav2"),
+    "asf": ({"wmav2", "wmav1"}, "wmav2"),
+    "mpg": ({"mp2", "mp3", "ac3"}, "mp2"),
+    "vob": ({"mp2", "ac3"}, "ac3"),
+    "ts": ({"aac", "mp3", "ac3", "eac3", "mp2"}, "aac"),
+    "m2ts": ({"aac", "ac3", "eac3", "mp2"}, "ac3"),
+    "mts": ({"aac", "ac3", "eac3", "mp2"}, "ac3"),
+    "mxf": ({"pcm_s16le", "pcm_s24le"}, "pcm_s16le"),
+}
+# Matroska takes about anything
+_ANY_AUDIO_CONTAINERS = {"mkv", "mka"}
+
+# Encoders that need an explicit 4:2:0 pixel format to stay broadly playable
+YUV420_ENCODERS = {
+    "libx264",
+    "libx265",
+    "hevc",
+    "libvpx",
+    "libvpx-vp9",
+    "libaom-av1",
+    "mpeg2video",
+    "mpeg1video",
+    "mpeg4",
+    "libxvid",
+    "wmv2",
+    "flv",
+    "libtheora",
+}
+
+# Subtitle codecs that are text and so can be written out as srt (bitmap ones like PGS can't)
+TEXT_SUBTITLE_CODECS = {
+    "subrip",
+    "srt",
+    "ass",
+    "ssa",
+    "mov_text",
+    "webvtt",
+    "text",
+    "microdvd",
+    "subviewer",
+    "subviewer1",
+    "sami",
+    "realtext",
+    "jacosub",
+    "mpl2",
+    "pjs",
+    "vplayer",
+    "stl",
+}
+
+_STREAM_RE = re.compile(
+    r"Stream #(\d+):(\d+)(?:\[\w+\])?(?:\((\w+)\))?: (Video|Audio|Subtitle|Data|Attachment): (\w+)(.*)"
+)
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_BITRATE_RE = re.compile(r"bitrate: (\d+) kb/s")
+
+
+def codec_for_encoder(encoder: str) -> str:
+    # Map an encoder name (libx264) to the codec name probing reports (h264)
+    return _ENCODER_CODECS.get(encoder, encoder)
+
+
+def audio_codec_for_container(container: str, source_codec: str | None) -> str:
+    # "copy" if the container carries the source codec as-is, else the encoder to use
+    if source_codec is not None and container in _ANY_AUDIO_CONTAINERS:
+        return "copy"
+    allowed, fallback = CONTAINER_AUDIO.get(container, (set(), "aac"))
+    return "copy" if source_codec in allowed else fallback
+
+
+def _parse_stream(match: re.Match) -> dict:
+    _, index, language, kind, codec, rest = match.groups()
+    stream = {
+        "index": int(index),
+        "type": kind.lower(),
+        "codec": codec,
+        "language": language if language not in (None, "und") else None,
+        "default": "(default)" in rest,
+    }
+    bitrate = re.search(r"(\d+) kb/s", rest)
+    stream["bitrate"] = int(bitrate.group(1)) if bitrate else None
+    if kind == "Video":
+        size = re.search(r", (\d{2,5})x(\d{2,5})", rest)
+        fps = re.search(r"(\d+(?:\.\d+)?) fps", rest) or re.search(
+            r"(\d+(?:\.\d+)?) tbr", rest
+        )
+        pix_fmt = re.search(r"\), (\w+)(?:\(|,)", rest) or re.search(r"^, (\w+)", rest)
+        stream["width"] = int(size.group(1)) if size else None
+        stream["height"] = int(size.group(2)) if size else None
+        stream["fps"] = float(fps.group(1)) if fps else None
+        stream["pix_fmt"] = pix_fmt.group(1) if pix_fmt else None
+    elif kind == "Audio":
+        rate = re.search(r"(\d+) Hz, ([^,]+)", rest)
+        stream["sample_rate"] = int(rate.group(1)) if rate else None
+        stream["channels"] = rate.group(2).strip() if rate else None
+    return stream
+
+
+def probe(path: str) -> dict:
+    # Duration, overall bitrate (kb/s) and stream list of a media file.
+    # Raises OSError if ffmpeg can't read the file at all (mirrors moviepy's readers).
+    result = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-nostdin", "-i", path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    listing = result.stderr or ""
+    if "Input #0" not in listing:
+        raise OSError(f"ffmpeg could not read '{path}':\n{listing.strip()}")
+
+    duration = _DURATION_RE.search(listing)
+    bitrate = _BITRATE_RE.search(listing)
+    return {
+        "duration": (
+            int(duration.group(1)) * 3600
+            + int(duration.group(2)) * 60
+            + float(duration.group(3))
+        )
+        if duration
+        else None,
+        "bitrate": int(bitrate.group(1)) if bitrate else None,
+        "streams": [_parse_stream(m) for m in _STREAM_RE.finditer(listing)],
+    }
+
+
+def first_stream(info: dict, kind: str) -> dict | None:
+    # First stream of kind "video", "audio" or "subtitle", None if there's none
+    return next((s for s in info.get("streams", []) if s["type"] == kind), None)
+
+
+def write_concat_list(paths: list, list_path: str) -> None:
+    # Concat demuxer input list, one quoted absolute path per line
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in paths:
+            escaped = path.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def run(
+    args: list,
+    logger=None,
+    duration: float = None,
+    bar: str = "chunk",
+    offset: float = 0.0,
+    total: float = None,
+) -> None:
+    # Run ffmpeg with args. If a proglog logger and the expected output duration are given,
+    # progress is reported to it as bar index/total in milliseconds of output written.
+    # offset/total let consecutive runs share one bar (offset = seconds already done).
+    command = [FFMPEG_BINARY, "-hide_banner", "-nostdin", "-y"]
+    report = logger is not None and duration
+    if report:
+        command += ["-progress", "pipe:1", "-nostats"]
+    command += [str(a) for a in args]
+
+    # stderr goes to a file, a full pipe would stall ffmpeg while we read progress
+    with tempfile.TemporaryFile(mode="w+", errors="replace") as err:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE if report else subprocess.DEVNULL,
+            stderr=err,
+            text=True,
+        )
+        if report:
+            start = int(offset * 1000)
+            end = start + max(1, int(duration * 1000))
+            total = max(end, int((total or 0) * 1000))
+            logger(**{f"{bar}__total": total, f"{bar}__index": start})
+            for line in process.stdout:
+                key, _, value = line.strip().partition("=")
+                if key == "out_time_us" and value.isdigit():
+                    logger(**{f"{bar}__index": min(end, start + int(value) // 1000)})
+                elif key == "progress" and value == "end":
+                    logger(**{f"{bar}__index": end})
+        process.wait()
+        if process.returncode != 0:
+            err.seek(0)
+            raise RuntimeError(
+                f"Error: {' '.join(command)}\n\nSTDERR:\n{err.read().strip()}"
+            )
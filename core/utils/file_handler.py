@@ -13,6 +13,10 @@ class FileHandler:
         self.event_logger = event_logger
         self.locale = locale
         self.CONFLICT_RESOLUTION_TIMEOUT = 2.0  # numeric suffix loop attempt time in s
+        # Optional callable(out_path), told about each finished output as it's post-processed
+        self.on_output = None
+        # Optional callable(file_path_set), told about each source file once it's through
+        self.on_processed = None
 
     def join_back(self, file_path_set: tuple) -> str:
         # Join back the file path set to a concurrent path
@@ -67,6 +71,10 @@ class FileHandler:
                     f"[>] {lang.get_translation('converted', self.locale)} "
                     f'"{source_path}" -> "{resolved_out_path}"'
                 )
+            if self.on_output is not None and os.path.exists(resolved_out_path):
+                self.on_output(resolved_out_path)
+            if self.on_processed is not None:
+                self.on_processed(file_path_set)
 
             # Only delete source file if requested, output exists, and source exists
             if delete and os.path.exists(resolved_out_path) and os.path.exists(source_path):
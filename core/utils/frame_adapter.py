@@ -0,0 +1,64 @@
+import fitz
+import numpy as np
+
+from PIL import Image
+
+# Frame handoff between PyMuPDF pixmaps, numpy arrays (moviepy frames) and PIL images.
+# Wherever the formats line up, views over the same buffer are passed on instead of copies.
+
+# Pixmap channel layout (n, alpha) -> PIL mode
+_PIXMAP_MODES = {
+    (1, False): "L",
+    (2, True): "LA",
+    (3, False): "RGB",
+    (4, True): "RGBA",
+    (4, False): "CMYK",
+}
+
+
+def pixmap_to_image(pix: fitz.Pixmap) -> Image.Image:
+    # PIL image of the pixmap's samples. PIL only maps L, RGBA and CMYK buffers, those images
+    # view the pixmap's memory (keep the pixmap referenced while the image is in use). RGB and
+    # LA, e.g. anything page.get_pixmap() renders, are copied once.
+    mode = _PIXMAP_MODES.get((pix.n, bool(pix.alpha)))
+    if mode is None:
+        # Exotic colorspace, let PyMuPDF produce RGB samples first (alpha is kept). Nobody
+        # else holds that pixmap, so the image gets its own copy of the samples.
+        rgb = fitz.Pixmap(fitz.csRGB, pix)
+        mode = "RGBA" if rgb.alpha else "RGB"
+        return Image.frombuffer(
+            mode, (rgb.width, rgb.height), rgb.samples_mv, "raw", mode, rgb.stride, 1
+        ).copy()
+    return Image.frombuffer(
+        mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1
+    )
+
+
+def pixmap_to_array(pix: fitz.Pixmap) -> np.ndarray:
+    # (height, width, n) uint8 view onto the pixmap's samples, keep the pixmap referenced
+    # while the array is in use
+    rows = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+    return rows[:, : pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+
+
+def frame_to_pixmap(frame: np.ndarray, pix: fitz.Pixmap = None) -> fitz.Pixmap:
+    # Write an RGB frame straight into a pixmap's sample buffer (single memcpy).
+    # Pass the pixmap returned by the previous call to reuse it for equally sized frames,
+    # PyMuPDF copies pixmaps on insert_image, so overwriting afterwards is safe.
+    h, w = frame.shape[:2]
+    if pix is None or pix.width != w or pix.height != h or pix.n != 3 or pix.alpha:
+        pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, w, h), False)
+    pixmap_to_array(pix)[...] = frame[..., :3] if frame.ndim == 3 else frame[..., None]
+    return pix
+
+
+def frame_to_image(frame: np.ndarray) -> Image.Image:
+    # moviepy hands out (h, w, 3) uint8 frames, which PIL wraps as RGB without conversion
+    if frame.dtype != np.uint8:
+        frame = frame.astype(np.uint8)
+    return Image.fromarray(np.ascontiguousarray(frame))
+
+
+def as_rgb(img: Image.Image) -> Image.Image:
+    # Skip the full-frame copy convert() makes when the image already is RGB
+    return img if img.mode == "RGB" else img.convert("RGB")
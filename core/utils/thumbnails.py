@@ -0,0 +1,75 @@
+import os
+import fitz
+import tempfile
+from io import BytesIO
+from PIL import Image
+from utils.category import Category
+from core.utils import ffmpeg_utils
+from core.utils.frame_adapter import pixmap_to_image
+
+# Small previews of input files as PNG data, cheap enough to make for every file a user
+# scrolls past: movies give their first keyframe (nothing else gets decoded), documents
+# their first page rendered at preview size, images a reduced decode where the format
+# supports one (JPEG decodes at 1/2 to 1/8 scale right away).
+
+THUMBNAIL_SIZE = 96  # Longer side, in pixels
+
+
+def _png(img: Image.Image) -> bytes:
+    out = BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _from_image(path: str, size: int) -> bytes:
+    with Image.open(path) as img:
+        img.draft("RGB", (size, size))
+        img.thumbnail((size, size))
+        if img.mode not in ("RGB", "RGBA", "L", "LA"):
+            img = img.convert("RGBA")
+        return _png(img)
+
+
+def _from_document(path: str, size: int) -> bytes:
+    with fitz.open(path) as doc:
+        page = doc[0]
+        zoom = size / max(page.rect.width, page.rect.height, 1)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return _png(pixmap_to_image(pix))
+
+
+def _from_movie(path: str, size: int) -> bytes:
+    fd, frame_path = tempfile.mkstemp(suffix=".png")
+    os.close(fd)
+    try:
+        ffmpeg_utils.run(
+            [
+                "-skip_frame", "nokey",
+                "-i", path,
+                "-frames:v", "1",
+                "-vf", f"scale={size}:{size}:force_original_aspect_ratio=decrease",
+                "-f", "image2",
+                frame_path,
+            ]
+        )
+        with open(frame_path, "rb") as f:
+            data = f.read()
+        if not data:
+            raise OSError(f"No frame in '{path}'")
+        return data
+    finally:
+        os.remove(frame_path)
+
+
+def make_thumbnail(path: str, category: Category, size: int = THUMBNAIL_SIZE) -> bytes | None:
+    # PNG preview of the file at path, None if there is nothing to show (e.g. audio)
+    try:
+        if category in (Category.MOVIE, Category.MOVIE_CODECS):
+            return _from_movie(path, size)
+        if category == Category.DOCUMENT:
+            return _from_document(path, size)
+        if category == Category.IMAGE:
+            return _from_image(path, size)
+    except Exception:
+        pass
+    return None
@@ -0,0 +1,66 @@
+import os
+import fitz
+from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+from utils.category import Category
+from core.utils import ffmpeg_utils
+
+# Rough amount of work a file means, so batch progress isn't counting a 3 second clip the
+# same as a 3 hour film. The unit is "seconds of media": audio and movies count their
+# duration, a document page or a megapixel of an image roughly what a second of media
+# costs to convert. Files that can't be inspected count by size. Only relative values
+# matter, exactness doesn't.
+
+_SECONDS_PER_PAGE = 1.0
+_SECONDS_PER_MEGAPIXEL = 0.5
+_SECONDS_PER_MEGABYTE = 1.0  # Fallback
+_MIN_WEIGHT = 0.1  # Even an empty file costs something
+
+
+def _by_size(path: str) -> float:
+    try:
+        return os.path.getsize(path) / 1024**2 * _SECONDS_PER_MEGABYTE
+    except OSError:
+        return 1.0
+
+
+def estimate(path: str, category: Category) -> float:
+    # Expected work for converting the file at path
+    weight = None
+    try:
+        if category in (Category.AUDIO, Category.MOVIE, Category.MOVIE_CODECS):
+            weight = ffmpeg_utils.probe(path)["duration"]
+        elif category == Category.DOCUMENT:
+            with fitz.open(path) as doc:
+                weight = doc.page_count * _SECONDS_PER_PAGE
+        elif category == Category.IMAGE:
+            # Only reads the header
+            with Image.open(path) as img:
+                weight = img.width * img.height / 1e6 * _SECONDS_PER_MEGAPIXEL
+    except Exception:
+        weight = None
+    if weight is None:
+        weight = _by_size(path)
+    return max(_MIN_WEIGHT, weight)
+
+
+def estimate_all(file_paths: dict) -> dict:
+    # {category: [path set, ...]} -> {path set: expected work}, probed in parallel
+    items = [
+        (path_set, category)
+        for category, path_sets in file_paths.items()
+        for path_set in path_sets
+    ]
+    if not items:
+        return {}
+
+    def _estimate(item: tuple) -> float:
+        path_set, category = item
+        path = os.path.abspath(f"{path_set[0]}{path_set[1]}.{path_set[2]}")
+        if not os.path.isfile(path):
+            return 1.0
+        return estimate(path, category)
+
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+        weights = list(ex.map(_estimate, items))
+    return {tuple(path_set): weight for (path_set, _), weight in zip(items, weights)}
@@ -1,13 +1,15 @@
 import os
 import sys
-import copy
 import json
 import time
 import platform
 import threading
+import multiprocessing
 import subprocess
 from pathlib import Path
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QAbstractListModel, QModelIndex, QSize
 from PyQt6.QtGui import QShortcut, QKeySequence, QIcon, QPixmap, QPainter, QColor
 from PyQt6.QtWidgets import (
     QApplication,
@@ -23,8 +25,7 @@ from PyQt6.QtWidgets import (
     QCheckBox,
     QProgressBar,
     QMessageBox,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QDialog,
     QTextEdit,
     QSpinBox,
@@ -37,13 +38,24 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 import utils.language_support as lang
 from core.controller import Controller
+from core.utils import ffmpeg_utils
+from core.utils.thumbnails import make_thumbnail
+from utils.category import Category
+from utils.thumbnail_cache import ThumbnailCache
 from utils.version import VERSION
+from utils.process_runner import run_in_process
 
 if "--version" in sys.argv or "--self-test" in sys.argv:
     print(VERSION)
     sys.exit(0)
 
 
+def _conversion_job(job_id: str, progress_dict: dict, options: dict):
+    # Entry point inside the conversion process, progress_dict is that process' own
+    controller = Controller(job_id=job_id, shared_progress_dict=progress_dict, is_web=True)
+    controller.run(**options)
+
+
 class ConversionThread(QThread):
     progress_updated = pyqtSignal(dict)
     conversion_finished = pyqtSignal(str, str)  # job_id, output_path
@@ -74,11 +86,42 @@ class ConversionThread(QThread):
         self.delete = delete
         self.workers = workers
         self.job_id = str(id(self))
-        self.shared_progress = {}
         self._cancelled = False
+        self._cancel = threading.Event()
+        self._progress = {}  # The job's progress entry, as pushed by its process
+        self._last_snapshot = None
 
     def cancel(self):
+        # Kills the conversion process and whatever it started, see run_in_process
         self._cancelled = True
+        self._cancel.set()
+
+    def _on_progress(self, update: dict):
+        # Called with each change the conversion process publishes
+        self._progress.update(update)
+        prog = self._progress
+        progress = prog.get("progress", None)
+        total = prog.get("total", 100)
+        percent = None
+        if prog.get("weighted"):
+            # Weighted by the expected work per file, see ProgLogger.start_batch
+            percent = prog.get("progress_percent")
+        elif progress is not None and total:
+            try:
+                percent = int(100 * float(progress) / float(total))
+            except Exception:
+                percent = None
+        snapshot = {
+            "progress": percent,
+            "message": prog.get("message", prog.get("status", "")),
+            "status": prog.get("status", "running"),
+            "error": prog.get("error", None),
+            "eta_seconds": prog.get("eta_seconds"),
+            "time_remaining": prog.get("time_remaining"),
+        }
+        if snapshot != self._last_snapshot and snapshot["status"] != "cancelled":
+            self.progress_updated.emit(snapshot)
+            self._last_snapshot = snapshot
 
     def run(self):
         try:
@@ -91,10 +134,6 @@ class ConversionThread(QThread):
                 }
             )
 
-            controller = Controller(
-                job_id=self.job_id, shared_progress_dict=self.shared_progress, is_web=True
-            )
-
             if len(self.input_files) == 1:
                 base_name = Path(self.input_files[0]).stem
                 output_path = str(
@@ -105,60 +144,30 @@ class ConversionThread(QThread):
                     Path(self.output_dir) / f"converted.{self.output_format}"
                 )
 
-            conversion_done = threading.Event()
-            error_holder = {}
-
-            def conversion_job():
-                try:
-                    controller.run(
-                        input_path_args=self.input_files,
-                        format=self.output_format,
-                        output=output_path,
-                        framerate=self.framerate,
-                        quality=self.quality,
-                        split=None,
-                        merge=self.merge,
-                        concat=self.concat,
-                        delete=self.delete,
-                        across=False,
-                        recursive=self.recursive,
-                        dropzone=False,
-                        language=None,
-                        workers=self.workers,
-                    )
-                except Exception as e:
-                    error_holder["error"] = str(e)
-                finally:
-                    conversion_done.set()
-
-            t = threading.Thread(target=conversion_job)
-            t.start()
-
-            last_snapshot = None
-            # Poll progress every 100ms
-            while not conversion_done.is_set() and not self._cancelled:
-                prog = copy.deepcopy(self.shared_progress.get(self.job_id, {}))
-                progress = prog.get("progress", None)
-                total = prog.get("total", 100)
-                percent = None
-                if progress is not None and total:
-                    try:
-                        percent = int(100 * float(progress) / float(total))
-                    except Exception:
-                        percent = None
-                message = prog.get("message", prog.get("status", ""))
-                status = prog.get("status", "running")
-                error = prog.get("error", None)
-                snapshot = {
-                    "progress": percent,
-                    "message": message,
-                    "status": status,
-                    "error": error,
-                }
-                if snapshot != last_snapshot:
-                    self.progress_updated.emit(snapshot)
-                    last_snapshot = snapshot
-                time.sleep(0.1)
+            options = {
+                "input_path_args": self.input_files,
+                "format": self.output_format,
+                "output": output_path,
+                "framerate": self.framerate,
+                "quality": self.quality,
+                "split": None,
+                "merge": self.merge,
+                "concat": self.concat,
+                "delete": self.delete,
+                "across": False,
+                "recursive": self.recursive,
+                "dropzone": False,
+                "language": None,
+                "workers": self.workers,
+            }
+            # In a process of its own, so cancelling can stop it and its ffmpeg children
+            run_in_process(
+                self.job_id,
+                _conversion_job,
+                (options,),
+                self._on_progress,
+                cancel=self._cancel,
+            )
 
             if self._cancelled:
                 self.progress_updated.emit(
@@ -171,26 +180,22 @@ class ConversionThread(QThread):
                 )
                 return
 
-            # Wait for thread to complete
-            t.join(timeout=5.0)
-
             # Final progress update
-            prog = copy.deepcopy(self.shared_progress.get(self.job_id, {}))
-            percent = 100
-            message = prog.get("message", prog.get("status", "Done"))
-            status = prog.get("status", "done")
+            prog = self._progress
+            # The process is through, whatever it last said in passing
+            status = "error" if prog.get("status") == "error" else "done"
             error = prog.get("error", None)
             self.progress_updated.emit(
                 {
-                    "progress": percent,
-                    "message": message,
+                    "progress": 100,
+                    "message": prog.get("message", prog.get("status", "Done")),
                     "status": status,
                     "error": error,
                 }
             )
 
-            if "error" in error_holder:
-                self.error_occurred.emit(error_holder["error"])
+            if status == "error":
+                self.error_occurred.emit(error or "Conversion failed")
             else:
                 self.conversion_finished.emit(self.job_id, output_path)
 
@@ -198,21 +203,339 @@ class ConversionThread(QThread):
             self.error_occurred.emit(str(e))
 
 
+def _format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _file_metadata(path: str, media_exts: set) -> str:
+    # Size, and duration for audio and movies, of a file as one line of text
+    try:
+        parts = [_format_size(os.path.getsize(path))]
+    except OSError:
+        return ""
+    if Path(path).suffix[1:].lower() in media_exts:
+        try:
+            duration = ffmpeg_utils.probe(path)["duration"]
+        except OSError:
+            duration = None
+        if duration:
+            minutes, seconds = divmod(int(duration), 60)
+            hours, minutes = divmod(minutes, 60)
+            parts.append(
+                f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+            )
+    return " · ".join(parts)
+
+
+class FileListModel(QAbstractListModel):
+    # Paths of the files to convert. Batches are checked (and folders walked) off the UI
+    # thread and come in as chunks of rows. Size and duration are only looked up once an
+    # item's tooltip is asked for, thumbnails once an item is shown. Huge batches list
+    # right away and the view only ever touches the rows on screen.
+    # Thumbnails are made by a few worker threads, newest requests first so the rows on
+    # screen come before those scrolled past, and kept in a ThumbnailCache on disk.
+    _SCAN_CHUNK = 2000  # Rows inserted at once while a batch is being checked
+    _THUMBNAIL_BACKLOG = 256  # Requests beyond are dropped, oldest first
+    _THUMBNAIL_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+    _ICONS_IN_MEMORY = 2000
+    ICON_SIZE = QSize(48, 48)
+
+    _checked = pyqtSignal(int, list, bool)  # Scan generation, files, scan finished
+    _described = pyqtSignal(str, str)  # Path, metadata
+    _thumbnailed = pyqtSignal(str, bytes)  # Path, PNG data (empty if there's none)
+    scanning_changed = pyqtSignal(bool)
+
+    def __init__(self, categories=None, thumbnail_cache=None, parent=None):
+        # categories: {file extension: Category}, thumbnails are off without a cache
+        super().__init__(parent)
+        self._categories = dict(categories or {})
+        media_exts = {
+            ext
+            for ext, category in self._categories.items()
+            if category in (Category.AUDIO, Category.MOVIE)
+        }
+        self.seen = set()  # Paths listed, O(1) duplicate checking
+        self._paths = []
+        self._rows = {}  # Path -> row
+        self._meta = {}  # Path -> metadata text
+        self._describing = set()
+        self._media_exts = set(media_exts)
+        self._generation = 0  # Bumped on clear, results of older scans are dropped
+        self._scans = 0  # Scans running
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._thumbnail_cache = thumbnail_cache
+        self._icons = OrderedDict()  # Path -> QIcon, most recently made last
+        self._placeholder = None
+        self._wanted = deque(maxlen=self._THUMBNAIL_BACKLOG)  # Thumbnail requests
+        self._wanted_set = set()
+        self._wanted_cv = threading.Condition()
+        self._thumbnail_workers = 0
+        self._checked.connect(self._on_checked)
+        self._described.connect(self._on_described)
+        self._thumbnailed.connect(self._on_thumbnailed)
+
+    @property
+    def scanning(self) -> bool:
+        return self._scans > 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._paths):
+            return None
+        path = self._paths[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.ItemDataRole.UserRole:
+            return path
+        if role == Qt.ItemDataRole.DecorationRole and self._thumbnail_cache is not None:
+            icon = self._icons.get(path)
+            if icon is None:
+                self._want_thumbnail(path)
+                return self._blank()
+            return icon
+        if role == Qt.ItemDataRole.ToolTipRole:
+            meta = self._meta.get(path)
+            if meta is None:
+                self._describe(path)
+                return path
+            return f"{path}\n{meta}" if meta else path
+        return None
+
+    def flags(self, index):
+        # Rows are dragged to reorder them (the order is that of concat and merge), and are
+        # dropped between rows, not onto them
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        return super().flags(index) | Qt.ItemFlag.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def moveRows(self, source_parent, source_row, count, destination_parent, destination_child):
+        # destination_child counts rows before the move, as with beginMoveRows
+        if source_parent.isValid() or destination_parent.isValid() or count < 1:
+            return False
+        last = source_row + count - 1
+        if source_row < 0 or last >= len(self._paths):
+            return False
+        if not self.beginMoveRows(
+            source_parent, source_row, last, destination_parent, destination_child
+        ):
+            return False
+        moved = self._paths[source_row : last + 1]
+        del self._paths[source_row : last + 1]
+        at = destination_child if destination_child < source_row else destination_child - count
+        self._paths[at:at] = moved
+        for row in range(min(source_row, at), max(last, at + count - 1) + 1):
+            self._rows[self._paths[row]] = row
+        self.endMoveRows()
+        return True
+
+    def path(self, row: int) -> str:
+        return self._paths[row]
+
+    def paths(self) -> list:
+        return list(self._paths)
+
+    def add(self, path: str) -> bool:
+        # Add a single file right away, False if it isn't one or is listed already
+        if path in self.seen or not os.path.isfile(path):
+            return False
+        self._append([path])
+        return True
+
+    def add_async(self, candidates) -> None:
+        # Add files, and the files in folders, among candidates, checked off the UI thread
+        self._scans += 1
+        if self._scans == 1:
+            self.scanning_changed.emit(True)
+        threading.Thread(
+            target=self._scan, args=(list(candidates), self._generation), daemon=True
+        ).start()
+
+    def _scan(self, candidates: list, generation: int) -> None:
+        chunk = []
+        try:
+            for candidate in candidates:
+                if os.path.isdir(candidate):
+                    files = (
+                        os.path.join(root, name)
+                        for root, _, names in os.walk(candidate)
+                        for name in names
+                    )
+                else:
+                    files = (candidate,)
+                for file in files:
+                    if generation != self._generation:
+                        return
+                    if os.path.isfile(file):
+                        chunk.append(file)
+                    if len(chunk) >= self._SCAN_CHUNK:
+                        self._checked.emit(generation, chunk, False)
+                        chunk = []
+        finally:
+            self._checked.emit(generation, chunk, True)
+
+    def _on_checked(self, generation: int, files: list, finished: bool) -> None:
+        if generation == self._generation:
+            self._append(files)
+        if finished:
+            self._scans -= 1
+            if self._scans == 0:
+                self.scanning_changed.emit(False)
+
+    def _append(self, paths: list) -> None:
+        new = []
+        for path in paths:
+            if path not in self.seen:
+                self.seen.add(path)
+                new.append(path)
+        if not new:
+            return
+        first = len(self._paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        self._paths.extend(new)
+        self._rows.update(zip(new, range(first, first + len(new))))
+        self.endInsertRows()
+
+    def remove_rows(self, rows) -> None:
+        # Back to front, in runs of adjacent rows
+        rows = sorted(set(rows), reverse=True)
+        while rows:
+            last = first = rows.pop(0)
+            while rows and rows[0] == first - 1:
+                first = rows.pop(0)
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for path in self._paths[first : last + 1]:
+                self.seen.discard(path)
+            del self._paths[first : last + 1]
+            self.endRemoveRows()
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+
+    def clear(self) -> None:
+        self._generation += 1
+        with self._wanted_cv:
+            self._wanted.clear()
+            self._wanted_set.clear()
+        self.beginResetModel()
+        self._paths.clear()
+        self._rows.clear()
+        self.seen.clear()
+        self.endResetModel()
+
+    def _describe(self, path: str) -> None:
+        if path in self._describing:
+            return
+        self._describing.add(path)
+        self._executor.submit(
+            lambda: self._described.emit(path, _file_metadata(path, self._media_exts))
+        )
+
+    def _on_described(self, path: str, meta: str) -> None:
+        self._describing.discard(path)
+        self._meta[path] = meta
+        row = self._rows.get(path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.ToolTipRole])
+
+
+    def _blank(self) -> QIcon:
+        # Stands in until a thumbnail is there, keeps all rows the same height
+        if self._placeholder is None:
+            pixmap = QPixmap(self.ICON_SIZE)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            self._placeholder = QIcon(pixmap)
+        return self._placeholder
+
+    def _want_thumbnail(self, path: str) -> None:
+        with self._wanted_cv:
+            if path in self._wanted_set:
+                return
+            if len(self._wanted) == self._wanted.maxlen:
+                self._wanted_set.discard(self._wanted[0])
+            self._wanted.append(path)
+            self._wanted_set.add(path)
+            self._wanted_cv.notify()
+            if self._thumbnail_workers < self._THUMBNAIL_WORKERS:
+                self._thumbnail_workers += 1
+                threading.Thread(target=self._thumbnail_worker, daemon=True).start()
+
+    def _thumbnail_worker(self) -> None:
+        while True:
+            with self._wanted_cv:
+                while not self._wanted:
+                    self._wanted_cv.wait()
+                path = self._wanted.pop()
+            data = None
+            key = ThumbnailCache.key(path)
+            if key is not None:
+                data = self._thumbnail_cache.get(key)
+                if data is None:
+                    category = self._categories.get(Path(path).suffix[1:].lower())
+                    data = make_thumbnail(path, category)
+                    if data is not None:
+                        self._thumbnail_cache.put(key, data)
+            self._thumbnailed.emit(path, data or b"")
+
+    def _on_thumbnailed(self, path: str, data: bytes) -> None:
+        with self._wanted_cv:
+            self._wanted_set.discard(path)
+        icon = self._blank()
+        if data:
+            pixmap = QPixmap()
+            if pixmap.loadFromData(data, "PNG"):
+                icon = QIcon(pixmap)
+        self._icons[path] = icon
+        while len(self._icons) > self._ICONS_IN_MEMORY:
+            self._icons.popitem(last=False)
+        row = self._rows.get(path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class FileListView(QListView):
+    # Shows a FileListModel, count() as on a QListWidget
+    def count(self) -> int:
+        return self.model().rowCount() if self.model() is not None else 0
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.controller = Controller(locale=lang.get_system_language(), is_web=True)
         self.locale = self.controller.locale
-        self._file_paths_set = set()  # Performance: O(1) duplicate checking
+        categories = {}
+        for category in (Category.MOVIE, Category.IMAGE, Category.DOCUMENT, Category.AUDIO):
+            for ext in self.controller._supported_formats[category]:
+                categories.setdefault(ext, category)
+        self.file_model = FileListModel(categories, ThumbnailCache(THUMBNAIL_DIR), self)
         self.conversion_threads = {}
         self.current_thread = None
         self._conversion_start_time = None
         self.init_ui()
+        for signal in (
+            self.file_model.rowsInserted,
+            self.file_model.rowsRemoved,
+            self.file_model.modelReset,
+            self.file_model.scanning_changed,
+        ):
+            signal.connect(self._update_file_count)
         self._setup_shortcuts()
         self.setWindowTitle(f"any_to_any.py {VERSION}")
         self.setMinimumSize(850, 650)
         self.setAcceptDrops(True)  # Enable drag-drop on main window
 
+    @property
+    def _file_paths_set(self) -> set:
+        return self.file_model.seen
+
     def _setup_shortcuts(self):
         # Keyboard shortcuts, will expand this in the future
         QShortcut(QKeySequence("Ctrl+O"), self, self.add_files)
@@ -231,7 +554,7 @@ class MainWindow(QMainWindow):
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             self.file_list.setStyleSheet(
-                "QListWidget { border: None; background-color: #404040; }"
+                "QListView { border: None; background-color: #404040; }"
             )
             event.acceptProposedAction()
         else:
@@ -245,22 +568,15 @@ class MainWindow(QMainWindow):
         # Handle files/folders dropped onto file list
         self.file_list.setStyleSheet("")
         if not event.mimeData().hasUrls():
-            event.ignore()
+            # Rows dragged within the list, the view reorders them through the model
+            QListView.dropEvent(self.file_list, event)
             return
 
-        files_to_add = []
-        for url in event.mimeData().urls():
-            path = url.toLocalFile()
-            if not path:
-                continue
-            if os.path.isfile(path):
-                files_to_add.append(path)
-            elif os.path.isdir(path):
-                for root, _, files in os.walk(path):
-                    for file in files:
-                        files_to_add.append(os.path.join(root, file))
-        if files_to_add:
-            self.add_files_batch(files_to_add)
+        # Folders are walked off the UI thread, see FileListModel
+        paths = [url.toLocalFile() for url in event.mimeData().urls()]
+        paths = [path for path in paths if path]
+        if paths:
+            self.add_files_batch(paths)
         event.accept()
 
     def dropEvent(self, event):
@@ -269,53 +585,26 @@ class MainWindow(QMainWindow):
         if not event.mimeData().hasUrls():
             event.ignore()
             return
-        files_to_add = []
-        for url in event.mimeData().urls():
-            path = url.toLocalFile()
-            if not path:
-                continue
-            if os.path.isfile(path):
-                files_to_add.append(path)
-            elif os.path.isdir(path):
-                for root, _, files in os.walk(path):
-                    for file in files:
-                        files_to_add.append(os.path.join(root, file))
-        if files_to_add:
-            self.add_files_batch(files_to_add)
+        # Folders are walked off the UI thread, see FileListModel
+        paths = [url.toLocalFile() for url in event.mimeData().urls()]
+        paths = [path for path in paths if path]
+        if paths:
+            self.add_files_batch(paths)
         event.accept()
 
     def add_files_batch(self, files):
-        # Aggregator, adds multiple files with single UI update
-        self.file_list.setUpdatesEnabled(False)
-        try:
-            for file in files:
-                if file not in self._file_paths_set and os.path.isfile(file):
-                    self._file_paths_set.add(file)
-                    item = QListWidgetItem(Path(file).name)
-                    item.setData(Qt.ItemDataRole.UserRole, file)
-                    item.setToolTip(file)
-                    self.file_list.addItem(item)
-        finally:
-            self.file_list.setUpdatesEnabled(True)
-            self._update_file_count()
+        # Files and folders, checked and listed in the background
+        self.file_model.add_async(files)
 
     def add_file_to_list(self, file):
-        if not os.path.isfile(file):
-            return
-        if file in self._file_paths_set:
-            return
-        self._file_paths_set.add(file)
-        item = QListWidgetItem(Path(file).name)
-        item.setData(Qt.ItemDataRole.UserRole, file)
-        item.setToolTip(file)
-        self.file_list.addItem(item)
-        self._update_file_count()
-
-    def _update_file_count(self):
-        count = self.file_list.count()
-        self.file_count_label.setText(
-            f"{count} {lang.get_translation('file(s)', self.locale)}"
-        )
+        self.file_model.add(file)
+
+    def _update_file_count(self, *_):
+        count = self.file_model.rowCount()
+        text = f"{count} {lang.get_translation('file(s)', self.locale)}"
+        if self.file_model.scanning:
+            text += " ..."
+        self.file_count_label.setText(text)
 
     def _create_folder_icon(self):
         svg = """
@@ -377,13 +666,17 @@ class MainWindow(QMainWindow):
         input_layout = QVBoxLayout(input_group)
 
         # File list
-        self.file_list = QListWidget()
-        self.file_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.file_list = FileListView()
+        self.file_list.setModel(self.file_model)
+        # Rows all look alike, spares the view measuring every one of them
+        self.file_list.setUniformItemSizes(True)
+        self.file_list.setIconSize(FileListModel.ICON_SIZE)
+        self.file_list.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
         self.file_list.setAcceptDrops(True)
-        self.file_list.setDragDropMode(QListWidget.DragDropMode.InternalMove)
+        self.file_list.setDragDropMode(QListView.DragDropMode.InternalMove)
         self.file_list.dragEnterEvent = lambda evt: (
             self.file_list.setStyleSheet(
-                "QListWidget { border: None; background-color: #606060; }"
+                "QListView { border: None; background-color: #606060; }"
             ),
             evt.acceptProposedAction(),
         )[1]
@@ -585,9 +878,7 @@ class MainWindow(QMainWindow):
         layout.setSpacing(15)
 
     def clear_all_files(self):
-        self.file_list.clear()
-        self._file_paths_set.clear()
-        self._update_file_count()
+        self.file_model.clear()
 
     def add_files(self):
         file_dialog = QFileDialog()
@@ -601,8 +892,7 @@ class MainWindow(QMainWindow):
         if files:
             self.last_dir = str(Path(files[0]).parent)
             save_settings({"last_dir": self.last_dir, "locale": self.locale})
-            for file in files:
-                self.add_file_to_list(file)
+            self.add_files_batch(files)
 
     def add_folder(self):
         folder = QFileDialog.getExistingDirectory(
@@ -611,27 +901,23 @@ class MainWindow(QMainWindow):
         if folder:
             self.last_dir = folder
             save_settings({"last_dir": self.last_dir, "locale": self.locale})
-            for root, _, files in os.walk(folder):
-                for file in files:
-                    self.add_file_to_list(os.path.join(root, file))
+            self.add_files_batch([folder])
 
     def remove_selected(self):
-        for item in self.file_list.selectedItems():
-            file_path = item.data(Qt.ItemDataRole.UserRole)
-            self._file_paths_set.discard(file_path)
-            self.file_list.takeItem(self.file_list.row(item))
-        self._update_file_count()
+        self.file_model.remove_rows(
+            index.row() for index in self.file_list.selectedIndexes()
+        )
 
     def show_file_context_menu(self, pos):
         # Right-click context menu for file list
         menu = QMenu(self)
-        selected = self.file_list.selectedItems()
+        selected = self.file_list.selectedIndexes()
 
         if selected:
             remove_action = menu.addAction("Remove Selected")
             remove_action.triggered.connect(self.remove_selected)
             if len(selected) == 1:
-                file_path = selected[0].data(Qt.ItemDataRole.UserRole)
+                file_path = self.file_model.path(selected[0].row())
                 open_folder_action = menu.addAction("Open Containing Folder")
                 open_folder_action.triggered.connect(
                     lambda: self._open_file_location(file_path)
@@ -678,10 +964,7 @@ class MainWindow(QMainWindow):
             self.output_dir_edit.setText(directory)
 
     def start_conversion(self):
-        input_files = [
-            self.file_list.item(i).data(Qt.ItemDataRole.UserRole)
-            for i in range(self.file_list.count())
-        ]
+        input_files = self.file_model.paths()
         if not input_files:
             QMessageBox.warning(
                 self,
@@ -778,11 +1061,11 @@ class MainWindow(QMainWindow):
         if error:
             self.status_label.setText(f"Error: {error}")
         else:
-            eta_str = None
-
-            # Show ETA
+            # Show ETA, the conversion's own estimate if it has one
+            eta_str = progress_info.get("time_remaining")
             if (
-                value is not None
+                eta_str is None
+                and value is not None
                 and value > 0
                 and value < 100
                 and self._conversion_start_time is not None
@@ -892,12 +1175,7 @@ class MainWindow(QMainWindow):
         if dlg.exec():
             self.locale = dlg.selected_locale
             save_settings({"last_dir": self.last_dir, "locale": self.locale})
-            # Recreate UI with new locale
-            self._file_paths_set.clear()
-            for i in range(self.file_list.count()):
-                self._file_paths_set.add(
-                    self.file_list.item(i).data(Qt.ItemDataRole.UserRole)
-                )
+            # Recreate UI with new locale, the file list's model carries over
             self.init_ui()
 
     def open_help_dialog(self):
@@ -918,6 +1196,7 @@ def main():
 
 
 SETTINGS_FILE = str(Path.home() / ".any_to_any_gui_settings.json")
+THUMBNAIL_DIR = str(Path.home() / ".any_to_any_thumbnails")
 
 
 class SettingsDialog(QDialog):
@@ -995,4 +1274,6 @@ def save_settings(data):
 
 
 if __name__ == "__main__":
+    # Conversions run in processes of their own, which a frozen build has to dispatch
+    multiprocessing.freeze_support()
     main()
@@ -86,6 +86,30 @@ def test_conversion_thread_cancel():
     assert thread._cancelled is True
 
 
+def test_conversion_thread_cancel_stops_the_process(monkeypatch):
+    from gui import qt_app
+
+    thread = qt_app.ConversionThread(["/file1.mp4"], "mp3", "/out")
+    updates, finished = [], []
+    thread.progress_updated.connect(updates.append)
+    thread.conversion_finished.connect(lambda *a: finished.append(a))
+
+    def fake_run_in_process(job_id, target, args, publish, cancel=None):
+        # Progress is pushed as the process publishes it, until cancelled
+        publish({"status": "processing", "progress": 5, "total": 10})
+        thread.cancel()
+        assert cancel.is_set()
+        publish({"status": "cancelled"})
+        return -9
+
+    monkeypatch.setattr(qt_app, "run_in_process", fake_run_in_process)
+    thread.run()
+
+    assert updates[1]["progress"] == 50
+    assert updates[-1]["status"] == "cancelled"
+    assert finished == []
+
+
 def test_conversion_thread_job_id_unique():
     from gui.qt_app import ConversionThread
     thread1 = ConversionThread(["/file1.mp4"], "mp3", "/out")
@@ -243,6 +267,122 @@ def test_file_list_performance_large_batch(main_window, tmp_path):
     assert elapsed < 1.0, f"Adding 100 files took {elapsed:.2f}s, should be < 1s"
 
 
+def _process_events_until(qapp, condition, timeout=10.0):
+    import time
+
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_folder_batch_is_checked_in_background(main_window, qapp, tmp_path):
+    for i in range(5000):
+        (tmp_path / f"clip_{i:04d}.mp4").touch()
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "song.mp3").touch()
+
+    main_window.add_files_batch([str(tmp_path), "/nonexistent/file.mp4"])
+    assert _process_events_until(qapp, lambda: not main_window.file_model.scanning)
+
+    assert main_window.file_list.count() == 5001
+    assert str(tmp_path / "sub" / "song.mp3") in main_window._file_paths_set
+    assert main_window.file_count_label.text().startswith("5001")
+    # Listed already, nothing added twice
+    main_window.add_files_batch([str(tmp_path)])
+    assert _process_events_until(qapp, lambda: not main_window.file_model.scanning)
+    assert main_window.file_list.count() == 5001
+
+
+def test_file_metadata_is_looked_up_lazily(main_window, qapp, tmp_path):
+    from PyQt6.QtCore import Qt
+
+    test_file = tmp_path / "notes.txt"
+    test_file.write_bytes(b"x" * 2048)
+    main_window.add_file_to_list(str(test_file))
+    model = main_window.file_model
+    index = model.index(0)
+
+    assert model.data(index) == "notes.txt"
+    # Only the path until the size has been looked up in the background
+    assert model.data(index, Qt.ItemDataRole.ToolTipRole) == str(test_file)
+    assert _process_events_until(
+        qapp, lambda: "2.0 KB" in model.data(index, Qt.ItemDataRole.ToolTipRole)
+    )
+
+
+def test_thumbnails_are_made_in_background_and_cached(qapp, tmp_path, monkeypatch):
+    from PIL import Image
+    from PyQt6.QtCore import Qt
+    from gui import qt_app
+    from utils.category import Category
+    from utils.thumbnail_cache import ThumbnailCache
+
+    photo = tmp_path / "photo.jpg"
+    Image.new("RGB", (640, 480), "blue").save(photo)
+    cache = ThumbnailCache(str(tmp_path / "thumbs"))
+
+    def _shown(model):
+        model.add(str(photo))
+        model.data(model.index(0), Qt.ItemDataRole.DecorationRole)  # Asks for it
+        assert _process_events_until(qapp, lambda: str(photo) in model._icons)
+        return model._icons[str(photo)]
+
+    model = qt_app.FileListModel({"jpg": Category.IMAGE}, cache)
+    assert _shown(model) is not model._blank()
+    assert cache.stats()["entries"] == 1
+
+    # A new session takes it from disk instead of decoding the file again
+    made = []
+    monkeypatch.setattr(qt_app, "make_thumbnail", lambda *a: made.append(a))
+    model = qt_app.FileListModel({"jpg": Category.IMAGE}, ThumbnailCache(str(tmp_path / "thumbs")))
+    assert _shown(model) is not model._blank()
+    assert made == []
+
+
+def test_remove_selected_rows(main_window, tmp_path):
+    for i in range(4):
+        f = tmp_path / f"test{i}.mp4"
+        f.touch()
+        main_window.add_file_to_list(str(f))
+    selection = main_window.file_list.selectionModel()
+    from PyQt6.QtCore import QItemSelectionModel
+
+    for row in (0, 2, 3):
+        selection.select(
+            main_window.file_model.index(row), QItemSelectionModel.SelectionFlag.Select
+        )
+    main_window.remove_selected()
+
+    assert main_window.file_model.paths() == [str(tmp_path / "test1.mp4")]
+    assert main_window._file_paths_set == {str(tmp_path / "test1.mp4")}
+
+
+def test_rows_are_reordered_by_moving_them(main_window, tmp_path):
+    from PyQt6.QtCore import Qt, QModelIndex
+
+    model = main_window.file_model
+    paths = []
+    for i in range(4):
+        f = tmp_path / f"test{i}.mp4"
+        f.touch()
+        main_window.add_file_to_list(str(f))
+        paths.append(str(f))
+    assert model.flags(model.index(0)) & Qt.ItemFlag.ItemIsDragEnabled
+    assert model.flags(QModelIndex()) & Qt.ItemFlag.ItemIsDropEnabled
+    assert model.supportedDropActions() == Qt.DropAction.MoveAction
+
+    # Last to front, then the (new) first two behind the rest
+    assert model.moveRow(QModelIndex(), 3, QModelIndex(), 0)
+    assert model.paths() == [paths[3], paths[0], paths[1], paths[2]]
+    assert model.moveRows(QModelIndex(), 0, 2, QModelIndex(), 4)
+    assert model.paths() == [paths[1], paths[2], paths[3], paths[0]]
+    assert [model._rows[path] for path in model.paths()] == [0, 1, 2, 3]
+    # Onto itself is no move
+    assert not model.moveRow(QModelIndex(), 1, QModelIndex(), 2)
+
+
 def test_settings_dialog_creation(qapp):
     from gui.qt_app import SettingsDialog
     dlg = SettingsDialog(None, "English", ["English", "German", "French"])
@@ -20,11 +20,64 @@ document.addEventListener('DOMContentLoaded', function() {
 // Accumulate all selected/dropped files in this array
 let uploadedFiles = [];
 
-function submitForm(endpoint) {
+// Files go up in chunks through the resumable upload routes, so a dropped
+// connection only costs the chunk that was in flight
+const CHUNK_SIZE = 8 * 1024 * 1024;
+const CHUNK_RETRIES = 5;
+
+function busyError(response) {
+    // Server queue is full, it tells us when a slot should be free again
+    const retryAfter = response.headers.get('Retry-After');
+    return new Error(`Server busy, please retry${retryAfter ? ` in ${retryAfter}s` : ' later'}`);
+}
+
+async function createUpload(files, csrfToken) {
+    const response = await fetch('/upload', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json', 'X-CSRF-Token': csrfToken},
+        body: JSON.stringify({files: files.map(f => ({name: f.name, size: f.size}))})
+    });
+    if (response.status === 503) throw busyError(response);
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+    return response.json();
+}
+
+async function uploadFile(uploadId, file, name, offset, csrfToken, onProgress) {
+    let failures = 0;
+    while (offset < file.size) {
+        const chunk = file.slice(offset, offset + CHUNK_SIZE);
+        try {
+            const response = await fetch(`/upload/${uploadId}/${encodeURIComponent(name)}`, {
+                method: 'PATCH',
+                headers: {'Upload-Offset': String(offset), 'X-CSRF-Token': csrfToken},
+                body: chunk
+            });
+            const data = await response.json();
+            if (!response.ok && response.status !== 409) {
+                throw new Error(data.error || `HTTP error! status: ${response.status}`);
+            }
+            // On 409 the server tells where it actually stands, resume from there
+            offset = data.offset;
+            failures = 0;
+            onProgress(offset);
+        } catch (error) {
+            if (++failures > CHUNK_RETRIES) throw error;
+            await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+            // Ask where to resume, part of the chunk may have made it
+            const status = await fetch(`/upload/${uploadId}`).then(r => r.ok ? r.json() : null).catch(() => null);
+            const entry = status && status.files.find(f => f.name === name);
+            if (entry) offset = entry.offset;
+        }
+    }
+}
+
+async function submitForm(endpoint) {
     const conversionType = document.getElementById('conversion-type').value;
     const progressContainer = document.getElementById('progress-container');
+    const progressStatus = document.getElementById('progress-status');
     const errorMessage = document.getElementById('error-message');
     const csrfInput = document.querySelector('input[name="csrf_token"]');
+    const csrfToken = csrfInput ? csrfInput.value : '';
 
     if (uploadedFiles.length === 0) {
         errorMessage.style.display = 'block';
@@ -37,45 +90,84 @@ function submitForm(endpoint) {
     errorMessage.style.display = 'none';
     errorMessage.textContent = '';
 
-    // Prepare form data
-    const formData = new FormData();
-    if (csrfInput) formData.append('csrf_token', csrfInput.value);
-    uploadedFiles.forEach(file => formData.append('files', file));
-    formData.append('conversionType', conversionType);
-
     // Show loading state
     showLoader();
 
-    // Start conversion
-    fetch(endpoint, {
-        method: 'POST',
-        body: formData
-    })
-    .then(response => {
-        hideLoader();
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
+    try {
+        const files = uploadedFiles.slice();
+        const upload = await createUpload(files, csrfToken);
+        const total = files.reduce((sum, f) => sum + f.size, 0) || 1;
+        const done = upload.files.map(f => f.offset);
+        progressContainer.style.display = 'block';
+
+        const startJob = async streaming => {
+            const formData = new FormData();
+            formData.append('csrf_token', csrfToken);
+            formData.append('upload_id', upload.upload_id);
+            formData.append('conversionType', conversionType);
+            if (streaming) formData.append('stream', '1');
+            const response = await fetch(endpoint, {
+                method: 'POST',
+                body: formData
+            });
+            if (response.status === 503) throw busyError(response);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const data = await response.json();
+            if (!data.job_id) {
+                throw new Error('No job ID received from server');
+            }
+            return data;
+        };
+
+        // Plain conversions start right away and take each file as soon as it's
+        // uploaded, merging and concatenating need all files first
+        const streaming = endpoint === '/convert';
+        if (streaming) {
+            const data = await startJob(true);
+            hideLoader();
+            pollProgress(data.job_id);
+        }
+        for (let i = 0; i < files.length; i++) {
+            const entry = upload.files[i];
+            await uploadFile(upload.upload_id, files[i], entry.name, entry.offset, csrfToken, offset => {
+                done[i] = offset;
+                const percent = Math.round(done.reduce((a, b) => a + b, 0) / total * 100);
+                progressStatus.dataset.upload = percent < 100 ? `uploading ${percent}%` : '';
+                if (!streaming) progressStatus.textContent = `Uploading ${percent}%`;
+            });
         }
-        return response.json();
-    })
-    .then(data => {
-        if (!data.job_id) {
-            throw new Error('No job ID received from server');
+        if (!streaming) {
+            const data = await startJob(false);
+            hideLoader();
+            // Start polling for progress
+            pollProgress(data.job_id);
         }
-        // Start polling for progress
-        pollProgress(data.job_id);
-    })
-    .catch(error => {
+    } catch (error) {
         hideLoader();
+        progressContainer.style.display = 'none';
         errorMessage.style.display = 'block';
         errorMessage.textContent = `Error: ${error.message}`;
         console.error('Conversion error:', error);
-    })
-    .finally(() => {
+    } finally {
         // Reset file list
         uploadedFiles = [];
         document.getElementById('file-list').innerHTML = '';
-    });
+    }
+}
+
+function resetFileSelection() {
+    // Clear selected files array and visible file list
+    uploadedFiles = [];
+    const fileListEl = document.getElementById('file-list');
+    if (fileListEl) fileListEl.innerHTML = '';
+    // Reset file input element so same files can be reselected
+    const fileInput = document.getElementById('files');
+    if (fileInput) fileInput.value = '';
+    // Clear any stored job id
+    const jobIdInput = document.getElementById('job-id');
+    if (jobIdInput) jobIdInput.value = '';
 }
 
 function pollProgress(jobId) {
@@ -83,6 +175,7 @@ function pollProgress(jobId) {
     const progressBar = document.getElementById('progress-bar');
     const progressStatus = document.getElementById('progress-status');
     const errorMessage = document.getElementById('error-message');
+    const outputList = document.getElementById('progress-outputs');
 
     // Show progress UI
     progressContainer.style.display = 'block';
@@ -90,92 +183,134 @@ function pollProgress(jobId) {
     progressStatus.textContent = '';
     errorMessage.style.display = 'none';
     errorMessage.textContent = '';
+    outputList.replaceChildren();
 
-    // Start polling for progress
-    const pollInterval = setInterval(() => {
-        fetch(`/progress/${jobId}`)
-            .then(response => {
-                if (!response.ok) throw new Error('Failed to get progress');
-                return response.json();
-            })
-            .then(data => {
-                // Handle error state
-                if (data.status === 'error') {
-                    throw new Error(data.error || 'Conversion failed');
-                }
-
-                // Update progress using progress_percent if available, otherwise calculate from progress/total
-                let percent = 0;
-                if (data.progress_percent !== undefined) {
-                    percent = Math.min(100, Math.max(0, data.progress_percent));
-                } else if (data.total > 0) {
-                    percent = Math.min(100, Math.max(0, Math.round((data.progress / data.total) * 100)));
-                }
-                
-                // Smooth animation for progress bar
-                const currentWidth = parseFloat(progressBar.style.width) || 0;
-                if (Math.abs(percent - currentWidth) > 1) {
-                    progressBar.style.transition = 'width 0.3s ease-in-out';
-                    progressBar.style.width = `${percent}%`;
-                } else if (progressBar.style.transition) {
-                    // Remove transition for small updates to prevent stuttering
-                    progressBar.style.transition = 'none';
-                    progressBar.style.width = `${percent}%`;
-                } else {
-                    progressBar.style.width = `${percent}%`;
-                }
-                
-                // Update status text with more detailed information
-                let statusText = `${percent}%`;
-                if (data.status === 'processing' && data.current_bar) {
-                    statusText += ` (${data.current_bar})`;
-                }
-                progressStatus.textContent = statusText; 
-                if (percent > 0 && percent < 100) {
-                    progressBar.classList.add('active');
-                } else {
-                    progressBar.classList.remove('active');
-                }
-
-                // Handle completion
-                if (data.status === 'done') {
-                    clearInterval(pollInterval);
-                    progressStatus.textContent = '';
-                    window.location.href = `/download/${jobId}`;
-                    
-                    // Reset UI and file inputs after a short delay
-                    setTimeout(() => {
-                        progressContainer.style.display = 'none';
-                        progressBar.style.width = '0%';
-                        progressStatus.textContent = '';
-                        // Clear selected files array and visible file list
-                        uploadedFiles = [];
-                        const fileListEl = document.getElementById('file-list');
-                        if (fileListEl) fileListEl.innerHTML = '';
-                        // Reset file input element so same files can be reselected
-                        const fileInput = document.getElementById('files');
-                        if (fileInput) fileInput.value = '';
-                        // Clear any stored job id
-                        const jobIdInput = document.getElementById('job-id');
-                        if (jobIdInput) jobIdInput.value = '';
-                    }, 2000);
-                }
-            })
-            .catch(error => {
-                clearInterval(pollInterval);
-                errorMessage.style.display = 'block';
-                errorMessage.textContent = error.message || 'An error occurred during conversion';
+    // Finished outputs can be downloaded one by one while the rest are converting
+    function renderOutputs(outputs) {
+        for (const output of (outputs || []).slice(outputList.children.length)) {
+            const link = document.createElement('a');
+            link.href = output.url;
+            link.textContent = output.name;
+            link.setAttribute('download', '');
+            const item = document.createElement('li');
+            item.appendChild(link);
+            outputList.appendChild(item);
+        }
+    }
+
+    // Returns true once the job is finished
+    function render(data) {
+        // Handle error state
+        if (data.status === 'error') {
+            throw new Error(data.error || 'Conversion failed');
+        }
+
+        // Update progress using progress_percent if available, otherwise calculate from progress/total
+        let percent = 0;
+        if (data.progress_percent !== undefined) {
+            percent = Math.min(100, Math.max(0, data.progress_percent));
+        } else if (data.total > 0) {
+            percent = Math.min(100, Math.max(0, Math.round((data.progress / data.total) * 100)));
+        }
+        
+        // Smooth animation for progress bar
+        const currentWidth = parseFloat(progressBar.style.width) || 0;
+        if (Math.abs(percent - currentWidth) > 1) {
+            progressBar.style.transition = 'width 0.3s ease-in-out';
+            progressBar.style.width = `${percent}%`;
+        } else if (progressBar.style.transition) {
+            // Remove transition for small updates to prevent stuttering
+            progressBar.style.transition = 'none';
+            progressBar.style.width = `${percent}%`;
+        } else {
+            progressBar.style.width = `${percent}%`;
+        }
+        
+        // Update status text with more detailed information
+        let statusText = `${percent}%`;
+        if (data.status === 'processing' && data.current_bar) {
+            statusText += ` (${data.current_bar})`;
+        } else if (data.status === 'queued' && data.queue_position) {
+            statusText = `Queued (position ${data.queue_position})`;
+        }
+        if (progressStatus.dataset.upload) {
+            statusText += `, ${progressStatus.dataset.upload}`;
+        }
+        progressStatus.textContent = statusText; 
+        renderOutputs(data.outputs);
+        if (percent > 0 && percent < 100) {
+            progressBar.classList.add('active');
+        } else {
+            progressBar.classList.remove('active');
+        }
+
+        // Handle completion
+        if (data.status === 'done') {
+            progressStatus.textContent = '';
+            window.location.href = `/download/${jobId}`;
+            
+            // Reset UI and file inputs after a short delay
+            setTimeout(() => {
                 progressContainer.style.display = 'none';
-                // On error also reset file selection so user can try again
-                uploadedFiles = [];
-                const fileListEl = document.getElementById('file-list');
-                if (fileListEl) fileListEl.innerHTML = '';
-                const fileInput = document.getElementById('files');
-                if (fileInput) fileInput.value = '';
-                const jobIdInput = document.getElementById('job-id');
-                if (jobIdInput) jobIdInput.value = '';
-            });
-    }, 500); // Poll every 500ms
+                progressBar.style.width = '0%';
+                progressStatus.textContent = '';
+                outputList.replaceChildren();
+                resetFileSelection();
+            }, 2000);
+            return true;
+        }
+        return false;
+    }
+
+    function fail(error) {
+        errorMessage.style.display = 'block';
+        errorMessage.textContent = error.message || 'An error occurred during conversion';
+        progressContainer.style.display = 'none';
+        // On error also reset file selection so user can try again
+        resetFileSelection();
+    }
+
+    function poll() {
+        const pollInterval = setInterval(() => {
+            fetch(`/progress/${jobId}`)
+                .then(response => {
+                    if (!response.ok) throw new Error('Failed to get progress');
+                    return response.json();
+                })
+                .then(data => {
+                    if (render(data)) clearInterval(pollInterval);
+                })
+                .catch(error => {
+                    clearInterval(pollInterval);
+                    fail(error);
+                });
+        }, 500); // Poll every 500ms
+    }
+
+    if (!window.EventSource) {
+        poll();
+        return;
+    }
+
+    // The server pushes the full state once, then only fields that changed
+    const state = {};
+    let finished = false;
+    const source = new EventSource(`/progress/${jobId}/stream`);
+    source.onmessage = event => {
+        Object.assign(state, JSON.parse(event.data));
+        try {
+            finished = render(state);
+        } catch (error) {
+            finished = true;
+            fail(error);
+        }
+        if (finished) source.close();
+    };
+    source.onerror = () => {
+        // Stream ended or broke before the job finished, fall back to polling
+        source.close();
+        if (!finished) poll();
+    };
 }
 
 function triggerUploadDialogue(event) {
@@ -363,25 +363,26 @@ class TestDocumentConverterToPdf:
         mock_video_clip.assert_called_once()
 
 
+SUBTITLE_PROBE = {
+    "duration": 60.0,
+    "bitrate": 900,
+    "streams": [
+        {"index": 0, "type": "video", "codec": "h264", "language": None},
+        {"index": 1, "type": "audio", "codec": "aac", "language": "eng"},
+        {"index": 2, "type": "subtitle", "codec": "subrip", "language": "eng"},
+        {"index": 3, "type": "subtitle", "codec": "ass", "language": "ger"},
+        {"index": 4, "type": "subtitle", "codec": "hdmv_pgs_subtitle", "language": "fre"},
+    ],
+}
+
+
 class TestDocumentConverterToSubtitles:
-    @patch("subprocess.run")
-    @patch("os.path.exists")
-    @patch("os.path.getsize")
-    @patch("utils.language_support.get_translation")
+    @patch("core.converter.doc_converter.ffmpeg_utils.run")
+    @patch("core.converter.doc_converter.ffmpeg_utils.probe")
     def test_to_subtitles_success(
-        self,
-        mock_get_translation,
-        mock_getsize,
-        mock_exists,
-        mock_subprocess,
-        document_converter,
-        temp_output_dir,
+        self, mock_probe, mock_run, document_converter, temp_output_dir
     ):
-        mock_exists.return_value = True
-        mock_getsize.return_value = 100  # Non-empty file
-        mock_get_translation.return_value = "Extracting subtitles"
-        mock_subprocess.return_value = Mock()
-
+        mock_probe.return_value = SUBTITLE_PROBE
         movie_files = {
             Category.MOVIE: [("/path", "test_movie", "mp4")],
             Category.IMAGE: [],
@@ -389,36 +390,95 @@ class TestDocumentConverterToSubtitles:
         }
 
         document_converter.to_subtitles(temp_output_dir, movie_files, "srt", False)
-        mock_subprocess.assert_called()
-        document_converter.file_handler.post_process.assert_called()
+        # All text streams in one pass, the bitmap (PGS) stream is left out
+        mock_run.assert_called_once()
+        args = mock_run.call_args[0][0]
+        assert args.count("-i") == 1
+        assert [args[i + 1] for i, a in enumerate(args) if a == "-map"] == [
+            "0:2",
+            "0:3",
+        ]
+        assert os.path.join(temp_output_dir, "test_movie.eng.srt") in args
+        assert os.path.join(temp_output_dir, "test_movie.ger.srt") in args
+        assert document_converter.file_handler.post_process.call_count == 2
+
+    @patch("core.converter.doc_converter.ffmpeg_utils.run")
+    @patch("core.converter.doc_converter.ffmpeg_utils.probe")
+    def test_to_subtitles_language(
+        self, mock_probe, mock_run, document_converter, temp_output_dir
+    ):
+        mock_probe.return_value = SUBTITLE_PROBE
+        movie_files = {Category.MOVIE: [("/path", "test_movie", "mkv")]}
 
-    @patch("subprocess.run")
-    @patch("os.path.exists")
-    @patch("os.path.getsize")
-    @patch("utils.language_support.get_translation")
-    def test_to_subtitles_fallback_method(
-        self,
-        mock_get_translation,
-        mock_getsize,
-        mock_exists,
-        mock_subprocess,
-        document_converter,
-        temp_output_dir,
+        document_converter.to_subtitles(
+            temp_output_dir, movie_files, "srt", False, language="GER"
+        )
+        args = mock_run.call_args[0][0]
+        assert args[args.index("-map") + 1] == "0:3"
+        # A single stream keeps the plain output name
+        assert args[-1] == os.path.join(temp_output_dir, "test_movie.srt")
+
+    @patch("core.converter.doc_converter.ffmpeg_utils.run")
+    @patch("core.converter.doc_converter.ffmpeg_utils.probe")
+    def test_to_subtitles_skips_files_without_subtitles(
+        self, mock_probe, mock_run, document_converter, temp_output_dir
     ):
-        # Setup mocks for first attempt failure, second attempt success
-        mock_exists.side_effect = [False, True]  # First fails, second succeeds
-        mock_getsize.side_effect = [0, 100]  # First empty, second has content
-        mock_get_translation.return_value = "Extracting subtitles"
-        mock_subprocess.return_value = Mock()
+        mock_probe.return_value = {
+            "duration": 5.0,
+            "bitrate": 100,
+            "streams": [{"index": 0, "type": "video", "codec": "h264"}],
+        }
+        movie_files = {Category.MOVIE: [("/path", "a", "mp4"), ("/path", "b", "mp4")]}
 
-        movie_files = {
-            Category.MOVIE: [("/path", "test_movie", "mp4")],
-            Category.IMAGE: [],
-            Category.DOCUMENT: [],
+        document_converter.to_subtitles(temp_output_dir, movie_files, "srt", False)
+        mock_run.assert_not_called()
+        document_converter.file_handler.post_process.assert_not_called()
+
+
+    @patch("core.converter.doc_converter.ffmpeg_utils.run")
+    @patch("core.converter.doc_converter.ffmpeg_utils.probe")
+    def test_to_subtitles_same_language_streams_get_own_files(
+        self, mock_probe, mock_run, document_converter, temp_output_dir
+    ):
+        # E.g. English and English SDH
+        mock_probe.return_value = {
+            "duration": 60.0,
+            "bitrate": 900,
+            "streams": [
+                {"index": 0, "type": "video", "codec": "h264", "language": None},
+                {"index": 2, "type": "subtitle", "codec": "subrip", "language": "eng"},
+                {"index": 3, "type": "subtitle", "codec": "subrip", "language": "eng"},
+                {"index": 4, "type": "subtitle", "codec": "subrip", "language": "ger"},
+            ],
         }
+        movie_files = {Category.MOVIE: [("/path", "test_movie", "mkv")]}
 
         document_converter.to_subtitles(temp_output_dir, movie_files, "srt", False)
-        assert mock_subprocess.call_count == 2  # Both attempts called
+        args = mock_run.call_args[0][0]
+        outputs = [args[i + 4] for i, a in enumerate(args) if a == "-map"]
+        assert outputs == [
+            os.path.join(temp_output_dir, "test_movie.eng.2.srt"),
+            os.path.join(temp_output_dir, "test_movie.eng.3.srt"),
+            os.path.join(temp_output_dir, "test_movie.ger.srt"),
+        ]
+        assert document_converter.file_handler.post_process.call_count == 3
+
+    @patch("core.converter.doc_converter.ffmpeg_utils.run")
+    @patch("core.converter.doc_converter.ffmpeg_utils.probe")
+    def test_to_subtitles_equally_named_movies_get_own_files(
+        self, mock_probe, mock_run, document_converter, temp_output_dir
+    ):
+        mock_probe.return_value = SUBTITLE_PROBE
+        movie_files = {Category.MOVIE: [("/a", "test_movie", "mkv"), ("/b", "test_movie", "mkv")]}
+
+        document_converter.to_subtitles(
+            temp_output_dir, movie_files, "srt", False, language="ger"
+        )
+        outputs = [c[0][0][-1] for c in mock_run.call_args_list]
+        assert outputs == [
+            os.path.join(temp_output_dir, "test_movie.srt"),
+            os.path.join(temp_output_dir, "test_movie_1.srt"),
+        ]
 
 
 class TestDocumentConverterEdgeCases:
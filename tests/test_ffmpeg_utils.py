@@ -0,0 +1,56 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from core.utils import ffmpeg_utils
+
+# ffmpeg helper tests, probing is checked against a canned `ffmpeg -i` listing
+
+LISTING = """Input #0, matroska,webm, from 'movie.mkv':
+  Duration: 00:01:02.50, start: 0.000000, bitrate: 1250 kb/s
+  Stream #0:0: Video: h264 (High), yuv420p(progressive), 1920x1080 [SAR 1:1 DAR 16:9], 23.98 fps, 23.98 tbr, 1k tbn (default)
+  Stream #0:1(eng): Audio: aac (LC), 48000 Hz, stereo, fltp (default)
+  Stream #0:2(ger): Subtitle: subrip
+At least one output file must be specified
+"""
+
+
+@patch("core.utils.ffmpeg_utils.subprocess.run")
+def test_probe_parses_streams(mock_run):
+    mock_run.return_value = MagicMock(stderr=LISTING)
+    info = ffmpeg_utils.probe("movie.mkv")
+    assert info["duration"] == pytest.approx(62.5)
+    assert info["bitrate"] == 1250
+    video = ffmpeg_utils.first_stream(info, "video")
+    assert (video["codec"], video["width"], video["height"]) == ("h264", 1920, 1080)
+    assert video["fps"] == pytest.approx(23.98)
+    assert video["pix_fmt"] == "yuv420p"
+    audio = ffmpeg_utils.first_stream(info, "audio")
+    assert (audio["codec"], audio["sample_rate"], audio["language"]) == (
+        "aac",
+        48000,
+        "eng",
+    )
+    subtitle = ffmpeg_utils.first_stream(info, "subtitle")
+    assert (subtitle["index"], subtitle["language"]) == (2, "ger")
+
+
+@patch("core.utils.ffmpeg_utils.subprocess.run")
+def test_probe_unreadable_raises_oserror(mock_run):
+    mock_run.return_value = MagicMock(stderr="movie.mkv: Invalid data found")
+    with pytest.raises(OSError):
+        ffmpeg_utils.probe("movie.mkv")
+
+
+def test_write_concat_list_escapes_quotes(tmp_path):
+    list_path = tmp_path / "list.txt"
+    ffmpeg_utils.write_concat_list(["/a/b.mp4", "/a/it's.mp4"], str(list_path))
+    assert list_path.read_text().splitlines() == [
+        "file '/a/b.mp4'",
+        "file '/a/it'\\''s.mp4'",
+    ]
+
+
+def test_audio_codec_for_container():
+    assert ffmpeg_utils.audio_codec_for_container("mp4", "aac") == "copy"
+    assert ffmpeg_utils.audio_codec_for_container("mp4", "vorbis") == "aac"
+    assert ffmpeg_utils.audio_codec_for_container("webm", "aac") == "libopus"
+    assert ffmpeg_utils.audio_codec_for_container("mkv", "pcm_s24le") == "copy"
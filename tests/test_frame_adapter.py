@@ -0,0 +1,88 @@
+import fitz
+import numpy as np
+
+from PIL import Image
+from core.utils.frame_adapter import (
+    pixmap_to_image,
+    pixmap_to_array,
+    frame_to_pixmap,
+    frame_to_image,
+    as_rgb,
+)
+
+# Frame adapter tests, views instead of copies between fitz, numpy and PIL
+
+
+def _rendered_pixmap():
+    doc = fitz.open()
+    page = doc.new_page(width=64, height=32)
+    page.draw_rect(fitz.Rect(0, 0, 16, 16), color=(1, 0, 0), fill=(1, 0, 0))
+    pix = page.get_pixmap()
+    doc.close()
+    return pix
+
+
+def test_pixmap_to_image_matches_pixels():
+    pix = _rendered_pixmap()
+    img = pixmap_to_image(pix)
+    assert img.mode == "RGB"
+    assert img.size == (pix.width, pix.height)
+    assert img.getpixel((4, 4)) == pix.pixel(4, 4)
+    assert img.getpixel((40, 20)) == pix.pixel(40, 20)
+    # RGB is copied, the image doesn't depend on the pixmap
+    before = img.getpixel((4, 4))
+    pix.set_pixel(4, 4, (0, 0, 255))
+    assert img.getpixel((4, 4)) == before
+
+
+def test_pixmap_to_image_converts_cmyk_with_alpha():
+    pix = fitz.Pixmap(fitz.csCMYK, fitz.IRect(0, 0, 8, 4), 1)
+    pix.clear_with(0)
+    pix.set_pixel(1, 1, (0, 255, 255, 0, 255))
+    img = pixmap_to_image(pix)
+    del pix
+    assert img.mode == "RGBA"
+    assert img.size == (8, 4)
+    red, green, blue, alpha = img.getpixel((1, 1))
+    assert red > 200 and green < 60 and blue < 60 and alpha == 255
+
+
+def test_pixmap_to_array_is_a_view():
+    pix = _rendered_pixmap()
+    arr = pixmap_to_array(pix)
+    assert arr.shape == (pix.height, pix.width, 3)
+    assert np.shares_memory(arr, np.frombuffer(pix.samples_mv, dtype=np.uint8))
+
+
+def test_frame_to_pixmap_reuses_pixmap_for_same_size():
+    frame = np.zeros((10, 20, 3), dtype=np.uint8)
+    frame[..., 1] = 200
+    pix = frame_to_pixmap(frame)
+    assert pix.pixel(3, 3) == (0, 200, 0)
+
+    frame[..., 1] = 0
+    frame[..., 2] = 90
+    same = frame_to_pixmap(frame, pix)
+    assert same is pix
+    assert pix.pixel(3, 3) == (0, 0, 90)
+
+
+def test_frame_to_pixmap_allocates_on_size_change():
+    pix = frame_to_pixmap(np.zeros((10, 20, 3), dtype=np.uint8))
+    other = frame_to_pixmap(np.zeros((12, 20, 3), dtype=np.uint8), pix)
+    assert other is not pix
+    assert (other.width, other.height) == (20, 12)
+
+
+def test_frame_to_image_keeps_rgb_mode():
+    frame = np.full((8, 8, 3), 7, dtype=np.uint8)
+    img = frame_to_image(frame)
+    assert img.mode == "RGB"
+    assert img.getpixel((0, 0)) == (7, 7, 7)
+
+
+def test_as_rgb_skips_conversion_for_rgb():
+    img = Image.new("RGB", (4, 4))
+    assert as_rgb(img) is img
+    rgba = Image.new("RGBA", (4, 4))
+    assert as_rgb(rgba).mode == "RGB"
@@ -0,0 +1,60 @@
+import threading
+import pytest
+from utils.job_queue import JobQueue, QueueFullError
+
+# Job queue tests, bounded waiting list in front of a fixed worker pool
+
+
+def _blocker():
+    started, release = threading.Event(), threading.Event()
+
+    def job():
+        started.set()
+        release.wait(5)
+
+    return job, started, release
+
+
+def test_queue_limits_concurrency_and_reports_positions():
+    queue = JobQueue(workers=1, max_pending=2)
+    job, started, release = _blocker()
+    assert queue.submit("a", job) == 0
+    assert started.wait(5)
+    assert queue.submit("b", lambda: None) == 1
+    assert queue.submit("c", lambda: None) == 2
+    assert queue.position("a") == 0
+    assert queue.position("c") == 2
+    assert queue.position("unknown") is None
+    release.set()
+    queue.shutdown()
+    assert queue.stats()["pending"] == 0
+
+
+def test_full_queue_raises_with_retry_after():
+    queue = JobQueue(workers=1, max_pending=1)
+    job, started, release = _blocker()
+    queue.submit("a", job)
+    assert started.wait(5)
+    queue.submit("b", lambda: None)
+    assert not queue.has_capacity()
+    with pytest.raises(QueueFullError) as exc_info:
+        queue.submit("c", lambda: None)
+    assert 5 <= exc_info.value.retry_after <= 600
+    release.set()
+    queue.shutdown()
+
+
+def test_failing_job_keeps_worker_alive(caplog):
+    queue = JobQueue(workers=1, max_pending=4)
+    done = threading.Event()
+
+    def boom():
+        raise RuntimeError("conversion failed")
+
+    queue.submit("a", boom)
+    queue.submit("b", done.set)
+    assert done.wait(5)
+    queue.shutdown()
+    # Not swallowed silently
+    assert "Job a failed" in caplog.text
+    assert "conversion failed" in caplog.text
@@ -1,4 +1,7 @@
+import os
 import pytest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
 from utils.category import Category
 from tests.test_fixtures import (
     controller_instance,
@@ -39,3 +42,175 @@ def test_concatenating_method(
             },
             format="mp4",
         )
+
+
+def _probe_result(vcodec="h264", width=320, height=240, fps=25.0, acodec="aac"):
+    streams = [
+        {
+            "index": 0,
+            "type": "video",
+            "codec": vcodec,
+            "width": width,
+            "height": height,
+            "fps": fps,
+            "pix_fmt": "yuv420p",
+        }
+    ]
+    if acodec is not None:
+        streams.append(
+            {
+                "index": 1,
+                "type": "audio",
+                "codec": acodec,
+                "sample_rate": 48000,
+                "channels": "stereo",
+            }
+        )
+    return {"duration": 2.0, "bitrate": 500, "streams": streams}
+
+
+def _movie_paths(folder, names):
+    return {
+        Category.AUDIO: [],
+        Category.MOVIE: [((str(folder) + "/"), name, "mp4") for name in names],
+        Category.IMAGE: [],
+        Category.DOCUMENT: [],
+    }
+
+
+def test_concat_stream_copies_matching_inputs(
+    controller_instance, test_input_folder, test_output_folder
+):
+    controller_instance.output = str(test_output_folder)
+    controller_instance.framerate = None
+    controller_instance.delete = False
+    with patch(
+        "core.controller.ffmpeg_utils.probe", return_value=_probe_result()
+    ), patch("core.controller.ffmpeg_utils.run") as mock_run:
+        controller_instance.concat(
+            _movie_paths(test_input_folder, ["a", "b", "c"]), "mp4"
+        )
+    # A single pass over the concat list, no re-encode
+    assert mock_run.call_count == 1
+    args = mock_run.call_args[0][0]
+    assert args[args.index("-f") + 1] == "concat"
+    assert args[args.index("-c") + 1] == "copy"
+
+
+def test_concat_normalises_mismatched_inputs(
+    controller_instance, test_input_folder, test_output_folder
+):
+    controller_instance.output = str(test_output_folder)
+    controller_instance.framerate = None
+    controller_instance.delete = False
+    probes = [_probe_result(), _probe_result("mpeg4", 640, 480, 30.0, None)]
+    with patch(
+        "core.controller.ffmpeg_utils.probe", side_effect=probes
+    ), patch("core.controller.ffmpeg_utils.run") as mock_run:
+        controller_instance.concat(_movie_paths(test_input_folder, ["a", "b"]), "mp4")
+    # One normalising encode per input, then one stream copy of the parts
+    assert mock_run.call_count == 3
+    first, second, final = (c[0][0] for c in mock_run.call_args_list)
+    assert "scale=320:240:force_original_aspect_ratio=decrease" in first[
+        first.index("-vf") + 1
+    ]
+    assert "anullsrc=r=48000:cl=stereo" in second
+    assert final[final.index("-c") + 1] == "copy"
+
+
+def test_merge_copies_video_and_transcodes_audio_for_container(
+    controller_instance, test_input_folder, test_output_folder
+):
+    controller_instance.output = str(test_output_folder)
+    controller_instance.framerate = None
+    controller_instance.delete = False
+    audio_only = {
+        "duration": 3.0,
+        "bitrate": 128,
+        "streams": [
+            {
+                "index": 0,
+                "type": "audio",
+                "codec": "pcm_s16le",
+                "sample_rate": 44100,
+                "channels": "stereo",
+            }
+        ],
+    }
+    with patch(
+        "core.controller.ffmpeg_utils.probe",
+        side_effect=[_probe_result(acodec=None), audio_only],
+    ), patch("core.controller.ffmpeg_utils.run") as mock_run:
+        controller_instance.merge(
+            {
+                Category.MOVIE: [((str(test_input_folder) + "/"), "film", "mp4")],
+                Category.AUDIO: [((str(test_input_folder) + "/"), "film", "wav")],
+            }
+        )
+    args = mock_run.call_args[0][0]
+    assert args[args.index("-c:v") + 1] == "copy"
+    # mp4 can't carry PCM, so only the audio gets encoded
+    assert args[args.index("-c:a") + 1] == "aac"
+    assert args[-1] == str(test_output_folder / "film_merged.mp4")
+
+
+def test_merge_runs_pairs_in_parallel(
+    controller_instance, test_input_folder, test_output_folder, monkeypatch
+):
+    controller_instance.output = str(test_output_folder)
+    controller_instance.framerate = None
+    controller_instance.delete = False
+    monkeypatch.setenv("Any2Any_MAX_WORKERS", "4")
+    folder = str(test_input_folder) + "/"
+    names = ["a", "b", "c"]
+    with patch.object(
+        controller_instance,
+        "_mux_audio",
+        side_effect=lambda m, a, logger=None: f"{m[1]}_merged.mp4",
+    ) as mock_mux, patch(
+        "core.controller.ThreadPoolExecutor", wraps=ThreadPoolExecutor
+    ) as mock_pool, patch("os.cpu_count", return_value=8):
+        controller_instance.merge(
+            {
+                Category.MOVIE: [(folder, n, "mp4") for n in names],
+                Category.AUDIO: [(folder, n, "mp3") for n in names],
+            }
+        )
+    assert mock_mux.call_count == 3
+    assert mock_pool.call_args.kwargs["max_workers"] == 4
+
+
+def test_merge_pairing_index(controller_instance, test_input_folder, tmp_path):
+    folder = str(test_input_folder) + "/"
+    other = str(tmp_path) + "/"
+    # Unlisted audio next to the movie, flac outranks ogg in the supported format order
+    (test_input_folder / "loose.ogg").touch()
+    (test_input_folder / "loose.flac").touch()
+    file_paths = {
+        Category.MOVIE: [
+            (folder, "a", "mp4"),
+            (folder, "b", "mp4"),
+            (folder, "loose", "mp4"),
+            (folder, "none", "mp4"),
+        ],
+        Category.AUDIO: [(folder, "a", "mp3"), (other, "b", "flac")],
+    }
+    with patch("core.controller.os.scandir", wraps=os.scandir) as mock_scandir:
+        pairs = controller_instance._pair_movies_with_audio(file_paths, across=False)
+    assert pairs == [
+        ((folder, "a", "mp4"), (folder, "a", "mp3")),
+        ((folder, "loose", "mp4"), (folder, "loose", "flac")),
+    ]
+    # One listing for the shared folder, not one stat per movie and extension
+    assert mock_scandir.call_count == 1
+
+    pairs = controller_instance._pair_movies_with_audio(file_paths, across=True)
+    assert ((folder, "b", "mp4"), (other, "b", "flac")) in pairs
+
+
+def test_merge_pairing_finds_uppercase_extensions(controller_instance, test_input_folder):
+    folder = str(test_input_folder) + "/"
+    (test_input_folder / "clip.MP3").touch()
+    file_paths = {Category.MOVIE: [(folder, "clip", "mp4")], Category.AUDIO: []}
+    pairs = controller_instance._pair_movies_with_audio(file_paths, across=False)
+    assert pairs == [((folder, "clip", "mp4"), (folder, "clip", "MP3"))]
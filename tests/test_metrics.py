@@ -0,0 +1,31 @@
+from utils.metrics import MetricsRegistry
+
+# Prometheus exposition tests, rendered text is compared line by line
+
+
+def test_counters_and_gauges_render_with_labels():
+    registry = MetricsRegistry()
+    jobs = registry.counter("jobs_total", "Finished jobs", ("format", "status"))
+    registry.counter("bytes_total", "Bytes")
+    registry.gauge("pending", "Waiting jobs", fn=lambda: 3)
+    jobs.inc(format="mp3", status="done")
+    jobs.inc(2, format='we"ird', status="error")
+    lines = registry.render().splitlines()
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{format="mp3",status="done"} 1' in lines
+    assert 'jobs_total{format="we\\"ird",status="error"} 2' in lines
+    assert "bytes_total 0" in lines
+    assert "pending 3" in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    duration = registry.histogram("duration_seconds", "Job time", (1, 10), ("format",))
+    for value in (0.5, 4, 4, 30):
+        duration.observe(value, format="wav")
+    lines = registry.render().splitlines()
+    assert 'duration_seconds_bucket{format="wav",le="1"} 1' in lines
+    assert 'duration_seconds_bucket{format="wav",le="10"} 3' in lines
+    assert 'duration_seconds_bucket{format="wav",le="+Inf"} 4' in lines
+    assert 'duration_seconds_sum{format="wav"} 38.5' in lines
+    assert 'duration_seconds_count{format="wav"} 4' in lines
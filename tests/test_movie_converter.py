@@ -50,7 +50,7 @@ def test_to_movie_from_jpgs(mock_concat, mock_imageclip, mock_converter):
 @patch("core.converter.movie_converter.ImageClip")
 @patch("core.converter.movie_converter.concatenate_videoclips")
 @patch("core.converter.movie_converter.fitz.open")
-@patch("core.converter.movie_converter.Image.frombytes")
+@patch("core.converter.movie_converter.pixmap_to_image")
 @patch("os.listdir")
 @patch("os.makedirs")
 @patch("shutil.rmtree")
@@ -58,7 +58,7 @@ def test_to_movie_pdf_to_video(
     mock_rmtree,
     mock_makedirs,
     mock_listdir,
-    mock_frombytes,
+    mock_pixmap_to_image,
     mock_fitz_open,
     mock_concat,
     mock_imageclip,
@@ -72,7 +72,6 @@ def test_to_movie_pdf_to_video(
     mock_doc.__len__.return_value = 1
     mock_doc.load_page.return_value = page
     mock_fitz_open.return_value = mock_doc
-    mock_frombytes.return_value.convert.return_value = MagicMock()
     mock_listdir.return_value = ["file-0.jpeg"]
     mock_concat.return_value = MagicMock()
 
@@ -137,6 +136,60 @@ def test_to_protocol_hls(mock_run, mock_converter):
     mock_converter.file_handler.post_process.assert_called()
 
 
+def test_hls_ladder_never_upscales(mock_converter):
+    source = {
+        "duration": 10.0,
+        "bitrate": 1000,
+        "streams": [{"type": "video", "height": 480, "bitrate": 900}],
+    }
+    rungs = mock_converter._hls_ladder(source)
+    assert [r[0] for r in rungs] == [240, 360, 480]
+    # No rung asks for more bitrate than the source carries
+    assert max(r[1] for r in rungs) == 900
+
+
+def test_hls_ladder_tiny_source(mock_converter):
+    source = {"bitrate": None, "streams": [{"type": "video", "height": 145}]}
+    assert [r[0] for r in mock_converter._hls_ladder(source)] == [144]
+
+
+def test_hls_command_single_decode(mock_converter):
+    rungs = [(240, 400, 64), (360, 800, 96)]
+    cmd = mock_converter._hls_command("in.mp4", "out", rungs, has_audio=True)
+    assert cmd.count("-i") == 1
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph.startswith("[0:v:0]split=2[s0][s1]")
+    assert "scale=-2:360" in graph
+    assert cmd[cmd.index("-master_pl_name") + 1] == "master.m3u8"
+    assert (
+        cmd[cmd.index("-var_stream_map") + 1]
+        == "v:0,a:0,name:240p v:1,a:1,name:360p"
+    )
+
+
+def test_cmaf_command_writes_both_manifests(mock_converter):
+    rungs = [(240, 400, 64), (480, 1400, 128)]
+    cmd = mock_converter._dash_command(
+        "in.mp4", "out/manifest.mpd", rungs, has_audio=True, hls_playlist=True
+    )
+    assert cmd[cmd.index("-f") + 1] == "dash"
+    assert cmd[cmd.index("-hls_playlist") + 1] == "1"
+    assert cmd[cmd.index("-hls_master_name") + 1] == "master.m3u8"
+    # One shared audio stream for all video renditions
+    assert cmd.count("0:a:0") == 1
+    assert "-single_file" not in cmd
+    assert cmd[-1] == "out/manifest.mpd"
+
+
+def test_dash_command_single_file(mock_converter):
+    cmd = mock_converter._dash_command(
+        "in.mp4", "manifest.mpd", [(240, 400, 64)], has_audio=False, single_file=True
+    )
+    assert cmd[cmd.index("-single_file") + 1] == "1"
+    assert "-hls_playlist" not in cmd
+    assert cmd[cmd.index("-adaptation_sets") + 1] == "id=0,streams=v"
+
+
 @patch("core.converter.movie_converter.subprocess.run", side_effect=Exception("fail"))
 def test_to_protocol_dash_fails(mock_run, mock_converter):
     movie = ("dir", "video", "mp4")
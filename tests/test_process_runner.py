@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+import pytest
+from utils.process_runner import run_in_process, new_inbox
+
+# Out-of-process job tests, targets live at module level so the spawned child can import them
+
+
+def _progressing_job(job_id, progress_dict, steps):
+    progress_dict[job_id] = {"status": "processing", "progress": 0}
+    for i in range(1, steps + 1):
+        progress_dict[job_id]["progress"] = i
+        time.sleep(0.05)
+    progress_dict[job_id]["status"] = "done"
+
+
+def _failing_job(job_id, progress_dict):
+    progress_dict[job_id] = {"status": "processing"}
+    raise ValueError("bad input")
+
+
+def _inbox_job(job_id, progress_dict, inbox):
+    progress_dict[job_id] = {"status": "processing", "seen": []}
+    while (item := inbox.get()) is not None:
+        progress_dict[job_id]["seen"] = progress_dict[job_id]["seen"] + [item]
+    progress_dict[job_id]["status"] = "done"
+
+
+def _crashing_job(job_id, progress_dict):
+    progress_dict[job_id] = {"status": "processing"}
+    os._exit(3)
+
+
+def _spawning_job(job_id, progress_dict):
+    # Stands in for a conversion running ffmpeg
+    helper = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    progress_dict[job_id] = {"status": "processing", "helper": helper.pid}
+    time.sleep(60)
+
+
+def _running(pid: int) -> bool:
+    # Zombies don't count, nobody might reap them in a container
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return False
+
+
+def test_progress_is_published_to_parent():
+    snapshots = []
+    assert run_in_process("job", _progressing_job, (4,), snapshots.append) == 0
+    assert snapshots[-1] == {"status": "done", "progress": 4}
+    # Only changes are sent, never the same state twice in a row
+    assert all(a != b for a, b in zip(snapshots, snapshots[1:]))
+
+
+def test_exception_in_child_is_reported():
+    state = {}
+    assert run_in_process("job", _failing_job, (), state.update) != 0
+    assert state["status"] == "error"
+    assert state["error"] == "bad input"
+    assert "completed_at" in state
+
+
+def test_crashing_child_leaves_parent_running():
+    state = {}
+    assert run_in_process("job", _crashing_job, (), state.update) == 3
+    assert state["status"] == "error"
+    assert "code 3" in state["error"]
+
+
+def test_running_job_takes_work_from_inbox():
+    inbox = new_inbox()
+    for item in ("a", "b", None):
+        inbox.put(item)
+    state = {}
+    assert run_in_process("job", _inbox_job, (inbox,), state.update) == 0
+    assert state == {"status": "done", "seen": ["a", "b"]}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_cancel_kills_job_and_its_subprocesses():
+    cancel = threading.Event()
+    state = {}
+
+    def publish(snapshot):
+        state.update(snapshot)
+        if "helper" in snapshot:
+            cancel.set()
+
+    started = time.time()
+    assert run_in_process("job", _spawning_job, (), publish, cancel=cancel) != 0
+    assert time.time() - started < 30
+    assert state["status"] == "cancelled"
+    deadline = time.time() + 5
+    while _running(state["helper"]) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not _running(state["helper"])
@@ -7,8 +7,12 @@ from utils.prog_logger import ProgLogger
 
 
 class MockTqdm:
-    def __init__(self, total=None, unit=None, dynamic_ncols=None, leave=None):
+    def __init__(
+        self, total=None, unit=None, dynamic_ncols=None, leave=None, desc=None, position=None
+    ):
         self.total = total
+        self.desc = desc
+        self.position = position
         self.unit = unit
         self.dynamic_ncols = dynamic_ncols
         self.leave = leave
@@ -143,3 +147,124 @@ def test_set_error_sets_error_state():
 def test_set_error_without_job_does_nothing():
     logger = ProgLogger(job_id=None, shared_progress_dict={})
     logger.set_error("irrelevant")  # Must not raise
+
+
+class CountingEntry(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.updates = 0
+
+    def update(self, *args, **kwargs):
+        self.updates += 1
+        super().update(*args, **kwargs)
+
+
+def test_parallel_tasks_are_aggregated_and_publishing_is_throttled():
+    import threading
+
+    shared = {}
+    logger = ProgLogger(job_id="job-5", shared_progress_dict=shared, is_web=True)
+    shared["job-5"] = CountingEntry(total_files=8, status="processing")
+    seen_bars = []
+
+    def convert():
+        # Every worker reports under the same bar name, as moviepy does
+        logger(chunk__total=2000)
+        for i in range(2001):
+            logger(chunk__index=i)
+        seen_bars.append(logger.bars["chunk"]["index"])
+
+    threads = [threading.Thread(target=convert) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    entry = shared["job-5"]
+    assert seen_bars == [2000] * 8
+    assert entry["completed_files"] == 8
+    assert entry["progress_percent"] == 100
+    # Throttled: a few forced updates per task, not one per chunk
+    assert entry.updates < 200
+    # proglog keeps no per-chunk log lines
+    assert logger.logs == []
+
+
+def test_update_job_merges_fields_under_lock():
+    shared = {}
+    logger = ProgLogger(job_id="job-6", shared_progress_dict=shared)
+    logger.update_job(status="merging video 1/2", progress=1, total=2)
+    assert shared["job-6"]["status"] == "merging video 1/2"
+    assert shared["job-6"]["total"] == 2
+    assert "last_updated" in shared["job-6"]
+    ProgLogger().update_job(status="ignored")  # No job, must not raise
+
+
+def test_batch_progress_is_weighted_by_expected_work(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(prog_mod.time, "time", lambda: clock[0])
+    shared = {}
+    logger = ProgLogger(job_id="job-7", shared_progress_dict=shared, is_web=True)
+    shared["job-7"].update(total_files=3, status="processing")
+    film, clip, song = ("d/", "film", "mp4"), ("d/", "clip", "mp4"), ("d/", "song", "mp3")
+    logger.start_batch({film: 50.0, clip: 25.0, song: 25.0})
+
+    logger.file_done(film)
+    entry = shared["job-7"]
+    assert entry["weighted"] is True
+    assert entry["progress_percent"] == 50
+    assert entry["completed_files"] == 1
+    assert entry["eta_seconds"] is None  # No throughput measured yet
+
+    clock[0] = 5.0
+    logger.file_done(clip)
+    # 25 units of work in 5 s, 25 left
+    assert entry["progress_percent"] == 75
+    assert entry["eta_seconds"] == 5.0
+    assert entry["time_remaining"] == "5s"
+    logger.end_batch()
+
+
+def test_tasks_get_their_own_logger_and_terminal_line(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(prog_mod, "tqdm", MockTqdm)
+    logger = ProgLogger()
+    seen = {}
+    both_started = threading.Barrier(2)
+
+    def convert(name):
+        with logger.task(name) as task_logger:
+            task_logger(chunk__total=10)
+            task_logger(chunk__index=1)
+            both_started.wait()
+            seen[name] = (task_logger.tqdm_bar.desc, task_logger.tqdm_bar.position)
+            both_started.wait()
+            for i in range(2, 11):
+                task_logger(chunk__index=i)
+
+    threads = [threading.Thread(target=convert, args=(n,)) for n in ("a.mp4", "b.mp4")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # One line each, labelled by file, freed again afterwards
+    assert seen["a.mp4"][0] == "a.mp4" and seen["b.mp4"][0] == "b.mp4"
+    assert sorted(pos for _, pos in seen.values()) == [0, 1]
+    assert logger._tasks == {} and logger._slots == set()
+
+
+def test_unfinished_task_is_dropped_on_exit(monkeypatch):
+    monkeypatch.setattr(prog_mod, "tqdm", MockTqdm)
+    shared = {}
+    logger = ProgLogger(job_id="job-8", shared_progress_dict=shared, is_web=True)
+    try:
+        with logger.task("broken.mp4") as task_logger:
+            task_logger(chunk__total=10)
+            task_logger(chunk__index=3)
+            raise RuntimeError("conversion failed")
+    except RuntimeError:
+        pass
+    assert logger._tasks == {}
+    assert logger.current_bar is None  # Back to the thread's own logger
@@ -0,0 +1,63 @@
+import threading
+import pytest
+from utils.progress_store import (
+    MemoryProgressStore,
+    ProgressStore,
+    SQLiteProgressStore,
+    open_progress_store,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryProgressStore()
+    return SQLiteProgressStore(str(tmp_path / "progress.db"), poll_interval=0.01)
+
+
+def test_update_merges_and_bumps_version(store):
+    assert store.get("job") is None and store.version("job") == 0
+    store.set("job", {"status": "queued", "progress": 0})
+    store.update("job", {"progress": 5})
+    assert store.get("job") == {"status": "queued", "progress": 5}
+    assert store.version("job") == 2
+    assert "job" in store
+    store.delete("job")
+    assert "job" not in store
+
+
+def test_wait_returns_on_change(store):
+    store.set("job", {"status": "processing"})
+    version = store.version("job")
+    # Nothing changes, times out with the same version
+    assert store.wait("job", version, timeout=0.05) == version
+    timer = threading.Timer(0.05, store.update, ("job", {"status": "done"}))
+    timer.start()
+    assert store.wait("job", version, timeout=5) > version
+    timer.join()
+
+
+def test_reap_drops_only_old_finished_jobs(store):
+    store.set("old", {"status": "done", "completed_at": 100.0})
+    store.set("recent", {"status": "error", "completed_at": 300.0})
+    store.set("running", {"status": "processing"})
+    assert store.reap(200.0) == 1
+    assert [j in store for j in ("old", "recent", "running")] == [False, True, True]
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    url = f"sqlite:///{tmp_path / 'progress.db'}"
+    writer, reader = open_progress_store(url), open_progress_store(url)
+    writer.set("job", {"status": "processing", "progress": 3})
+    assert reader.get("job") == {"status": "processing", "progress": 3}
+    with pytest.raises(ValueError):
+        open_progress_store("redis://localhost")
+
+
+def test_store_must_implement_every_operation():
+    class Partial(ProgressStore):
+        def get(self, job_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,54 @@
+from utils.ttl_cache import TTLCache
+from utils.rate_limit import RateLimiter
+
+# Rate limiter and TTL store tests, time is driven by a fake clock
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    limiter = RateLimiter(capacity=3, window=30, clock=clock)
+    assert [limiter.allow("1.2.3.4") for _ in range(4)] == [True, True, True, False]
+    assert limiter.allow("5.6.7.8")
+    assert limiter.retry_after("1.2.3.4") == 10
+    clock.now += 10
+    assert limiter.allow("1.2.3.4")
+    assert not limiter.allow("1.2.3.4")
+
+
+def test_idle_buckets_are_evicted():
+    clock = FakeClock()
+    limiter = RateLimiter(capacity=2, window=60, clock=clock)
+    for i in range(100):
+        limiter.allow(f"10.0.0.{i}")
+    clock.now += 61
+    limiter.allow("10.0.1.1")
+    assert len(limiter._buckets) == 1
+
+
+def test_ttl_cache_expires_unused_entries():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    clock.now += 6
+    # Reading refreshes an entry
+    assert cache.get("a") == 1
+    clock.now += 6
+    assert "b" not in cache
+    assert cache.get("a") == 1
+
+
+def test_ttl_cache_is_capped():
+    cache = TTLCache(ttl=3600, max_entries=3)
+    for key in "abcde":
+        cache.set(key, key)
+    assert len(cache) == 3
+    assert "a" not in cache and "e" in cache
@@ -0,0 +1,103 @@
+import os
+import time
+import shutil
+from unittest.mock import patch
+from utils.result_cache import ResultCache, fingerprint
+
+# Result reuse tests, outputs are small files in a temporary tree
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _output(tmp_path, name="out", content=b"converted"):
+    out = tmp_path / name
+    (out / "sub").mkdir(parents=True)
+    (out / "sub" / "a.wav").write_bytes(content)
+    return out
+
+
+def test_fingerprint_depends_on_names_contents_and_target():
+    base = fingerprint({"a.mp3": "h1", "b.mp3": "h2"}, "wav")
+    assert base == fingerprint({"b.mp3": "h2", "a.mp3": "h1"}, "wav")
+    assert base != fingerprint({"a.mp3": "h1", "b.mp3": "h3"}, "wav")
+    assert base != fingerprint({"a.mp3": "h1", "c.mp3": "h2"}, "wav")
+    assert base != fingerprint({"a.mp3": "h1", "b.mp3": "h2"}, "flac")
+    assert base != fingerprint({"a.mp3": "h1", "b.mp3": "h2"}, "wav", "concat")
+
+
+def test_lookup_serves_stored_result_and_counts(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.store("k", str(_output(tmp_path)))
+    assert not cache.lookup("other", str(tmp_path / "miss"))
+    assert cache.lookup("k", str(tmp_path / "hit"))
+    assert (tmp_path / "hit" / "sub" / "a.wav").read_bytes() == b"converted"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] == len(b"converted")
+
+
+def test_entries_expire_and_respect_size_cap(tmp_path):
+    clock = FakeClock()
+    cache = ResultCache(str(tmp_path / "cache"), ttl=60, max_bytes=10, clock=clock)
+    cache.store("old", str(_output(tmp_path, "o1", b"123456")))
+    cache.store("new", str(_output(tmp_path, "o2", b"654321")))
+    # Both together exceed 10 bytes, the older one goes
+    assert cache.stats()["entries"] == 1
+    assert not list((tmp_path / "cache").glob("*/old"))
+    clock.now += 61
+    cache.purge()
+    assert cache.stats()["entries"] == 0
+    assert not cache.lookup("new", str(tmp_path / "dest"))
+
+
+def test_entry_removed_from_disk_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.store("k", str(_output(tmp_path)))
+    shutil.rmtree(tmp_path / "cache")
+    assert not cache.lookup("k", str(tmp_path / "dest"))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (0, 1, 0, 0)
+
+
+def test_caches_sharing_a_root_keep_each_others_entries(tmp_path):
+    root = tmp_path / "cache"
+    first = ResultCache(str(root))
+    first.store("a", str(_output(tmp_path, "o1", b"first")))
+    # E.g. another server process starting up later
+    second = ResultCache(str(root))
+    second.store("b", str(_output(tmp_path, "o2", b"second")))
+    assert first.lookup("a", str(tmp_path / "d1"))
+    assert second.lookup("b", str(tmp_path / "d2"))
+    assert not second.lookup("a", str(tmp_path / "d3"))
+
+
+def test_first_store_clears_only_stale_leftovers(tmp_path):
+    root = tmp_path / "cache"
+    stale = root / "previous_run" / "k"
+    stale.mkdir(parents=True)
+    old = time.time() - 7200
+    os.utime(root / "previous_run", (old, old))
+    (root / "recent").mkdir()
+    cache = ResultCache(str(root), ttl=3600)
+    cache.store("k", str(_output(tmp_path)))
+    assert not (root / "previous_run").exists()
+    assert (root / "recent").exists()
+
+
+def test_forked_processes_store_apart(tmp_path):
+    # One cache object, inherited by two worker processes
+    cache = ResultCache(str(tmp_path / "cache"))
+    with patch("utils.result_cache.os.getpid", return_value=101):
+        cache.store("a", str(_output(tmp_path, "o1")))
+    with patch("utils.result_cache.os.getpid", return_value=102):
+        cache.store("b", str(_output(tmp_path, "o2")))
+    assert sorted(p.name for p in (tmp_path / "cache").iterdir()) == [
+        f"101_{cache._id}",
+        f"102_{cache._id}",
+    ]
@@ -0,0 +1,40 @@
+import os
+from utils.thumbnail_cache import ThumbnailCache
+
+# Thumbnail cache tests, entries are a few bytes each in a temporary directory
+
+
+def test_key_follows_path_mtime_and_size(tmp_path):
+    f = tmp_path / "a.jpg"
+    f.write_bytes(b"one")
+    key = ThumbnailCache.key(str(f))
+    assert key == ThumbnailCache.key(str(f))
+    os.utime(f, ns=(0, 10**9))
+    assert ThumbnailCache.key(str(f)) != key
+    assert ThumbnailCache.key(str(tmp_path / "missing.jpg")) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), max_bytes=30)
+    for key in ("a", "b", "c"):
+        cache.put(key, b"x" * 10)
+    assert cache.get("a") == b"x" * 10  # a is now the most recent
+    cache.put("d", b"y" * 10)
+    assert cache.get("b") is None
+    assert [cache.get(k) is not None for k in ("a", "c", "d")] == [True, True, True]
+    assert cache.stats()["bytes"] == 30
+    assert sorted(os.listdir(tmp_path / "thumbs")) == ["a.png", "c.png", "d.png"]
+
+
+def test_entries_and_their_order_survive_a_restart(tmp_path):
+    root = str(tmp_path / "thumbs")
+    cache = ThumbnailCache(root, max_bytes=20)
+    cache.put("old", b"1" * 10)
+    cache.put("new", b"2" * 10)
+    os.utime(os.path.join(root, "old.png"), (1, 1))
+
+    reopened = ThumbnailCache(root, max_bytes=20)
+    assert reopened.stats()["entries"] == 2
+    reopened.put("newest", b"3" * 10)
+    assert reopened.get("old") is None
+    assert reopened.get("new") == b"2" * 10
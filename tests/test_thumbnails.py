@@ -0,0 +1,40 @@
+from io import BytesIO
+import fitz
+from PIL import Image
+from utils.category import Category
+from core.utils import ffmpeg_utils
+from core.utils.thumbnails import make_thumbnail, THUMBNAIL_SIZE
+
+
+def _size(data: bytes) -> tuple:
+    with Image.open(BytesIO(data)) as img:
+        return img.size
+
+
+def test_image_thumbnail_is_scaled_down(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (1600, 800), "red").save(path)
+    assert _size(make_thumbnail(str(path), Category.IMAGE)) == (THUMBNAIL_SIZE, THUMBNAIL_SIZE // 2)
+
+
+def test_document_thumbnail_is_its_first_page(tmp_path):
+    path = tmp_path / "doc.pdf"
+    with fitz.open() as doc:
+        doc.new_page(width=600, height=800)
+        doc.save(str(path))
+    assert _size(make_thumbnail(str(path), Category.DOCUMENT)) == (72, THUMBNAIL_SIZE)
+
+
+def test_movie_thumbnail_is_a_keyframe(tmp_path):
+    path = tmp_path / "clip.mp4"
+    ffmpeg_utils.run(
+        ["-f", "lavfi", "-i", "testsrc=size=320x240:rate=10", "-t", "1", str(path)]
+    )
+    assert _size(make_thumbnail(str(path), Category.MOVIE)) == (THUMBNAIL_SIZE, 72)
+
+
+def test_nothing_to_show_gives_none(tmp_path):
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not an image")
+    assert make_thumbnail(str(path), Category.IMAGE) is None
+    assert make_thumbnail(str(path), Category.AUDIO) is None
@@ -0,0 +1,414 @@
+import io
+import os
+import time
+import json
+import queue
+import zipfile
+import threading
+import pytest
+import web_to_any
+from unittest.mock import MagicMock, patch
+from utils.job_queue import JobQueue
+from utils.result_cache import ResultCache
+from utils.progress_store import MemoryProgressStore
+from utils.prog_logger import ProgLogger
+from core.utils.file_handler import FileHandler
+
+# Web server tests, conversions themselves are mocked out
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setitem(
+        web_to_any.app.config, "UPLOADED_FILES_DEST", str(tmp_path / "uploads")
+    )
+    monkeypatch.setitem(
+        web_to_any.app.config, "CONVERTED_FILES_DEST", str(tmp_path / "converted")
+    )
+    with patch("web_to_any.validate_csrf_token", return_value=True):
+        yield web_to_any.app.test_client()
+
+
+@pytest.fixture
+def busy_queue(monkeypatch):
+    # Single worker kept busy until the test releases it
+    queue = JobQueue(workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+    queue.submit("00000000", lambda: (started.set(), release.wait(5)))
+    assert started.wait(5)
+    monkeypatch.setattr(web_to_any, "job_queue", queue)
+    yield queue
+    release.set()
+    queue.shutdown()
+
+
+def _post(client, name="a.mp3"):
+    return client.post(
+        "/convert",
+        data={
+            "csrf_token": "token",
+            "conversionType": "wav",
+            "files": (io.BytesIO(b"\x00" * 16), name),
+        },
+        content_type="multipart/form-data",
+    )
+
+
+def test_queued_job_reports_position(client, busy_queue):
+    with patch("web_to_any._run_conversion"):
+        response = _post(client)
+        assert response.status_code == 202
+        job_id = response.get_json()["job_id"]
+        assert response.get_json()["queue_position"] == 1
+
+        progress = client.get(f"/progress/{job_id}").get_json()
+        assert progress["status"] == "queued"
+        assert progress["queue_position"] == 1
+
+
+def test_job_failing_outside_its_process_ends_as_error(client, monkeypatch):
+    store = MemoryProgressStore()
+    monkeypatch.setattr(web_to_any, "progress_store", store)
+    queue = JobQueue(workers=1, max_pending=1)
+    monkeypatch.setattr(web_to_any, "job_queue", queue)
+    with patch("web_to_any.run_in_process", side_effect=OSError("can't start process")):
+        job_id = _post(client).get_json()["job_id"]
+        queue.shutdown()
+    entry = store.get(job_id)
+    assert entry["status"] == "error"
+    assert entry["error"] == "can't start process"
+    assert entry["completed_at"] > 0
+
+
+def test_full_queue_returns_503_with_retry_after(client, busy_queue, tmp_path):
+    with patch("web_to_any._run_conversion"):
+        assert _post(client).status_code == 202
+        response = _post(client)
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 5
+    # The rejected upload was never stored
+    assert len(list(tmp_path.glob("uploads_*"))) == 1
+
+
+def test_download_streams_zip_and_cleans_up(client, tmp_path):
+    out_dir = tmp_path / "converted_abcdef12"
+    (out_dir / "sub").mkdir(parents=True)
+    (out_dir / "clip.mp4").write_bytes(b"\x00" * 4096)
+    (out_dir / "sub" / "notes.txt").write_text("subtitle " * 200)
+
+    response = client.get("/download/abcdef12")
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert "any_to_any_-_converted_abcdef12.zip" in response.headers["Content-Disposition"]
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        assert archive.testzip() is None
+        clip = archive.getinfo("converted_abcdef12/clip.mp4")
+        notes = archive.getinfo("converted_abcdef12/sub/notes.txt")
+        # Already compressed media is stored, the rest deflated
+        assert clip.compress_type == zipfile.ZIP_STORED
+        assert notes.compress_type == zipfile.ZIP_DEFLATED
+        assert archive.read(notes) == ("subtitle " * 200).encode()
+    response.close()
+    assert not out_dir.exists()
+
+
+def test_single_output_is_served_directly_with_ranges(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(web_to_any, "_served_outputs", {})
+    out_dir = tmp_path / "converted_abcdef13"
+    out_dir.mkdir()
+    data = bytes(range(256)) * 16
+    (out_dir / "clip.mp4").write_bytes(data)
+
+    response = client.get("/download/abcdef13")
+    assert response.status_code == 200
+    assert response.mimetype == "video/mp4"
+    assert "clip.mp4" in response.headers["Content-Disposition"]
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.get_data() == data
+    etag = response.headers["ETag"]
+    response.close()
+
+    partial = client.get("/download/abcdef13", headers={"Range": "bytes=1000-1999"})
+    assert partial.status_code == 206
+    assert partial.headers["Content-Range"] == f"bytes 1000-1999/{len(data)}"
+    assert partial.get_data() == data[1000:2000]
+    partial.close()
+
+    assert client.get("/download/abcdef13", headers={"If-None-Match": etag}).status_code == 304
+    # Kept for further range requests, dropped once idle
+    web_to_any._reap_served_outputs(now=os.path.getmtime(out_dir) + 10)
+    assert out_dir.exists()
+    web_to_any._reap_served_outputs(now=os.path.getmtime(out_dir) + web_to_any._JOB_TTL + 1)
+    assert not out_dir.exists()
+
+
+def test_outputs_are_downloadable_while_job_runs(client, tmp_path, monkeypatch):
+    store = MemoryProgressStore()
+    monkeypatch.setattr(web_to_any, "progress_store", store)
+    monkeypatch.setattr(web_to_any, "_served_outputs", {})
+    cv_dir = tmp_path / "converted_abcdef14"
+    cv_dir.mkdir()
+    progress = {}
+    ctrl = MagicMock()
+    ctrl.prog_logger.job_id = "abcdef14"
+    ctrl.prog_logger.shared_progress_dict = progress
+    ctrl.file_handler = FileHandler(MagicMock())
+    seen = {}
+
+    def run(**kwargs):
+        (cv_dir / "a.mp3").write_bytes(b"first")
+        ctrl.file_handler.post_process(("x/", "a", "wav"), str(cv_dir / "a.mp3"), False)
+        # What the parent has received from the conversion process so far
+        store.set("abcdef14", progress["abcdef14"])
+        seen["payload"] = client.get("/progress/abcdef14").get_json()
+        seen["file"] = client.get("/download/abcdef14/a.mp3").get_data()
+        # The job is still writing here, however long it takes
+        web_to_any._reap_served_outputs(now=time.time() + web_to_any._JOB_TTL + 1)
+        (cv_dir / "b.mp3").write_bytes(b"second")
+
+    ctrl.run.side_effect = run
+    web_to_any.send_to_backend(
+        ctrl, [str(tmp_path / "in")], "mp3", str(cv_dir), 0, "high", None, False, False
+    )
+    assert seen["payload"]["status"] == "processing"
+    assert seen["payload"]["outputs"] == [{"name": "a.mp3", "url": "/download/abcdef14/a.mp3"}]
+    assert seen["file"] == b"first"
+    assert progress["abcdef14"]["status"] == "done"
+    assert (cv_dir / "b.mp3").read_bytes() == b"second"
+    store.set("abcdef14", progress["abcdef14"])
+    web_to_any._reap_served_outputs(now=time.time() + web_to_any._JOB_TTL + 1)
+    assert not cv_dir.exists()
+    # Only files inside the job's own output directory
+    assert client.get("/download/abcdef14/..%2Fconverted_abcdef13%2Fx").status_code == 400
+    assert client.get("/download/abcdef14/missing.mp3").status_code == 404
+
+
+def _patch_chunk(client, upload_id, name, offset, data):
+    return client.patch(
+        f"/upload/{upload_id}/{name}",
+        data=data,
+        headers={"Upload-Offset": str(offset), "X-CSRF-Token": "token"},
+    )
+
+
+def test_chunked_upload_resumes_and_feeds_conversion(client, tmp_path):
+    payload = bytes(range(256)) * 40
+    response = client.post(
+        "/upload",
+        json={"files": [{"name": "my song.mp3", "size": len(payload)}]},
+        headers={"X-CSRF-Token": "token"},
+    )
+    assert response.status_code == 201
+    upload_id = response.get_json()["upload_id"]
+    assert response.get_json()["files"] == [
+        {"name": "my_song.mp3", "size": len(payload), "offset": 0}
+    ]
+
+    assert _patch_chunk(client, upload_id, "my_song.mp3", 0, payload[:4000]).get_json()[
+        "offset"
+    ] == 4000
+    # A chunk resent after a lost reply is refused with the offset to resume from
+    stale = _patch_chunk(client, upload_id, "my_song.mp3", 0, payload[:4000])
+    assert stale.status_code == 409
+    assert stale.get_json()["offset"] == 4000
+    assert client.get(f"/upload/{upload_id}").get_json()["complete"] is False
+
+    # Converting before the last chunk is in is refused
+    form = {"csrf_token": "token", "conversionType": "wav", "upload_id": upload_id}
+    with patch("web_to_any._run_conversion"):
+        assert client.post("/convert", data=form).status_code == 409
+        last = _patch_chunk(client, upload_id, "my_song.mp3", 4000, payload[4000:])
+        assert last.get_json() == {
+            "name": "my_song.mp3",
+            "offset": len(payload),
+            "complete": True,
+        }
+        response = client.post("/convert", data=form)
+    assert response.status_code == 202
+    assert response.get_json()["job_id"] == upload_id
+    assert (tmp_path / f"uploads_{upload_id}" / "my_song.mp3").read_bytes() == payload
+
+
+def test_streaming_job_converts_files_while_others_upload(client, tmp_path, monkeypatch):
+    store = MemoryProgressStore()
+    monkeypatch.setattr(web_to_any, "progress_store", store)
+    queue = JobQueue(workers=1, max_pending=1)
+    monkeypatch.setattr(web_to_any, "job_queue", queue)
+    monkeypatch.setattr(web_to_any, "result_cache", ResultCache(str(tmp_path / "cache")))
+    received, first_in = [], threading.Event()
+
+    def fake_process(job_id, target, args, publish):
+        inbox, total_files, fmt, cv_dir = args
+        assert target is web_to_any._streaming_conversion_job and total_files == 2
+        while (path := inbox.get(timeout=5)) is not None:
+            received.append(os.path.basename(path))
+            first_in.set()
+        publish({"status": "done", "completed_at": 2.0})
+
+    upload_id = client.post(
+        "/upload",
+        json={"files": [{"name": "a.mp3", "size": 4}, {"name": "b.mp3", "size": 4}]},
+        headers={"X-CSRF-Token": "token"},
+    ).get_json()["upload_id"]
+    form = {"csrf_token": "token", "conversionType": "wav", "upload_id": upload_id, "stream": "1"}
+    with patch("web_to_any.run_in_process", fake_process):
+        # The job is accepted before any file is in
+        assert client.post("/convert", data=form).status_code == 202
+        # and can't be claimed twice
+        assert client.post("/convert", data=form).status_code == 409
+        _patch_chunk(client, upload_id, "a.mp3", 0, b"aaaa")
+        # First file is converting while the second hasn't arrived
+        assert first_in.wait(5)
+        assert received == ["a.mp3"]
+        _patch_chunk(client, upload_id, "b.mp3", 0, b"bbbb")
+        queue.shutdown()
+    assert received == ["a.mp3", "b.mp3"]
+    assert store.get(upload_id)["status"] == "done"
+    assert not (tmp_path / f"uploads_{upload_id}").exists()
+    assert upload_id not in web_to_any._uploads
+
+
+def test_streaming_job_carries_on_after_a_failed_file(tmp_path):
+    progress = {}
+    ctrl = MagicMock()
+    ctrl.prog_logger = ProgLogger(job_id="abcdef15", shared_progress_dict=progress, is_web=True)
+    seen = []
+
+    def run(input_path_args, **kwargs):
+        name = os.path.basename(input_path_args[0])
+        if name == "bad.mp3":
+            raise ValueError("unreadable")
+        path_set = (str(tmp_path) + "/", name[:-4], "mp3")
+        ctrl.prog_logger.start_batch({path_set: 1.0})
+        ctrl.prog_logger.file_done(path_set)
+        ctrl.prog_logger.end_batch()
+        entry = progress["abcdef15"]
+        seen.append((entry["completed_files"], entry["progress_percent"], entry["total"]))
+
+    ctrl.run.side_effect = run
+    inbox = queue.Queue()
+    for name in ("a.mp3", "bad.mp3", "c.mp3"):
+        inbox.put(str(tmp_path / name))
+    inbox.put(None)
+    with patch("web_to_any.create_controller", return_value=ctrl):
+        web_to_any._streaming_conversion_job("abcdef15", progress, inbox, 3, "wav", str(tmp_path))
+
+    assert ctrl.run.call_count == 3
+    # Progress comes from the logger only, in the same units throughout
+    assert seen == [(1, 33, 100), (2, 66, 100)]
+    entry = progress["abcdef15"]
+    assert entry["status"] == "done"
+    assert entry["progress_percent"] == 100
+    assert entry["failed_files"] == [{"name": "bad.mp3", "error": "unreadable"}]
+
+
+def test_uploads_are_rate_limited_apart_from_conversions(client):
+    uploads = web_to_any._rate_limiters[("upload", 30, 3600)]
+    conversions = web_to_any._rate_limiters[("default", 30, 3600)]
+    assert uploads is not conversions
+    before = conversions._buckets.get("127.0.0.1")
+    client.post(
+        "/upload",
+        json={"files": [{"name": "a.mp3", "size": 4}]},
+        headers={"X-CSRF-Token": "token"},
+    )
+    # Announcing an upload doesn't use up one of the conversions it is meant for
+    assert conversions._buckets.get("127.0.0.1") == before
+    assert uploads._buckets.get("127.0.0.1") is not None
+
+
+def test_chunk_beyond_announced_size_is_rejected(client):
+    upload_id = client.post(
+        "/upload",
+        json={"files": [{"name": "a.mp3", "size": 10}]},
+        headers={"X-CSRF-Token": "token"},
+    ).get_json()["upload_id"]
+    assert _patch_chunk(client, upload_id, "a.mp3", 0, b"\x00" * 11).status_code == 400
+    assert client.get(f"/upload/{upload_id}").get_json()["files"][0]["offset"] == 0
+
+
+def _events(response):
+    body = response.get_data(as_text=True)
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+def test_progress_stream_pushes_only_changes(client, monkeypatch):
+    store = MemoryProgressStore()
+    monkeypatch.setattr(web_to_any, "progress_store", store)
+    store.set(
+        "0badc0de",
+        {"status": "processing", "progress": 10, "total": 100, "progress_percent": 10},
+    )
+
+    def finish():
+        store.update("0badc0de", {"status": "done", "progress": 100, "progress_percent": 100})
+
+    timer = threading.Timer(0.2, finish)
+    timer.start()
+    response = client.get("/progress/0badc0de/stream")
+    timer.join()
+    assert response.mimetype == "text/event-stream"
+    first, delta = _events(response)
+    assert first["status"] == "processing" and first["progress_percent"] == 10
+    assert delta == {"status": "done", "progress": 100, "progress_percent": 100}
+
+
+def test_finished_jobs_are_reaped_in_background(monkeypatch):
+    store = MemoryProgressStore()
+    monkeypatch.setattr(web_to_any, "progress_store", store)
+    store.set("00000001", {"status": "done", "completed_at": 1000.0})
+    store.set("00000002", {"status": "error", "completed_at": 1250.0})
+    store.set("00000003", {"status": "processing"})
+    web_to_any._reap_jobs(now=1400.0)
+    assert [j in store for j in ("00000001", "00000002", "00000003")] == [False, True, True]
+
+
+def test_repeat_conversion_is_served_from_result_cache(client, monkeypatch, tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(web_to_any, "result_cache", cache)
+    stored = threading.Event()
+
+    def fake_run(job_id, up_dir, fmt, cv_dir, merge, concat, result_key):
+        with open(os.path.join(cv_dir, "a.wav"), "wb") as f:
+            f.write(b"RIFF")
+        cache.store(result_key, cv_dir)
+        stored.set()
+
+    with patch("web_to_any._run_conversion", side_effect=fake_run):
+        assert _post(client).get_json().get("cached") is None
+        assert stored.wait(5)
+        response = _post(client)
+    assert response.get_json()["cached"] is True
+    job_id = response.get_json()["job_id"]
+    assert client.get(f"/progress/{job_id}").get_json()["status"] == "done"
+    assert (tmp_path / f"converted_{job_id}" / "a.wav").read_bytes() == b"RIFF"
+    # The repeat upload isn't kept around
+    assert not (tmp_path / f"uploads_{job_id}").exists()
+    stats = client.get("/stats").get_json()["result_cache"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_finished_jobs_feed_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_to_any, "progress_store", MemoryProgressStore())
+    cv_dir = tmp_path / "converted"
+    cv_dir.mkdir()
+
+    def fake_process(job_id, target, args, publish):
+        (cv_dir / "a.mka").write_bytes(b"\x00" * 300)
+        publish({"status": "done", "started_at": 100.0, "completed_at": 107.5})
+
+    with patch("web_to_any.run_in_process", side_effect=fake_process):
+        web_to_any._run_conversion(
+            "12345678", str(tmp_path / "up"), "mka", str(cv_dir), False, False
+        )
+    body = web_to_any.app.test_client().get("/metrics")
+    assert body.mimetype == "text/plain"
+    lines = body.get_data(as_text=True).splitlines()
+    assert 'any2any_jobs_total{format="mka",status="done"} 1' in lines
+    assert 'any2any_job_duration_seconds_bucket{format="mka",le="5"} 0' in lines
+    assert 'any2any_job_duration_seconds_bucket{format="mka",le="15"} 1' in lines
+    assert any(line.startswith("any2any_produced_bytes_total ") for line in lines)
@@ -0,0 +1,57 @@
+from unittest.mock import patch
+from PIL import Image
+from utils.category import Category
+from core.utils import workload
+from tests.test_fixtures import controller_instance
+
+
+def test_image_counts_by_pixels(tmp_path):
+    path = tmp_path / "big.png"
+    Image.new("RGB", (2000, 1000)).save(path)
+    assert workload.estimate(str(path), Category.IMAGE) == 1.0
+
+
+def test_media_counts_by_duration(tmp_path):
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"\0")
+    with patch.object(workload.ffmpeg_utils, "probe", return_value={"duration": 42.0}):
+        assert workload.estimate(str(path), Category.AUDIO) == 42.0
+
+
+def test_uninspectable_files_fall_back_to_size(tmp_path):
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"\0" * 3 * 1024**2)
+    assert workload.estimate(str(path), Category.IMAGE) == 3.0
+
+
+def test_estimate_all_keys_by_path_set(tmp_path):
+    Image.new("RGB", (10, 10)).save(tmp_path / "tiny.png")
+    file_paths = {
+        Category.IMAGE: [(f"{tmp_path}/", "tiny", "png"), (f"{tmp_path}/", "gone", "png")],
+        Category.AUDIO: [],
+    }
+    weights = workload.estimate_all(file_paths)
+    # Tiny files still count for something, missing ones as an average file
+    assert weights == {
+        (f"{tmp_path}/", "tiny", "png"): workload._MIN_WEIGHT,
+        (f"{tmp_path}/", "gone", "png"): 1.0,
+    }
+
+
+def test_batches_are_only_probed_when_progress_is_weighed(controller_instance, tmp_path):
+    one = {Category.AUDIO: [(f"{tmp_path}/", "a", "mp3")]}
+    two = {Category.AUDIO: [(f"{tmp_path}/", "a", "mp3"), (f"{tmp_path}/", "b", "mp3")]}
+    logger = controller_instance.prog_logger
+    with patch.object(workload, "estimate_all", return_value={}) as mock_estimate:
+        # A lone file weighs the same whatever it is
+        assert controller_instance._batch_weights(one) == {(f"{tmp_path}/", "a", "mp3"): 1.0}
+        # Several files: for the total bar on the terminal
+        controller_instance._batch_weights(two)
+        assert mock_estimate.call_count == 1
+        # In the web app, only with a job to report to
+        logger.is_web = True
+        controller_instance._batch_weights(two)
+        assert mock_estimate.call_count == 1
+        logger.job_id, logger.shared_progress_dict = "abcdef12", {}
+        controller_instance._batch_weights(two)
+        assert mock_estimate.call_count == 2
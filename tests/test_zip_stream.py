@@ -0,0 +1,30 @@
+import io
+import zipfile
+from utils.zip_stream import archive_entries, iter_zip, compress_type_for
+
+# Streamed zip tests, archives are rebuilt in memory and read back with zipfile
+
+
+def test_single_file_sits_at_archive_root(tmp_path):
+    song = tmp_path / "song.mp3"
+    song.write_bytes(b"ID3" + b"\x01" * 100)
+    assert archive_entries(str(song)) == [(str(song), "song.mp3")]
+
+
+def test_iter_zip_yields_readable_archive_in_chunks(tmp_path):
+    payload = bytes(range(256)) * 64
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "frame.png").write_bytes(payload)
+    chunks = list(iter_zip(archive_entries(str(tmp_path / "out")), chunk_size=1024))
+    # Data goes out while the file is still being read, not just once at the end
+    assert len(chunks) > 10
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == ["out/frame.png"]
+        assert archive.read("out/frame.png") == payload
+
+
+def test_compress_type_for():
+    assert compress_type_for("a/b.MP4") == zipfile.ZIP_STORED
+    assert compress_type_for("a/b.jpeg") == zipfile.ZIP_STORED
+    assert compress_type_for("a/b.srt") == zipfile.ZIP_DEFLATED
+    assert compress_type_for("a/b.wav") == zipfile.ZIP_DEFLATED
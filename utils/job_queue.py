@@ -0,0 +1,130 @@
+import math
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    # Raised by JobQueue.submit when no more jobs may wait
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    # Bounded FIFO of jobs served by a fixed pool of worker threads.
+    # At most `workers` jobs run at once, at most `max_pending` wait behind them.
+    # Submitting beyond that raises QueueFullError, callers turn that into backpressure.
+    def __init__(self, workers: int = 2, max_pending: int = 16):
+        self.workers = max(1, int(workers))
+        self.max_pending = max(0, int(max_pending))
+        self._pending = deque()  # (job_id, fn, args, kwargs)
+        self._running = set()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._closed = False
+        # Exponential moving average of job run time, for Retry-After estimates
+        self._avg_runtime = None
+        # Total seconds workers spent running jobs, for utilisation
+        self._busy_seconds = 0.0
+
+    def _start_workers(self) -> None:
+        # Lazily, so importing the web module doesn't spin up threads
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"any2any-job-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+                job_id, fn, args, kwargs = self._pending.popleft()
+                self._running.add(job_id)
+            started = time.monotonic()
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                # Job functions report their own errors (progress dict), keep the worker alive
+                logger.exception(f"Job {job_id} failed")
+            finally:
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self._running.discard(job_id)
+                    self._busy_seconds += elapsed
+                    self._avg_runtime = (
+                        elapsed
+                        if self._avg_runtime is None
+                        else 0.8 * self._avg_runtime + 0.2 * elapsed
+                    )
+                    self._cond.notify_all()
+
+    def retry_after(self) -> int:
+        with self._cond:
+            return self._retry_after_locked()
+
+    def has_capacity(self) -> bool:
+        with self._cond:
+            free_workers = self.workers - len(self._running)
+            return len(self._pending) < self.max_pending + max(0, free_workers)
+
+    def submit(self, job_id: str, fn, *args, **kwargs) -> int:
+        # Enqueue fn(*args, **kwargs), returns the job's queue position (0 = starts right away)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Job queue is shut down")
+            free_workers = self.workers - len(self._running)
+            if len(self._pending) >= self.max_pending + max(0, free_workers):
+                raise QueueFullError(self._retry_after_locked())
+            self._pending.append((job_id, fn, args, kwargs))
+            self._start_workers()
+            self._cond.notify()
+            return max(0, len(self._pending) - max(0, free_workers))
+
+    def _retry_after_locked(self) -> int:
+        # Seconds until a slot is likely to free up, rough but bounded
+        avg = self._avg_runtime if self._avg_runtime is not None else 30.0
+        waves = (len(self._pending) + len(self._running)) / self.workers
+        return int(min(600, max(5, math.ceil(avg * max(waves, 1) / 2))))
+
+    def position(self, job_id: str) -> int | None:
+        # 1-based place among waiting jobs, 0 if running, None if unknown or finished
+        with self._cond:
+            if job_id in self._running:
+                return 0
+            for i, pending in enumerate(self._pending):
+                if pending[0] == job_id:
+                    return i + 1
+        return None
+
+    def pending_ids(self) -> list:
+        # Ids of waiting jobs, in the order they'll run
+        with self._cond:
+            return [pending[0] for pending in self._pending]
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "running": len(self._running),
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "busy_seconds": self._busy_seconds,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        # Stop accepting jobs, let workers drain what's queued
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
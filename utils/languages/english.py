@@ -28,6 +28,8 @@ ENGLISH = {
     "get_hls_fail": "Failed to create HLS:",
     "create_dash": "Creating DASH stream for:",
     "dash_fail": "Failed to create DASH:",
+    "create_cmaf": "Creating CMAF stream (HLS + DASH) for:",
+    "cmaf_fail": "Failed to create CMAF:",
     "extract_subtitles": "Extracting subtitles from:",
     "subtitles_success": "Subtitles successfully extracted to:",
     "extract_subtitles_alt": "No dedicated subtitle track found. Trying to extract embedded text...",
@@ -0,0 +1,129 @@
+import math
+import threading
+
+# Minimal Prometheus text exposition (format 0.0.4): counters, gauges and histograms with
+# labels. Updates are a dict lookup and an add under a lock, cheap enough to sit on the
+# request and job paths. Counters and gauges can also be read at scrape time from a callback, so values
+# that already live elsewhere (queue depth, cache stats) aren't tracked twice.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help: str, labels: tuple = (), fn=None):
+        # fn() -> value, or {label values tuple: value} for labelled metrics, read on scrape
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._fn = fn
+        # Unlabelled series exist from the start, scrapers see 0 rather than nothing
+        self._values = {} if labels or fn is not None else {(): 0}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labels)
+
+    def _samples(self):
+        if self._fn is not None:
+            value = self._fn()
+            items = value.items() if isinstance(value, dict) else [((), value)]
+            return [(self.name, k, "", v) for k, v in items if v is not None]
+        with self._lock:
+            return [(self.name, k, "", v) for k, v in self._values.items()]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, key, extra, value in self._samples():
+            lines.append(f"{name}{_format_labels(self.labels, key, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple, labels: tuple = ()):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    le = f'le="{_format_value(float(bound))}"'
+                    samples.append((f"{self.name}_bucket", key, le, cumulative))
+                samples.append((f"{self.name}_sum", key, "", total))
+                samples.append((f"{self.name}_count", key, "", cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = (), fn=None) -> Counter:
+        return self._add(Counter(name, help, labels, fn))
+
+    def gauge(self, name: str, help: str, labels: tuple = (), fn=None) -> Gauge:
+        return self._add(Gauge(name, help, labels, fn))
+
+    def histogram(self, name: str, help: str, buckets: tuple, labels: tuple = ()) -> Histogram:
+        return self._add(Histogram(name, help, buckets, labels))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
@@ -0,0 +1,155 @@
+import os
+import time
+import queue
+import signal
+import subprocess
+import threading
+import traceback
+import multiprocessing
+
+# Runs a job in its own process so that heavy work neither competes with the caller for the
+# GIL nor takes it down when it crashes. The job writes progress into a plain dict of its own,
+# snapshots of it are sent back over a queue and handed to the caller as they arrive.
+
+# spawn behaves the same on every platform and never inherits the caller's threads or locks
+_ctx = multiprocessing.get_context("spawn")
+
+
+def _publish(job_id: str, local_dict: dict, channel, last: dict = None) -> dict:
+    # Send the job's entry if it changed since the last send
+    entry = local_dict.get(job_id)
+    if entry is not None and entry != last:
+        snapshot = dict(entry)
+        channel.put(snapshot)
+        return snapshot
+    return last
+
+
+def _child_main(
+    job_id: str, target, args: tuple, channel, interval: float, own_group: bool = False
+) -> None:
+    if own_group and hasattr(os, "setsid"):
+        # Anything the job starts (ffmpeg) goes into this process' group, killed with it
+        os.setsid()
+    local_dict = {}
+    stop = threading.Event()
+    sent = [None]  # Last snapshot sent
+
+    def _publisher():
+        while not stop.wait(interval):
+            sent[0] = _publish(job_id, local_dict, channel, sent[0])
+
+    publisher = threading.Thread(target=_publisher, daemon=True)
+    publisher.start()
+    try:
+        target(job_id, local_dict, *args)
+    except Exception as e:
+        entry = local_dict.setdefault(job_id, {})
+        if entry.get("status") != "error":
+            entry.update({"status": "error", "error": str(e) or traceback.format_exc()})
+        raise
+    finally:
+        stop.set()
+        publisher.join()
+        # Final state always goes out, the parent relies on it
+        _publish(job_id, local_dict, channel, sent[0])
+        channel.close()
+        channel.join_thread()
+
+
+def _kill_tree(process) -> None:
+    # Kill the child and every process it started, right away
+    try:
+        if os.name == "nt":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        pass
+    # Not in a group of its own yet if cancelled right after starting
+    process.kill()
+
+
+def run_in_process(
+    job_id: str,
+    target,
+    args: tuple,
+    publish,
+    interval: float = 0.1,
+    cancel: threading.Event = None,
+) -> int:
+    # Run target(job_id, progress_dict_of_the_child, *args) in a child process, block until
+    # it's gone. target must be importable (module level). Each change to the progress the
+    # child records under job_id is handed to publish(snapshot). Setting cancel kills the
+    # child along with the processes it started and reports the job as cancelled.
+    # Returns the exit code.
+    channel = _ctx.Queue()
+    process = _ctx.Process(
+        target=_child_main,
+        args=(job_id, target, args, channel, interval, cancel is not None),
+        name=f"any2any-job-{job_id}",
+        daemon=True,
+    )
+    process.start()
+
+    state = {}
+
+    def _apply(snapshot: dict) -> None:
+        state.update(snapshot)
+        publish(snapshot)
+
+    cancelled = False
+    while True:
+        if cancel is not None and cancel.is_set():
+            _kill_tree(process)
+            cancelled = True
+            break
+        try:
+            _apply(channel.get(timeout=interval if cancel is not None else interval * 5))
+        except queue.Empty:
+            if not process.is_alive():
+                break
+        except (EOFError, OSError):
+            break
+    process.join()
+    if cancelled:
+        publish(
+            {
+                "status": "cancelled",
+                "error": None,
+                "completed_at": time.time(),
+                "last_updated": time.time(),
+            }
+        )
+        return process.exitcode
+
+    # Anything sent right before exiting
+    while True:
+        try:
+            _apply(channel.get_nowait())
+        except (queue.Empty, EOFError, OSError):
+            break
+
+    if process.exitcode != 0:
+        if state.get("status") != "error":
+            # Killed or crashed without being able to report, e.g. a segfault in a codec
+            publish(
+                {
+                    "status": "error",
+                    "error": f"Conversion process exited unexpectedly (code {process.exitcode})",
+                    "completed_at": time.time(),
+                    "last_updated": time.time(),
+                }
+            )
+        elif "completed_at" not in state:
+            publish({"completed_at": time.time()})
+    return process.exitcode
+
+
+def new_inbox():
+    # A queue to hand further work to a job while it runs, pass it in the job's args
+    return _ctx.Queue()
@@ -1,22 +1,113 @@
 import time
 import threading
+from contextlib import contextmanager
 from tqdm import tqdm
 from proglog import ProgressBarLogger
 
 
+class _Task:
+    # One bar being worked through by one TaskLogger
+    __slots__ = ("bar", "index", "total", "started", "tqdm_bar", "slot")
+
+    def __init__(self, bar: str, total: int, started: float):
+        self.bar = bar
+        self.index = 0
+        self.total = total
+        self.started = started
+        self.tqdm_bar = None
+        self.slot = None  # Terminal line of tqdm_bar
+
+
+class TaskLogger(ProgressBarLogger):
+    # Progress of one task, usually one file, reported into the ProgLogger it belongs to.
+    # Only ever used by one thread at a time, so its bars and task need no locking.
+    # Can be passed as logger= to moviepy just like the ProgLogger, see ProgLogger.task.
+    def __init__(self, parent: "ProgLogger", label: str = None):
+        # Logging bars would append a line to self.logs for every single chunk
+        super().__init__(logged_bars=None)
+        self.parent = parent
+        self.label = label
+        self.task = None  # Running _Task
+
+    @property
+    def tqdm_bar(self):
+        return self.task.tqdm_bar if self.task is not None else None
+
+    @property
+    def current_bar(self):
+        return self.task.bar if self.task is not None else None
+
+    def __call__(self, **kw):
+        # Fast path for the per-chunk call, logger(bar__index=i), the rest goes through proglog
+        if len(kw) == 1:
+            key, value = next(iter(kw.items()))
+            bar, _, attr = key.partition("__")
+            state = self.bars.get(bar)
+            if attr == "index" and state is not None:
+                old_value = state["index"]
+                state["index"] = value
+                self.bars_callback(bar, attr, value, old_value)
+                return
+        super().__call__(**kw)
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        # Only process index updates of known bars for progress tracking
+        if attr != "index" or bar not in self.bars:
+            return
+        total = self.bars[bar].get("total", 100)
+        if total is None:
+            return
+        current_time = time.time()
+
+        task = self.task
+        # A new bar, or the same one starting over for the next file
+        started = task is None or task.bar != bar or value < task.index
+        if started:
+            task = self.parent._start_task(self, bar, total, current_time)
+        task.total = total
+        task.index = value
+        if task.tqdm_bar is not None and value > (old_value or 0):
+            task.tqdm_bar.update(value - (old_value or 0))
+
+        if value >= total:
+            self.parent._finish_task(self, current_time)
+        elif started or current_time >= self.parent._next_publish:
+            self.parent._publish(current_time, wait=started)
+
+    def close(self) -> None:
+        # Drop a task left unfinished, e.g. by a failed conversion
+        if self.task is not None:
+            self.parent._drop_task(self)
+
+
 class ProgLogger(ProgressBarLogger):
     # Custom logger extracting progress info from moviepy video processing operations.
-    # Optionally writes progress to a shared dict for web reporting
+    # Optionally writes progress to a shared dict for web reporting.
+    # One instance serves all worker threads of a run. Each task reports through a
+    # TaskLogger of its own (see task), a thread outside of one through a default per
+    # thread. A chunk update is a few attribute writes and takes no lock. At most every
+    # print_interval seconds, whichever thread finds it due sums up all running tasks into
+    # the shared dict. lock guards that dict and the task registry, nothing else.
+    # Given the expected work per file of a batch (start_batch), overall progress is
+    # weighted by it and the ETA follows the smoothed throughput, in the shared dict as well
+    # as on a total bar in the terminal, with a line per running task beneath it.
     def __init__(self, job_id=None, shared_progress_dict=None, is_web: bool = False):
-        super().__init__()
-        self.start_time, self.last_print_time = None, None
+        super().__init__(logged_bars=None)
         self.print_interval = 0.1  # Frequency of progress updates [s]
-        self.tqdm_bar = None
-        self.current_bar = None
         self.job_id = job_id
         self.shared_progress_dict = shared_progress_dict
         self.is_web = is_web
         self.completed_files = 0
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self._tasks = {}  # TaskLogger -> its running _Task
+        self._slots = set()  # Terminal lines taken by task bars
+        self._next_publish = 0.0
+        self._weights = {}  # File path set -> expected work, see core.utils.workload
+        self._done = set()  # Path sets finished
+        self._rate = None  # Smoothed throughput, work per second
+        self._rate_sample = None  # (time, progress) the rate was last measured at
+        self._batch_bar = None
         if self.job_id and self.shared_progress_dict is not None:
             self.shared_progress_dict[self.job_id] = {
                 "progress": 0,
@@ -27,6 +118,45 @@ class ProgLogger(ProgressBarLogger):
                 "time_remaining": None,
             }
 
+    def _current(self) -> TaskLogger:
+        # The calling thread's task logger
+        child = getattr(self._local, "child", None)
+        if child is None:
+            child = self._local.child = TaskLogger(self)
+        return child
+
+    @contextmanager
+    def task(self, label: str = None):
+        # While in the block, the calling thread's progress is a task of its own, on its
+        # own line in the terminal. Yields the task's logger.
+        child = TaskLogger(self, label)
+        previous = getattr(self._local, "child", None)
+        self._local.child = child
+        try:
+            yield child
+        finally:
+            self._local.child = previous
+            child.close()
+
+    @property
+    def bars(self):
+        # Per task, parallel conversions report under the same bar names
+        return self._current().bars
+
+    @property
+    def tqdm_bar(self):
+        return self._current().tqdm_bar
+
+    @property
+    def current_bar(self):
+        return self._current().current_bar
+
+    def __call__(self, **kw):
+        self._current()(**kw)
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        self._current().bars_callback(bar, attr, value, old_value)
+
     def _format_time(self, seconds):
         # Converting seconds to more readable format (e.g., '2 min 30s')
         if seconds is None or seconds < 0:
@@ -42,179 +172,223 @@ class ProgLogger(ProgressBarLogger):
         else:
             return f"{secs}s"
 
-    def bars_callback(self, bar, attr, value, old_value=None):
-        current_time = time.time()
+    def _start_task(self, child: TaskLogger, bar: str, total: int, now: float) -> _Task:
+        if child.task is not None:
+            self._drop_task(child)
+        task = _Task(bar, total, now)
+        with self.lock:
+            self._tasks[child] = task
+            if not self.is_web:
+                # Lowest free line, below the total bar if there is one
+                task.slot = min(set(range(len(self._slots) + 1)) - self._slots)
+                self._slots.add(task.slot)
+        if not self.is_web:
+            task.tqdm_bar = tqdm(
+                total=total,
+                desc=child.label,
+                unit="chunks",
+                dynamic_ncols=True,
+                leave=False,
+                position=task.slot + (self._batch_bar is not None),
+            )
+        child.task = task
+        return task
 
-        # Initialize if this is the first time we're seeing this bar
-        if bar not in self.bars:
-            return
-
-        # Only process index updates for progress tracking
-        if attr != "index":
-            return
+    def _drop_task(self, child: TaskLogger) -> bool:
+        # Forget child's task, True if other tasks are still running
+        task, child.task = child.task, None
+        if task.tqdm_bar is not None:
+            task.tqdm_bar.close()
+        with self.lock:
+            self._tasks.pop(child, None)
+            self._slots.discard(task.slot)
+            return bool(self._tasks)
 
+    def _finish_task(self, child: TaskLogger, now: float) -> None:
+        task = child.task
+        others = self._drop_task(child)
         if self.is_web:
-            self._update_web_progress(bar, value, current_time)
+            with self.lock:
+                self.completed_files = min(self.completed_files + 1, self._total_files())
+        if self.is_web or others:
+            self._publish(now, wait=True)
             return
 
-        # Reset per new bar to ensure progress shows across multiple conversions
-        if self.current_bar != bar:
-            if self.tqdm_bar is not None:
-                self.tqdm_bar.close()
-            self.tqdm_bar = None
-            self.start_time = None
-            self.last_print_time = None
-            self.current_bar = bar
-
-        # Initialize progress tracking if this is the first update
-        if self.start_time is None:
-            self.start_time = current_time
-            self.last_print_time = self.start_time
-            total = self.bars[bar].get(
-                "total", 100
-            )  # Default to this if total not available
-
-            # Initialize tqdm progress bar
-            self.tqdm_bar = tqdm(
-                total=total, unit="chunks", dynamic_ncols=True, leave=False
+        total_elapsed = now - task.started
+        self.update_job(
+            progress=task.index,
+            total=task.total,
+            status="done",
+            completed_at=now,
+            last_updated=now,
+            progress_percent=100,
+            eta_seconds=0,
+            time_remaining=None,
+            total_elapsed=total_elapsed,
+            total_elapsed_formatted=self._format_time(total_elapsed) if total_elapsed else None,
+        )
+
+    def start_batch(self, weights: dict) -> None:
+        # weights: {file path set: expected work} of the files about to be converted
+        with self.lock:
+            for key, weight in weights.items():
+                self._weights[key] = weight
+                self._done.discard(key)
+            self._rate, self._rate_sample = None, None
+        if not self.is_web and len(weights) > 1:
+            self._batch_bar = tqdm(
+                total=100,
+                desc="Total",
+                bar_format="{desc}: {percentage:3.0f}%|{bar}| {postfix}",
+                dynamic_ncols=True,
             )
 
-            # Initialize web progress info
-            if self.job_id and self.shared_progress_dict is not None:
-                with threading.Lock():
-                    self.shared_progress_dict[self.job_id] = {
-                        "progress": 0,
-                        "total": total,
-                        "status": "processing",
-                        "error": None,
-                        "started_at": current_time,
-                        "last_updated": current_time,
-                        "current_bar": bar,
-                    }
-
-        # Calculate progress percentage
-        total = self.bars[bar].get("total", 100)
-        if total > 0:
-            progress_percent = int((value / total) * 100)
-        else:
-            progress_percent = 0
-
-        # Calculate ETA
-        eta_seconds = None
-        time_remaining = None
-        if value > 0 and total > 0 and self.start_time is not None:
-            elapsed = current_time - self.start_time
-            progress_ratio = value / total
-            if progress_ratio > 0:
-                total_time_estimate = elapsed / progress_ratio
-                eta_seconds = total_time_estimate - elapsed
-                if eta_seconds > 0:
-                    time_remaining = self._format_time(eta_seconds)
-
-        # Update tqdm progress bar
-        if value > (old_value or 0):
-            if self.tqdm_bar:
-                self.tqdm_bar.update(value - (old_value or 0))
-
-            # Update web progress, but not too frequently to reduce overhead
-            if (
-                current_time - self.last_print_time >= 0.1
-            ):  # Update at most 10 times per second
-                self.last_print_time = current_time
-                if self.job_id and self.shared_progress_dict is not None:
-                    with threading.Lock():
-                        if self.job_id in self.shared_progress_dict:
-                            self.shared_progress_dict[self.job_id].update(
-                                {
-                                    "progress": value,
-                                    "total": total,
-                                    "status": "processing",
-                                    "last_updated": current_time,
-                                    "current_bar": bar,
-                                    "progress_percent": progress_percent,
-                                    "eta_seconds": eta_seconds,
-                                    "time_remaining": time_remaining,
-                                }
-                            )
-
-                            # Force progress update by modifying the dictionary in-place
-                            # This helps with thread safety and ensures the update is visible
-                            self.shared_progress_dict[self.job_id] = dict(
-                                self.shared_progress_dict[self.job_id]
-                            )
-
-        # Handle bar completion
-        if value >= total and self.tqdm_bar:
-            self.tqdm_bar.close()
-            elapsed_snapshot = self.start_time # Capture elapsed time before resetting
-            self.tqdm_bar, self.start_time, self.last_print_time = None, None, None
-            if self.job_id and self.shared_progress_dict is not None:
-                with threading.Lock():
-                    if self.job_id in self.shared_progress_dict:
-                        total_elapsed = None
-                        if elapsed_snapshot is not None:
-                            total_elapsed = current_time - elapsed_snapshot
-
-                        self.shared_progress_dict[self.job_id].update(
-                            {
-                                "progress": value,
-                                "total": total,
-                                "status": "done",
-                                "completed_at": current_time,
-                                "last_updated": current_time,
-                                "progress_percent": 100,
-                                "eta_seconds": 0,
-                                "time_remaining": None,
-                                "total_elapsed": total_elapsed,
-                                "total_elapsed_formatted": self._format_time(
-                                    total_elapsed
-                                )
-                                if total_elapsed
-                                else None,
-                            }
-                        )
+    def end_batch(self) -> None:
+        bar, self._batch_bar = self._batch_bar, None
+        if bar is not None:
+            bar.close()
 
-    def set_error(self, error_msg):
-        if self.job_id and self.shared_progress_dict is not None:
-            self.shared_progress_dict[self.job_id].update(
-                {"status": "error", "error": error_msg}
+    def file_done(self, path_set: tuple) -> None:
+        # A file of the batch is through, its whole weight counts as done
+        with self.lock:
+            key = tuple(path_set)
+            if key not in self._weights or key in self._done:
+                return
+            self._done.add(key)
+        self._publish(time.time(), wait=True)
+
+    def _weighted(self, now: float) -> tuple | None:
+        # (share of the batch's work done, ETA in seconds or None), lock held.
+        # Running tasks don't know their file, each counts as an average pending one.
+        if not self._weights:
+            return None
+        known = sum(self._weights.values())
+        n_files = max(len(self._weights), self._total_files() if self.is_web else 0)
+        # Files not announced yet (e.g. still uploading) count as average ones
+        total = known * n_files / len(self._weights)
+        done = sum(self._weights[k] for k in self._done)
+        pending = n_files - len(self._done)
+        remaining = max(0.0, total - done)
+        running = sum(
+            min(1.0, t.index / t.total) if t.total > 0 else 0.0 for t in self._tasks.values()
+        )
+        progress = done + min(remaining, running * remaining / pending if pending else 0.0)
+
+        if self._rate_sample is None:
+            self._rate_sample = (now, progress)
+        elif now - self._rate_sample[0] >= 0.5:
+            since, before = self._rate_sample
+            rate = max(0.0, progress - before) / (now - since)
+            self._rate = rate if self._rate is None else 0.3 * rate + 0.7 * self._rate
+            self._rate_sample = (now, progress)
+        eta = (total - progress) / self._rate if self._rate else None
+        return (progress / total if total > 0 else 0.0), eta
+
+    def _total_files(self) -> int:
+        entry = (self.shared_progress_dict or {}).get(self.job_id) or {}
+        return max(entry.get("total_files", 1), 1)
+
+    def _publish(self, now: float, wait: bool = False) -> None:
+        # Throttled, skipped if another thread is publishing right now unless wait is set
+        self._next_publish = now + self.print_interval
+        to_job = self.job_id is not None and self.shared_progress_dict is not None
+        bar = self._batch_bar
+        if not to_job and bar is None:
+            return
+        if not self.lock.acquire(blocking=wait):
+            return
+        try:
+            weighted = self._weighted(now)
+            if bar is not None and weighted is not None:
+                share, eta = weighted
+                bar.n = round(share * 100, 1)
+                remaining = self._format_time(eta)
+                # Throughput in seconds of media per second, i.e. times realtime
+                postfix = [f"{self._rate:.1f}x"] if self._rate else []
+                postfix += [f"ETA {remaining}"] if remaining else []
+                bar.set_postfix_str(", ".join(postfix), refresh=False)
+                bar.refresh()
+            entry = self.shared_progress_dict.get(self.job_id) if to_job else None
+            if entry is not None and (self.is_web or self._tasks):
+                entry.update(self._snapshot(now, weighted))
+        finally:
+            self.lock.release()
+
+    def _snapshot(self, now: float, weighted: tuple = None) -> dict:
+        # All running tasks summed up, lock held
+        tasks = list(self._tasks.values())
+        bar = max(tasks, key=lambda t: t.started).bar if tasks else None
+        if weighted is not None:
+            share, eta = weighted
+            return {
+                "progress": round(share * 100, 1),
+                "total": 100,
+                "completed_files": len(self._done),
+                "status": "processing",
+                "last_updated": now,
+                "progress_percent": int(share * 100),
+                "eta_seconds": eta,
+                "time_remaining": self._format_time(eta),
+                "current_bar": bar,
+                "aggregate_progress": True,
+                "weighted": True,
+            }
+        if self.is_web:
+            units = self._total_files() * 100
+            running = sum(
+                min(100, int(t.index * 100 / t.total)) if t.total > 0 else 0 for t in tasks
             )
+            cumulative = min(self.completed_files * 100 + running, units)
+            return {
+                "progress": cumulative,
+                "total": units,
+                "completed_files": self.completed_files,
+                "status": "processing",
+                "last_updated": now,
+                "progress_percent": int(cumulative * 100 / units),
+                "current_bar": bar,
+                "aggregate_progress": True,
+            }
 
-    def _update_web_progress(self, bar, value, current_time):
+        index = sum(t.index for t in tasks)
+        total = sum(t.total for t in tasks)
+        progress_percent = int(index * 100 / total) if total > 0 else 0
+        eta_seconds, time_remaining = None, None
+        if index > 0 and total > 0:
+            elapsed = now - min(t.started for t in tasks)
+            eta_seconds = elapsed * total / index - elapsed
+            if eta_seconds > 0:
+                time_remaining = self._format_time(eta_seconds)
+        return {
+            "progress": index,
+            "total": total,
+            "status": "processing",
+            "last_updated": now,
+            "current_bar": bar,
+            "progress_percent": progress_percent,
+            "eta_seconds": eta_seconds,
+            "time_remaining": time_remaining,
+        }
+
+    def update_job(self, **fields) -> None:
+        # Merge fields into the job's shared progress entry, if there is one
         if self.job_id is None or self.shared_progress_dict is None:
             return
+        with self.lock:
+            entry = self.shared_progress_dict.get(self.job_id)
+            if entry is not None:
+                if "last_updated" not in fields:
+                    fields["last_updated"] = time.time()
+                entry.update(fields)
 
-        total = self.bars.get(bar, {}).get("total", 100)
-        progress_percent = int((value / total) * 100) if total > 0 else 0
+    def set_error(self, error_msg):
+        self.update_job(status="error", error=error_msg)
 
-        total_files = self.shared_progress_dict.get(self.job_id, {}).get(
-            "total_files", 1
-        )
-        total_units = max(total_files, 1) * 100
-        cumulative_progress = min(
-            self.completed_files * 100 + progress_percent, total_units
-        )
-        overall_percent = int((cumulative_progress / total_units) * 100)
-
-        with threading.Lock():
-            if self.job_id in self.shared_progress_dict:
-                self.shared_progress_dict[self.job_id].update(
-                    {
-                        "progress": cumulative_progress,
-                        "total": total_units,
-                        "completed_files": self.completed_files,
-                        "status": "processing",
-                        "last_updated": current_time,
-                        "progress_percent": overall_percent,
-                        "current_bar": bar,
-                        "aggregate_progress": True,
-                    }
-                )
 
-        if value >= total:
-            self.completed_files = min(self.completed_files + 1, total_files)
-            with threading.Lock():
-                if self.job_id in self.shared_progress_dict:
-                    self.shared_progress_dict[self.job_id].update(
-                        {"completed_files": self.completed_files}
-                    )
+def run_as_task(logger, convert, path_set: tuple):
+    # convert(path_set) in a pool worker, as a task of its own if logger is a ProgLogger,
+    # so parallel conversions don't share one bar
+    if not isinstance(logger, ProgLogger):
+        return convert(path_set)
+    with logger.task(f"{path_set[1]}.{path_set[2]}"):
+        return convert(path_set)
@@ -0,0 +1,202 @@
+import abc
+import json
+import time
+import sqlite3
+import threading
+
+# Where the web server keeps job progress. The in-memory store serves a single server
+# process; the SQLite one is shared by every process on the host that opens the same file,
+# so any of them can answer progress requests for any job.
+# Entries are flat JSON-able dicts. Each change bumps the entry's version, which is what
+# progress streams wait on.
+
+
+class ProgressStore(abc.ABC):
+    @abc.abstractmethod
+    def get(self, job_id: str) -> dict | None:
+        ...
+
+    @abc.abstractmethod
+    def set(self, job_id: str, entry: dict) -> None:
+        # Replace the whole entry
+        ...
+
+    @abc.abstractmethod
+    def update(self, job_id: str, fields: dict) -> None:
+        # Merge fields into the entry, creating it if needed
+        ...
+
+    @abc.abstractmethod
+    def delete(self, job_id: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def version(self, job_id: str) -> int:
+        # 0 for unknown jobs
+        ...
+
+    @abc.abstractmethod
+    def wait(self, job_id: str, version: int, timeout: float) -> int:
+        # Block until the entry's version differs from version or timeout passes,
+        # returns the current version
+        ...
+
+    @abc.abstractmethod
+    def reap(self, completed_before: float) -> int:
+        # Drop finished (done/error) jobs completed before the given time, returns how many
+        ...
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.version(job_id) > 0
+
+
+class MemoryProgressStore(ProgressStore):
+    def __init__(self):
+        self._entries = {}
+        self._versions = {}
+        self._changed = threading.Condition()
+
+    def get(self, job_id: str) -> dict | None:
+        with self._changed:
+            entry = self._entries.get(job_id)
+            return dict(entry) if entry is not None else None
+
+    def _bump(self, job_id: str) -> None:
+        self._versions[job_id] = self._versions.get(job_id, 0) + 1
+        self._changed.notify_all()
+
+    def set(self, job_id: str, entry: dict) -> None:
+        with self._changed:
+            self._entries[job_id] = dict(entry)
+            self._bump(job_id)
+
+    def update(self, job_id: str, fields: dict) -> None:
+        with self._changed:
+            self._entries.setdefault(job_id, {}).update(fields)
+            self._bump(job_id)
+
+    def delete(self, job_id: str) -> None:
+        with self._changed:
+            if self._entries.pop(job_id, None) is not None:
+                # Keep counting, a stream waiting on the job sees it go
+                self._bump(job_id)
+
+    def version(self, job_id: str) -> int:
+        with self._changed:
+            return self._versions.get(job_id, 0) if job_id in self._entries else 0
+
+    def wait(self, job_id: str, version: int, timeout: float) -> int:
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self._versions.get(job_id, 0) != version, timeout=timeout
+            )
+            return self._versions.get(job_id, 0)
+
+    def reap(self, completed_before: float) -> int:
+        with self._changed:
+            stale = [
+                job_id
+                for job_id, entry in self._entries.items()
+                if entry.get("status") in ("done", "error")
+                and entry.get("completed_at", 0) < completed_before
+            ]
+            for job_id in stale:
+                del self._entries[job_id]
+                self._versions.pop(job_id, None)
+            if stale:
+                self._changed.notify_all()
+            return len(stale)
+
+
+class SQLiteProgressStore(ProgressStore):
+    # One connection per thread, WAL so readers never block the writing worker
+    def __init__(self, path: str, poll_interval: float = 0.2):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS progress ("
+                "job_id TEXT PRIMARY KEY, data TEXT NOT NULL, version INTEGER NOT NULL, "
+                "status TEXT, completed_at REAL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, job_id: str) -> dict | None:
+        row = self._conn().execute(
+            "SELECT data FROM progress WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, job_id: str, merge: bool, fields: dict) -> None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data, version FROM progress WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            entry = json.loads(row[0]) if row and merge else {}
+            entry.update(fields)
+            conn.execute(
+                "INSERT OR REPLACE INTO progress (job_id, data, version, status, completed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    json.dumps(entry),
+                    (row[1] if row else 0) + 1,
+                    entry.get("status"),
+                    entry.get("completed_at"),
+                ),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def set(self, job_id: str, entry: dict) -> None:
+        self._write(job_id, False, entry)
+
+    def update(self, job_id: str, fields: dict) -> None:
+        self._write(job_id, True, fields)
+
+    def delete(self, job_id: str) -> None:
+        self._conn().execute("DELETE FROM progress WHERE job_id = ?", (job_id,))
+
+    def version(self, job_id: str) -> int:
+        row = self._conn().execute(
+            "SELECT version FROM progress WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def wait(self, job_id: str, version: int, timeout: float) -> int:
+        # Other processes write here too, nothing to be woken by, so poll
+        deadline = time.monotonic() + timeout
+        current = self.version(job_id)
+        while current == version and time.monotonic() < deadline:
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+            current = self.version(job_id)
+        return current
+
+    def reap(self, completed_before: float) -> int:
+        cursor = self._conn().execute(
+            "DELETE FROM progress WHERE status IN ('done', 'error') "
+            "AND COALESCE(completed_at, 0) < ?",
+            (completed_before,),
+        )
+        return cursor.rowcount
+
+
+def open_progress_store(url: str) -> ProgressStore:
+    # "memory" or "sqlite:///path/to/progress.db"
+    if not url or url == "memory":
+        return MemoryProgressStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteProgressStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unknown progress store: {url}")
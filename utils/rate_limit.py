@@ -0,0 +1,36 @@
+import math
+import time
+import threading
+from utils.ttl_cache import TTLCache
+
+
+class RateLimiter:
+    # Token bucket per key: up to `capacity` requests at once, refilled at capacity per
+    # `window` seconds. A bucket left alone for a whole window is full again, so it's
+    # dropped from memory then and recreated (full) on the next request.
+    def __init__(self, capacity: int, window: float, max_keys: int = 100_000, clock=time.monotonic):
+        self.capacity = max(1, int(capacity))
+        self.rate = self.capacity / window
+        self._clock = clock
+        self._buckets = TTLCache(ttl=window, max_entries=max_keys, clock=clock)
+        self._lock = threading.Lock()
+
+    def allow(self, key) -> bool:
+        now = self._clock()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets.set(key, (tokens, now))
+        return allowed
+
+    def retry_after(self, key) -> int:
+        # Seconds until key gets its next token
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0
+        tokens, last = bucket
+        tokens = min(self.capacity, tokens + (self._clock() - last) * self.rate)
+        return 0 if tokens >= 1 else math.ceil((1 - tokens) / self.rate)
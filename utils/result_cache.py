@@ -0,0 +1,145 @@
+import os
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Finished conversion outputs, reusable for a while by the fingerprint of the job that made
+# them (input contents and names, target format, mode). Entries are hard-linked copies of the
+# output directory, so storing and serving one costs no extra disk space while the original
+# still exists and no copying where links work.
+# Every cache keeps its entries in its own subdirectory of root, so several caches (e.g. one
+# per server process) can share a root without touching each other's entries.
+
+
+def fingerprint(digests: dict, format: str, mode: str = "convert") -> str:
+    # digests: {file name: content hash}. Names count, they end up in the outputs' names.
+    h = hashlib.sha256(f"{mode}\0{format}".encode())
+    for name in sorted(digests):
+        h.update(f"\0{name}\0{digests[name]}".encode())
+    return h.hexdigest()
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _tree_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+class ResultCache:
+    def __init__(self, root: str, ttl: float = 3600, max_bytes: int = 2 * 1024**3, clock=time.time):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (path, size, stored_at), oldest first
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._id = uuid.uuid4().hex
+        self._cleaned = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+
+    def _subdir(self) -> str:
+        # By process too: workers forked from a process that made the cache share its id
+        return f"{os.getpid()}_{self._id}"
+
+    def _clean_root(self) -> None:
+        # Subdirectories untouched for longer than ttl only hold expired entries, whether
+        # their cache is still around or a previous run left them behind
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        cutoff = time.time() - self.ttl
+        for name in names:
+            path = os.path.join(self.root, name)
+            try:
+                stale = os.path.getmtime(path) < cutoff
+            except OSError:
+                continue
+            if stale and name != self._subdir():
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _drop(self, key: str) -> None:
+        path, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            key, (_, _, stored_at) = next(iter(self._entries.items()))
+            if stored_at + self.ttl > now and self._bytes <= self.max_bytes:
+                break
+            self._drop(key)
+
+    def lookup(self, key: str, dest: str) -> bool:
+        # Materialise the stored result for key at dest, False if there is none
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._evict(self._clock())
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return False
+            try:
+                shutil.copytree(entry[0], dest, copy_function=_link_or_copy, dirs_exist_ok=True)
+            except FileNotFoundError:
+                # Removed behind our back, convert afresh
+                self._drop(key)
+                self._misses += 1
+                return False
+            self._hits += 1
+            return True
+
+    def store(self, key: str, src: str) -> None:
+        # Keep the outputs in src under key, src itself is left untouched
+        if not self.enabled or not os.path.isdir(src):
+            return
+        size = _tree_size(src)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if not self._cleaned:
+                self._clean_root()
+                self._cleaned = True
+            if key in self._entries:
+                self._drop(key)
+            path = os.path.join(self.root, self._subdir(), key)
+            shutil.copytree(src, path, copy_function=_link_or_copy)
+            self._entries[key] = (path, size, self._clock())
+            self._bytes += size
+            self._evict(self._clock())
+
+    def purge(self) -> None:
+        with self._lock:
+            self._evict(self._clock())
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else None,
+            }
@@ -0,0 +1,105 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Preview images of input files, kept on disk across runs. An entry is keyed by the file's
+# path, modification time and size, so an edited file gets a new preview and an unchanged
+# one is never decoded twice. Least recently used entries go first once the cache outgrows
+# max_bytes. Recency is the entry file's mtime, so the order survives restarts.
+
+
+class ThumbnailCache:
+    def __init__(self, root: str, max_bytes: int = 256 * 1024**2):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            names = [n for n in os.listdir(self.root) if n.endswith(".png")]
+        except OSError:
+            return
+        found = []
+        for name in names:
+            try:
+                st = os.stat(os.path.join(self.root, name))
+            except OSError:
+                continue
+            found.append((st.st_mtime, name[:-4], st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+        with self._lock:
+            self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.png")
+
+    @staticmethod
+    def key(path: str) -> str | None:
+        # Cache key of the file at path as it is now, None if it can't be read
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        ident = f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}"
+        return hashlib.sha1(ident.encode(), usedforsecurity=False).hexdigest()
+
+    def _drop(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        while self._entries and self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def get(self, key: str) -> bytes | None:
+        # PNG data stored under key, None if there is none
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            os.utime(self._path(key))
+            return data
+        except OSError:
+            with self._lock:
+                if key in self._entries:
+                    self._drop(key)
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            # Readers never see a half written file
+            os.replace(tmp, self._path(key))
+        except OSError:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._bytes += len(data)
+            self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
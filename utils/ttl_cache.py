@@ -0,0 +1,51 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    # Thread-safe mapping whose entries expire ttl seconds after they were last set or read.
+    # Entries are kept in order of last use, so expired ones are always at the front and
+    # eviction costs O(1) amortised per operation. max_entries caps memory regardless of ttl.
+    # It's the RateLimiter's bucket store, and offers what that needs.
+    def __init__(self, ttl: float, max_entries: int = 100_000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now and len(self._data) <= self.max_entries:
+                break
+            del self._data[key]
+
+    def get(self, key, default=None):
+        with self._lock:
+            now = self._clock()
+            self._evict(now)
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._data[key] = (now + self.ttl, entry[1])
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            now = self._clock()
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            self._evict(now)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            self._evict(self._clock())
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(self._clock())
+            return len(self._data)
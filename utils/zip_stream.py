@@ -0,0 +1,83 @@
+import os
+import zipfile
+
+# Zip archives generated on the fly, chunk by chunk, without a seekable file behind them.
+# zipfile falls back to data descriptors when the target can't seek, so every chunk can go
+# out as soon as it's written. Formats that are compressed already are stored as-is,
+# deflating them again costs CPU for next to no gain.
+
+STORED_EXTENSIONS = {
+    # Movies, streaming segments
+    "mp4", "m4v", "mkv", "webm", "mov", "avi", "flv", "f4v", "wmv", "asf", "3gp", "3g2",
+    "ogv", "mpg", "mpeg", "vob", "ts", "m2ts", "mts", "mxf", "m4s",
+    # Audio
+    "mp3", "aac", "m4a", "ogg", "oga", "opus", "flac", "wma", "mka", "ac3", "amr",
+    # Images
+    "jpg", "jpeg", "png", "gif", "webp", "avif", "heic", "heif", "jxl",
+    # Documents and archives, zip containers themselves
+    "pdf", "docx", "pptx", "xlsx", "odt", "epub", "zip", "gz", "bz2", "xz", "7z", "rar",
+}
+
+
+class _ChunkWriter:
+    # Write-only, non-seekable sink collecting what zipfile writes until it's drained
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def compress_type_for(path: str) -> int:
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def archive_entries(source_path: str) -> list:
+    # (file path, name in archive) of everything under source_path.
+    # A directory keeps its own name as top folder, a single file sits at the root.
+    if not os.path.isdir(source_path):
+        return [(source_path, os.path.basename(source_path))]
+    base_dir = os.path.dirname(os.path.abspath(source_path))
+    entries = []
+    for root, dirs, files in os.walk(source_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            entries.append((path, os.path.relpath(os.path.abspath(path), base_dir)))
+    return entries
+
+
+def iter_zip(entries: list, chunk_size: int = 1024 * 1024):
+    # Yield a zip archive of entries [(path, arcname)] in pieces of roughly chunk_size
+    sink = _ChunkWriter()
+    with zipfile.ZipFile(sink, "w", allowZip64=True) as archive:
+        for path, arcname in entries:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compress_type_for(path)
+            with open(path, "rb") as src, archive.open(info, "w") as dest:
+                while True:
+                    block = src.read(chunk_size)
+                    if not block:
+                        break
+                    dest.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Central directory
+    data = sink.drain()
+    if data:
+        yield data
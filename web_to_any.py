@@ -1,9 +1,11 @@
 import os
 import re
+import json
+import hmac
+import hashlib
 import time
 import shutil
 import logging
-import tempfile
 import threading
 import webbrowser
 import secrets
@@ -11,49 +13,71 @@ import utils.language_support as lang
 
 from functools import wraps
 from utils.version import VERSION
+from utils.job_queue import JobQueue, QueueFullError
+from utils.process_runner import run_in_process, new_inbox
+from utils.zip_stream import archive_entries, iter_zip
+from utils.progress_store import MemoryProgressStore, open_progress_store
+from utils.rate_limit import RateLimiter
+from utils.result_cache import ResultCache, fingerprint
+from utils.metrics import MetricsRegistry, CONTENT_TYPE as METRICS_CONTENT_TYPE
 from core.controller import Controller
-from datetime import datetime, timedelta
 from flask_uploads import UploadSet, configure_uploads, ALL
-from flask import Flask, render_template, request, send_file, jsonify, abort, session
+from flask import (
+    Flask,
+    Blueprint,
+    Response,
+    current_app,
+    render_template,
+    request,
+    jsonify,
+    abort,
+    send_file,
+    session,
+)
 
 # Web server providing a web interface
 # Extension to the CLI-based any_to_any.py
-app = Flask(__name__, template_folder=os.path.abspath("templates"))
-app.secret_key = os.urandom(32)
-app.config["MAX_CONTENT_LENGTH"] = 16 * 1024**3  # 16 GiB effective upload limit, adjust as needed
+# Routes live on a blueprint, create_app() builds the Flask app around it. Several server
+# processes on one host can share job progress through a SQLite progress store, see
+# create_app().
+bp = Blueprint("any2any", __name__)
+logger = logging.getLogger(__name__)
+
+# CSRF tokens are stateless: issue time plus an HMAC over it and the client's session id,
+# keyed with the app secret. Nothing to store or evict, and every server process sharing the
+# secret accepts them. Tokens are good for a day.
+_CSRF_TTL = 24 * 3600
+
+
+def _csrf_session_id() -> str:
+    return session.sid if hasattr(session, 'sid') else request.remote_addr
 
-# Session cookie to be secure, SameSite policy against CSRF
-app.config["SESSION_COOKIE_SECURE"] = True
-app.config["SESSION_COOKIE_HTTPONLY"] = True
-app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 
-# CSRF token storage: {session_id: csrf_token}
-_csrf_tokens = {}
-_csrf_lock = threading.Lock()
+def _csrf_signature(session_id: str, issued: str) -> str:
+    key = current_app.secret_key
+    key = key.encode() if isinstance(key, str) else key
+    return hmac.new(key, f"{session_id}|{issued}".encode(), hashlib.sha256).hexdigest()
+
 
 def get_csrf_token():
-    session_id = session.sid if hasattr(session, 'sid') else request.remote_addr
-    with _csrf_lock:
-        if session_id in _csrf_tokens:
-            return _csrf_tokens[session_id]
-        token = secrets.token_hex(32)
-        _csrf_tokens[session_id] = token
-        return token
+    issued = format(int(time.time()), "x")
+    return f"{issued}.{_csrf_signature(_csrf_session_id(), issued)}"
 
 def validate_csrf_token(token):
-    session_id = session.sid if hasattr(session, 'sid') else request.remote_addr
-    with _csrf_lock:
-        stored_token = _csrf_tokens.get(session_id)
-        if stored_token and secrets.compare_digest(stored_token, token):
-            return True
-    return False
-
-@app.context_processor
+    issued, _, signature = token.partition(".")
+    try:
+        if time.time() - int(issued, 16) > _CSRF_TTL:
+            return False
+    except ValueError:
+        return False
+    return secrets.compare_digest(_csrf_signature(_csrf_session_id(), issued), signature)
+
+@bp.app_context_processor
 def inject_csrf_token():
     return {"csrf_token": get_csrf_token()}
 
 # Security headers
-@app.after_request
+@bp.after_app_request
 def headers(response):
     response.headers['X-Content-Type-Options'] = 'nosniff'
     response.headers['X-Frame-Options'] = 'DENY'
@@ -63,29 +87,32 @@ def headers(response):
 # Disable Flask's default access logging
 log = logging.getLogger("werkzeug")
 log.setLevel(logging.ERROR)
-app.logger.setLevel(logging.ERROR)
 
 host = "127.0.0.1"
 port = 5000
 
-# Rate limiting: {ip: [timestamps]}
-_rate_limit = {}
-def _rate_check(max_req: int=30, window: int=3600):
-    # Rate limit as max_req per window seconds per IP.
+# Rate limiting: token bucket per IP, one limiter per scope and limit
+_rate_limiters = {}
+def _rate_check(max_req: int=30, window: int=3600, scope: str="default"):
+    # Rate limit as max_req per window seconds per IP. Routes with the same scope and limit
+    # draw from the same bucket, give a route its own scope to count it apart.
+    limiter = _rate_limiters.setdefault((scope, max_req, window), RateLimiter(max_req, window))
     def decorator(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
             ip = request.remote_addr
-            now = datetime.now()
-            cutoff = now - timedelta(seconds=window)
-            _rate_limit[ip] = [t for t in _rate_limit.get(ip, []) if t > cutoff]
-            if len(_rate_limit[ip]) >= max_req:
-                abort(429)
-            _rate_limit[ip].append(now)
+            if not limiter.allow(ip):
+                response = jsonify({"error": "Too many requests"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(limiter.retry_after(ip))
+                return response
             return f(*args, **kwargs)
         return wrapper
     return decorator
 
+# Guards the progress dict a conversion process keeps for itself (see send_to_backend)
+progress_lock = threading.Lock()
+
 # Initialize a default controller for the app
 controller = None
 
@@ -93,6 +120,8 @@ controller = None
 # This function creates a new controller instance with the given job_id
 def create_controller(job_id: str = None, shared_progress_dict: dict = None) -> Controller:
     controller = Controller(job_id=job_id, shared_progress_dict=shared_progress_dict, is_web=True)
+    # One lock for everything writing to the job's progress entry in this process
+    controller.prog_logger.lock = progress_lock
     controller.web_flag = True
     controller.web_host = f"{'http' if host.lower() in ['127.0.0.1', 'localhost'] else 'https'}://{host}:{port}"
     return controller
@@ -101,87 +130,129 @@ def create_controller(job_id: str = None, shared_progress_dict: dict = None) ->
 # Create default controller for the app
 controller = create_controller()
 
-# Shared progress dictionary for job tracking
-shared_progress_dict = {}
-progress_lock = threading.Lock()
+# Job progress as seen by clients, replaced by create_app() according to its config
+progress_store = MemoryProgressStore()
 
-files = UploadSet("files", ALL)
-app.config["UPLOADED_FILES_DEST"] = "./uploads"
-app.config["CONVERTED_FILES_DEST"] = "./converted"
-configure_uploads(app, files)
-
-with app.app_context():
-    # Intended to help allocate memory early
-    _ = controller.supported_formats
-
-
-def push_zip(source_path: str):
-    # Create .zip file from source path, serve it for download.
-    # Source can be either a directory or a single file, doesn't matter.
-    # Create a temporary file for the zip
-    temp_fd, temp_path = tempfile.mkstemp(suffix=".zip")
-    os.close(temp_fd)
 
+def _env_int(name: str, default: int) -> int:
     try:
-        if os.path.isdir(source_path):
-            # If source is a directory, zip its contents
-            base_dir = os.path.dirname(source_path)
-            dir_name = os.path.basename(source_path)
+        return max(0, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
 
-            # Create the zip file with the directory's contents
-            shutil.make_archive(temp_path[:-4], "zip", base_dir, dir_name)
 
-            # Clean up the original directory
-            shutil.rmtree(source_path, ignore_errors=True)
+# Conversions run on a fixed pool of workers, further jobs wait in a bounded queue.
+# Any2Any_WEB_WORKERS: concurrent conversions, Any2Any_WEB_QUEUE: jobs allowed to wait.
+job_queue = JobQueue(
+    workers=_env_int("Any2Any_WEB_WORKERS", max(1, (os.cpu_count() or 2) // 2)),
+    max_pending=_env_int("Any2Any_WEB_QUEUE", 16),
+)
 
-            # Set the download name based on the directory name
-            download_name = f"any_to_any_-_{dir_name}.zip"
-        else:
-            # If source is a file, zip just that file
-            file_name = os.path.basename(source_path)
 
-            # Create a temporary directory to hold the file
-            temp_dir = tempfile.mkdtemp()
-            temp_file_path = os.path.join(temp_dir, file_name)
+def _queue_full_response(retry_after: int):
+    response = jsonify(
+        {"error": "Server busy, please retry later", "retry_after": retry_after}
+    )
+    response.status_code = 503
+    response.headers["Retry-After"] = str(retry_after)
+    return response
 
-            try:
-                # Move the file to the temp directory
-                shutil.move(source_path, temp_file_path)
+files = UploadSet("files", ALL)
 
-                # Create the zip file with the single file
-                shutil.make_archive(temp_path[:-4], "zip", temp_dir)
+# Recent results by fingerprint of their inputs, for repeat conversions of the same files.
+# Any2Any_RESULT_TTL: seconds a result stays reusable, Any2Any_RESULT_CACHE_MB: size cap.
+# Either set to 0 disables reuse. create_app() points it at the app's output location, where
+# each server process keeps its entries in a subdirectory of its own.
+result_cache = ResultCache(
+    root="./converted_cache",
+    ttl=_env_int("Any2Any_RESULT_TTL", 3600),
+    max_bytes=_env_int("Any2Any_RESULT_CACHE_MB", 2048) * 1024**2,
+)
 
-                # Set the download name based on the file name
-                download_name = f"any_to_any_-_{file_name}.zip"
-            finally:
-                # Clean up the temporary directory
-                shutil.rmtree(temp_dir, ignore_errors=True)
+# Prometheus metrics, served at /metrics. Queue and cache figures are read when scraped,
+# job figures are recorded as each job ends from what its progress entry says.
+metrics = MetricsRegistry()
+metrics.gauge(
+    "any2any_queue_pending_jobs",
+    "Jobs waiting for a worker",
+    fn=lambda: job_queue.stats()["pending"],
+)
+metrics.gauge(
+    "any2any_jobs_running", "Jobs being converted", fn=lambda: job_queue.stats()["running"]
+)
+metrics.gauge("any2any_workers", "Conversion workers", fn=lambda: job_queue.workers)
+metrics.gauge(
+    "any2any_worker_utilization_ratio",
+    "Share of workers currently busy",
+    fn=lambda: job_queue.stats()["running"] / job_queue.workers,
+)
+metrics.counter(
+    "any2any_worker_busy_seconds_total",
+    "Seconds workers spent running jobs",
+    fn=lambda: job_queue.stats()["busy_seconds"],
+)
+metrics_jobs = metrics.counter(
+    "any2any_jobs_total", "Finished jobs by target format and outcome", ("format", "status")
+)
+metrics_failures = metrics.counter(
+    "any2any_conversion_failures_total", "Failed conversions by target format", ("format",)
+)
+metrics_duration = metrics.histogram(
+    "any2any_job_duration_seconds",
+    "Conversion time of successful jobs by target format",
+    (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+    ("format",),
+)
+metrics_uploaded = metrics.counter("any2any_uploaded_bytes_total", "Bytes received as uploads")
+metrics_produced = metrics.counter(
+    "any2any_produced_bytes_total", "Bytes of conversion output produced"
+)
+metrics.counter(
+    "any2any_result_cache_hits_total",
+    "Jobs served from the result cache",
+    fn=lambda: result_cache.stats()["hits"],
+)
+metrics.counter(
+    "any2any_result_cache_misses_total",
+    "Jobs not found in the result cache",
+    fn=lambda: result_cache.stats()["misses"],
+)
+metrics.gauge(
+    "any2any_result_cache_entries",
+    "Results held for reuse",
+    fn=lambda: result_cache.stats()["entries"],
+)
+metrics.gauge(
+    "any2any_result_cache_bytes",
+    "Size of results held for reuse",
+    fn=lambda: result_cache.stats()["bytes"],
+)
 
-        # Send the file
-        response = send_file(
-            temp_path,
-            as_attachment=True,
-            download_name=download_name,
-            mimetype="application/zip",
-        )
 
-        # Clean up the temp file after sending
+def push_zip(source_path: str):
+    # Stream a .zip of source path as it's generated, no temp file, first bytes go out at once.
+    # Source can be either a directory or a single file, doesn't matter.
+    entries = archive_entries(source_path)
+    download_name = f"any_to_any_-_{os.path.basename(source_path)}.zip"
+
+    def generate():
         try:
-            response.call_on_close(
-                lambda: os.unlink(temp_path) if os.path.exists(temp_path) else None
-            )
+            yield from iter_zip(entries)
         except Exception as e:
-            app.logger.error(
-                f"Error setting up cleanup for temp file {temp_path}: {str(e)}"
-            )
-
-        return response
-    except Exception as e:
-        # Clean up temp file if it exists
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-        app.logger.error(f"Error in push_zip: {str(e)}")
-        raise
+            logger.error(f"Error in push_zip: {str(e)}")
+            raise
+        finally:
+            # Also on aborted downloads, like the archive files were before
+            if os.path.isdir(source_path):
+                shutil.rmtree(source_path, ignore_errors=True)
+            elif os.path.exists(source_path):
+                os.unlink(source_path)
+
+    response = Response(generate(), mimetype="application/zip")
+    response.headers.set("Content-Disposition", "attachment", filename=download_name)
+    # Keep proxies from buffering the whole archive before passing it on
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 def process_params() -> tuple:
@@ -190,23 +261,261 @@ def process_params() -> tuple:
     
     if not fmt or fmt not in controller.supported_formats:
         abort(400, "Invalid format")
+    # Files sent beforehand through the resumable upload routes
+    upload_id = request.form.get("upload_id")
+    if upload_id:
+        up_dir, digests = _take_upload(upload_id)
+        cv_dir = f"{current_app.config['CONVERTED_FILES_DEST']}_{upload_id}"
+        os.makedirs(cv_dir, exist_ok=True)
+        return fmt, up_dir, cv_dir, upload_id, digests
     if not uploaded_files or len(uploaded_files) > 50:
         abort(400, "No files or too many files")
     
     conv_key = os.urandom(4).hex()
-    up_dir = f"{app.config['UPLOADED_FILES_DEST']}_{conv_key}"
-    cv_dir = f"{app.config['CONVERTED_FILES_DEST']}_{conv_key}"
+    up_dir = f"{current_app.config['UPLOADED_FILES_DEST']}_{conv_key}"
+    cv_dir = f"{current_app.config['CONVERTED_FILES_DEST']}_{conv_key}"
     os.makedirs(up_dir, exist_ok=True)
     os.makedirs(cv_dir, exist_ok=True)
     
+    digests = {}
     for file in uploaded_files:
         if file and file.filename:
-            safe_name = re.sub(r'[^\w\.\-]', '_', file.filename)
-            file.save(os.path.join(up_dir, safe_name))
-    return fmt, up_dir, cv_dir, conv_key
+            name = _safe_name(file.filename)
+            digests[name] = _save_hashed(file.stream, os.path.join(up_dir, name))
+    return fmt, up_dir, cv_dir, conv_key, digests
+
+
+def _claim_params() -> tuple:
+    # process_params() for jobs started before their upload is complete
+    fmt = request.form.get("conversionType")
+    if not fmt or fmt not in controller.supported_formats:
+        abort(400, "Invalid format")
+    upload_id = request.form.get("upload_id") or ""
+    upload = _claim_upload(upload_id)
+    cv_dir = f"{current_app.config['CONVERTED_FILES_DEST']}_{upload_id}"
+    os.makedirs(cv_dir, exist_ok=True)
+    return fmt, upload, cv_dir, upload_id
+
 
+def _safe_name(filename: str) -> str:
+    return re.sub(r'[^\w\.\-]', '_', filename)
 
-@app.route("/")
+
+def _save_hashed(stream, path: str) -> str:
+    # Write stream to path, hashing it on the way (saves reading it back for dedup)
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        while True:
+            block = stream.read(_UPLOAD_BLOCK)
+            if not block:
+                break
+            digest.update(block)
+            f.write(block)
+    metrics_uploaded.inc(os.path.getsize(path))
+    return digest.hexdigest()
+
+
+def _check_csrf():
+    csrf_token = request.form.get("csrf_token") or request.headers.get("X-CSRF-Token")
+    # Validating the CSRF token for all state-changing requests
+    if not csrf_token or not validate_csrf_token(csrf_token):
+        abort(403, "Invalid CSRF token")
+
+
+# Resumable uploads, chunks go straight into the job's upload directory:
+# POST /upload announces the files, PATCH /upload/<id>/<name> appends a chunk at the offset
+# given in Upload-Offset, GET /upload/<id> tells where to resume. A file shows up under its
+# name only once its last chunk is in, until then it's <name>.part.
+# A convert job can claim an upload before it's complete (see _run_streaming_conversion), it
+# then gets each file as soon as it's in.
+# {upload_id: {"dir": str, "files": {name: size}, "hashes": {name: sha256}, "busy": set,
+#  "ready": [complete file names, in order], "job": claiming job id or None, "touched": float}}
+_uploads = {}
+_uploads_lock = threading.Lock()
+# Notified whenever a file of an upload completes
+_uploads_changed = threading.Condition(_uploads_lock)
+_UPLOAD_TTL = 24 * 3600  # Unfinished uploads are dropped after a day without chunks
+_STREAM_IDLE = 600  # A job waiting on an upload gives up after this long without chunks
+_UPLOAD_BLOCK = 1024 * 1024
+
+
+def _upload_offset(upload: dict, name: str) -> int:
+    path = os.path.join(upload["dir"], name)
+    if os.path.exists(path):
+        return upload["files"][name]
+    part = f"{path}.part"
+    return os.path.getsize(part) if os.path.exists(part) else 0
+
+
+def _upload_state(upload_id: str, upload: dict) -> dict:
+    files = [
+        {"name": name, "size": size, "offset": _upload_offset(upload, name)}
+        for name, size in upload["files"].items()
+    ]
+    return {
+        "upload_id": upload_id,
+        "files": files,
+        "complete": all(f["offset"] == f["size"] for f in files),
+    }
+
+
+def _purge_stale_uploads() -> None:
+    cutoff = time.time() - _UPLOAD_TTL
+    with _uploads_lock:
+        # Claimed uploads are cleaned up by their job
+        stale = [
+            k
+            for k, v in _uploads.items()
+            if v["touched"] < cutoff and not v["busy"] and not v["job"]
+        ]
+        dirs = [_uploads.pop(k)["dir"] for k in stale]
+    for up_dir in dirs:
+        shutil.rmtree(up_dir, ignore_errors=True)
+
+
+def _get_upload(upload_id: str) -> dict:
+    if not re.match(r'^[a-f0-9]{8}$', upload_id):
+        abort(400)
+    upload = _uploads.get(upload_id)
+    if upload is None:
+        abort(404, "Upload not found")
+    return upload
+
+
+def _take_upload(upload_id: str) -> tuple:
+    # Hand a completely uploaded set of files over to a job.
+    # Returns its upload directory and {file name: content hash}.
+    with _uploads_lock:
+        upload = _get_upload(upload_id)
+        if upload["job"]:
+            abort(409, "Upload already claimed by a job")
+        if upload["busy"] or not _upload_state(upload_id, upload)["complete"]:
+            abort(409, "Upload incomplete")
+        del _uploads[upload_id]
+    return upload["dir"], {k: v.hexdigest() for k, v in upload["hashes"].items()}
+
+
+def _claim_upload(upload_id: str) -> dict:
+    # Hand a possibly still incomplete upload over to a job, it stays open for chunks
+    with _uploads_lock:
+        upload = _get_upload(upload_id)
+        if upload["job"]:
+            abort(409, "Upload already claimed by a job")
+        upload["job"] = upload_id
+    return upload
+
+
+@bp.route("/upload", methods=["POST"])
+# Counted apart from /convert, a chunked upload is followed by a conversion request
+@_rate_check(max_req=30, window=3600, scope="upload")
+def create_upload():
+    _check_csrf()
+    # Nothing could take the job, no use in accepting its uploads
+    if not job_queue.has_capacity():
+        return _queue_full_response(job_queue.retry_after())
+    _start_reaper()
+
+    announced = (request.get_json(silent=True) or {}).get("files") or []
+    if not announced or len(announced) > 50:
+        abort(400, "No files or too many files")
+    files = {}
+    for entry in announced:
+        try:
+            name, size = _safe_name(str(entry["name"])), int(entry["size"])
+        except (KeyError, TypeError, ValueError):
+            abort(400, "Invalid file entry")
+        if name in files or name in ("", ".", "..") or name.endswith(".part"):
+            abort(400, "Invalid or duplicate file name")
+        if size < 0 or size > current_app.config["MAX_CONTENT_LENGTH"]:
+            abort(413)
+        files[name] = size
+
+    upload_id = os.urandom(4).hex()
+    up_dir = f"{current_app.config['UPLOADED_FILES_DEST']}_{upload_id}"
+    os.makedirs(up_dir, exist_ok=True)
+    ready = []
+    for name, size in files.items():
+        if size == 0:
+            open(os.path.join(up_dir, name), "wb").close()
+            ready.append(name)
+    upload = {
+        "dir": up_dir,
+        "files": files,
+        "hashes": {name: hashlib.sha256() for name in files},
+        "busy": set(),
+        "ready": ready,
+        "job": None,
+        "touched": time.time(),
+    }
+    with _uploads_lock:
+        _uploads[upload_id] = upload
+        state = _upload_state(upload_id, upload)
+    return jsonify(state), 201
+
+
+@bp.route("/upload/<upload_id>", methods=["GET"])
+def upload_status(upload_id: str):
+    with _uploads_lock:
+        return jsonify(_upload_state(upload_id, _get_upload(upload_id)))
+
+
+@bp.route("/upload/<upload_id>/<name>", methods=["PATCH"])
+def upload_chunk(upload_id: str, name: str):
+    _check_csrf()
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        abort(400, "Missing Upload-Offset")
+    with _uploads_lock:
+        upload = _get_upload(upload_id)
+        if name not in upload["files"]:
+            abort(404, "Unknown file")
+        if name in upload["busy"]:
+            abort(409, "Chunk already in progress")
+        current = _upload_offset(upload, name)
+        if offset != current:
+            # Client's view is off (e.g. a chunk got lost in transit), tell it where to go on
+            response = jsonify({"error": "Offset mismatch", "offset": current})
+            response.status_code = 409
+            response.headers["Upload-Offset"] = str(current)
+            return response
+        upload["busy"].add(name)
+        upload["touched"] = time.time()
+
+    size = upload["files"][name]
+    path = os.path.join(upload["dir"], name)
+    try:
+        length = request.content_length
+        if length is None or offset + length > size:
+            abort(400, "Chunk exceeds announced file size")
+        # Stream the body to disk, what arrived before a dropped connection is kept
+        with open(f"{path}.part", "ab") as part:
+            remaining = length
+            while remaining:
+                block = request.stream.read(min(_UPLOAD_BLOCK, remaining))
+                if not block:
+                    break
+                part.write(block)
+                upload["hashes"][name].update(block)
+                remaining -= len(block)
+        metrics_uploaded.inc(os.path.getsize(f"{path}.part") - current)
+        offset = os.path.getsize(f"{path}.part")
+        if offset == size:
+            os.replace(f"{path}.part", path)
+    finally:
+        with _uploads_changed:
+            upload["busy"].discard(name)
+            upload["touched"] = time.time()
+            if offset == size and os.path.exists(path) and name not in upload["ready"]:
+                upload["ready"].append(name)
+                _uploads_changed.notify_all()
+
+    response = jsonify({"name": name, "offset": offset, "complete": offset == size})
+    response.headers["Upload-Offset"] = str(offset)
+    return response
+
+
+@bp.route("/")
 def index():
     # Retrieve language from session (from browser), default to 'en_US'
     lang_code = session.get("language", "en_US")
@@ -230,6 +539,24 @@ def index():
     )
 
 
+def _track_outputs(controller_instance: Controller, job_id: str, shared_dict: dict, output: str):
+    # List each output in the job's progress as soon as it's finished, it can be downloaded
+    # right away
+    out_root = os.path.abspath(output)
+
+    def _record_output(path: str) -> None:
+        name = os.path.relpath(path, out_root).replace(os.sep, "/")
+        if name.startswith("../"):
+            return
+        with progress_lock:
+            entry = shared_dict.get(job_id)
+            if entry is not None and name not in entry.get("outputs", []):
+                # A new list, the publisher compares against the last sent copy
+                entry["outputs"] = entry.get("outputs", []) + [name]
+
+    controller_instance.file_handler.on_output = _record_output
+
+
 def send_to_backend(
     controller_instance: Controller,
     input_path_args: list,
@@ -261,8 +588,12 @@ def send_to_backend(
                     "error": None,
                     "started_at": time.time(),
                     "last_updated": time.time(),
+                    "outputs": [],
                 }
 
+        if job_id and shared_dict is not None and output:
+            _track_outputs(controller_instance, job_id, shared_dict, output)
+
         controller_instance.run(
             input_path_args=input_path_args,
             format=format,
@@ -321,53 +652,364 @@ def send_to_backend(
             shutil.rmtree(input_path_args[0], ignore_errors=True)
 
 
+def _conversion_job(
+    job_id: str,
+    progress_dict: dict,
+    input_path_args: list,
+    format: str,
+    output: str,
+    merge: bool,
+    concat: bool,
+):
+    # Entry point inside the worker process, progress_dict is that process' own
+    send_to_backend(
+        create_controller(job_id=job_id, shared_progress_dict=progress_dict),
+        input_path_args,
+        format,
+        output,
+        0,
+        "high",
+        None,
+        merge,
+        concat,
+    )
+
+
+def _streaming_conversion_job(
+    job_id: str,
+    progress_dict: dict,
+    inbox,
+    total_files: int,
+    format: str,
+    output: str,
+):
+    # Entry point inside the worker process for jobs whose files are still uploading:
+    # converts each file the parent puts into inbox as it comes, None ends the job.
+    # Progress is the ProgLogger's alone: its batches add up across the runs, weighted by
+    # file and over total_files. A file that fails is listed under failed_files, the rest
+    # still get converted.
+    controller_instance = create_controller(job_id=job_id, shared_progress_dict=progress_dict)
+    with progress_lock:
+        progress_dict[job_id] = {
+            "progress": 0,
+            "total": 100,
+            "progress_percent": 0,
+            "weighted": True,
+            "total_files": total_files,
+            "completed_files": 0,
+            "status": "processing",
+            "error": None,
+            "started_at": time.time(),
+            "last_updated": time.time(),
+            "outputs": [],
+            "failed_files": [],
+        }
+    _track_outputs(controller_instance, job_id, progress_dict, output)
+
+    converted = 0
+    while True:
+        path = inbox.get()
+        if path is None:
+            break
+        try:
+            controller_instance.run(
+                input_path_args=[path],
+                format=format,
+                output=output,
+                framerate=0,
+                quality="high",
+                split=None,
+                merge=False,
+                concat=False,
+                delete=True,
+                across=False,
+                recursive=False,
+                dropzone=False,
+                language="en_US",
+                workers=1,
+            )
+            converted += 1
+        except Exception as e:
+            logger.error(f"Error converting '{os.path.basename(path)}': {str(e)}")
+            with progress_lock:
+                entry = progress_dict[job_id]
+                entry["failed_files"] = entry["failed_files"] + [
+                    {"name": os.path.basename(path), "error": str(e)}
+                ]
+                entry["last_updated"] = time.time()
+
+    with progress_lock:
+        entry = progress_dict[job_id]
+        failed = entry["failed_files"]
+        entry.update(
+            {
+                "progress": 100,
+                "total": 100,
+                "progress_percent": 100,
+                "status": "done" if converted or not failed else "error",
+                "error": failed[-1]["error"] if failed and not converted else None,
+                "completed_at": time.time(),
+                "last_updated": time.time(),
+            }
+        )
+
+
+def _feed_upload(upload_id: str, upload: dict, inbox, stop: threading.Event) -> bool:
+    # Put each file of the upload into inbox once it's completely in, then None.
+    # Returns whether all files made it.
+    handed = 0
+    total = len(upload["files"])
+    while handed < total:
+        with _uploads_changed:
+            _uploads_changed.wait_for(
+                lambda: len(upload["ready"]) > handed or stop.is_set(),
+                timeout=_REAP_INTERVAL,
+            )
+            ready = upload["ready"][handed:]
+            stalled = (
+                not upload["busy"] and time.time() - upload["touched"] > _STREAM_IDLE
+            )
+        for name in ready:
+            inbox.put(os.path.join(upload["dir"], name))
+            handed += 1
+        if not ready and (stop.is_set() or stalled or _uploads.get(upload_id) is not upload):
+            break
+    inbox.put(None)
+    return handed == total
+
+
+def _stop_feeding(stop: threading.Event) -> None:
+    with _uploads_changed:
+        stop.set()
+        _uploads_changed.notify_all()
+
+
+def _run_streaming_conversion(
+    job_id: str,
+    upload: dict,
+    format: str,
+    cv_dir: str,
+):
+    # Like _run_conversion, but the upload may still be going on: files are converted in
+    # upload order as they complete, so uploading and converting overlap
+    progress_store.update(job_id, {"queue_position": 0})
+    _publish_queue_positions()
+    started = time.time()
+    inbox = new_inbox()
+    stop = threading.Event()
+    fed = {}
+    feeder = threading.Thread(
+        target=lambda: fed.setdefault("complete", _feed_upload(job_id, upload, inbox, stop)),
+        name=f"any2any-feed-{job_id}",
+        daemon=True,
+    )
+    feeder.start()
+    try:
+        run_in_process(
+            job_id,
+            _streaming_conversion_job,
+            (inbox, len(upload["files"]), format, cv_dir),
+            lambda snapshot: progress_store.update(job_id, snapshot),
+        )
+        progress_store.update(job_id, {"queue_position": None})
+        # The job may have failed before taking all files
+        _stop_feeding(stop)
+        feeder.join()
+        entry = progress_store.get(job_id) or {}
+        if entry.get("status") == "done" and not fed.get("complete"):
+            entry = {
+                "status": "error",
+                "error": "Upload was not completed",
+                "completed_at": time.time(),
+                "last_updated": time.time(),
+            }
+            progress_store.update(job_id, entry)
+        _record_job_metrics(entry, format, cv_dir, started)
+        # Results with files missing aren't worth reusing
+        if entry.get("status") == "done" and not entry.get("failed_files"):
+            digests = {k: v.hexdigest() for k, v in upload["hashes"].items()}
+            result_cache.store(fingerprint(digests, format, "convert"), cv_dir)
+    finally:
+        _stop_feeding(stop)
+        with _uploads_lock:
+            if _uploads.get(job_id) is upload:
+                del _uploads[job_id]
+        # Nobody reads the inbox anymore, don't hold exiting up on it
+        inbox.cancel_join_thread()
+        shutil.rmtree(upload["dir"], ignore_errors=True)
+
+
+def _run_conversion(
+    job_id: str,
+    up_dir: str,
+    format: str,
+    cv_dir: str,
+    merge: bool,
+    concat: bool,
+    result_key: str = None,
+):
+    # Conversions run in a process of their own: moviepy/numpy work doesn't hold the
+    # server's GIL and a crashing conversion only takes its own process down
+    progress_store.update(job_id, {"queue_position": 0})
+    # A job leaving the queue moves everyone behind it up
+    _publish_queue_positions()
+    started = time.time()
+    try:
+        run_in_process(
+            job_id,
+            _conversion_job,
+            ([up_dir], format, cv_dir, merge, concat),
+            lambda snapshot: progress_store.update(job_id, snapshot),
+        )
+        progress_store.update(job_id, {"queue_position": None})
+        entry = progress_store.get(job_id) or {}
+        _record_job_metrics(entry, format, cv_dir, started)
+        if entry.get("status") == "done" and result_key:
+            result_cache.store(result_key, cv_dir)
+    finally:
+        # The worker cleans up after itself, unless it died before it could
+        shutil.rmtree(up_dir, ignore_errors=True)
+
+
+def _run_job(run, job_id: str, *args) -> None:
+    # A job failing outside its conversion process (e.g. the process didn't start, or the
+    # progress store couldn't be written) still ends, so polling and streaming clients stop
+    try:
+        run(job_id, *args)
+    except Exception as e:
+        try:
+            entry = progress_store.get(job_id) or {}
+            if entry.get("status") not in ("done", "error"):
+                progress_store.update(
+                    job_id,
+                    {
+                        "status": "error",
+                        "error": str(e),
+                        "queue_position": None,
+                        "completed_at": time.time(),
+                        "last_updated": time.time(),
+                    },
+                )
+        except Exception as store_error:
+            logger.error(f"Error recording failure of job {job_id}: {str(store_error)}")
+        raise
+
+
+def _publish_queue_positions() -> None:
+    # Queue positions go into the progress entries, any server process can report them
+    for position, pending_id in enumerate(job_queue.pending_ids(), 1):
+        progress_store.update(pending_id, {"queue_position": position})
+
+
+def _record_job_metrics(entry: dict, format: str, cv_dir: str, started: float) -> None:
+    status = entry.get("status") or "error"
+    metrics_jobs.inc(format=format, status=status)
+    if status != "done":
+        metrics_failures.inc(format=format)
+        return
+    # Timestamps the worker recorded, queueing and process start-up left out
+    duration = entry.get("completed_at", time.time()) - entry.get("started_at", started)
+    metrics_duration.observe(max(0.0, duration), format=format)
+    metrics_produced.inc(
+        sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(cv_dir)
+            for name in names
+        )
+    )
+
+
 def create_conversion_endpoint(merge: bool=False, concat: bool=False):
     @_rate_check(max_req=30, window=3600)
     def endpoint():
-        csrf_token = request.form.get("csrf_token") or request.headers.get("X-CSRF-Token")
-        # Validating the CSRF token for all POST requests
-        if not csrf_token or not validate_csrf_token(csrf_token):
-            abort(403, "Invalid CSRF token")
-        
-        fmt, up_dir, cv_dir, job_id = process_params()
-        # New controller instance for this job
-        job_controller = create_controller(
-            job_id=job_id, shared_progress_dict=shared_progress_dict
-        )
-        # Start conversion in background thread
-        thread = threading.Thread(
-            target=send_to_backend,
-            args=(
-                job_controller,
-                [up_dir],
-                fmt,
-                cv_dir,
-                0,
-                "high",
-                None,
-                merge,
-                concat,
-            ),
+        _check_csrf()
+
+        # Turn jobs away before accepting their uploads if nothing could take them
+        if not job_queue.has_capacity():
+            return _queue_full_response(job_queue.retry_after())
+
+        if request.form.get("stream") == "1" and not merge and not concat:
+            # Files are still on their way, convert each one as it completes
+            fmt, upload, cv_dir, job_id = _claim_params()
+            _start_reaper()
+            job = (_run_job, _run_streaming_conversion, job_id, upload, fmt, cv_dir)
+
+            def release():
+                # Leave the upload to be retried with
+                with _uploads_lock:
+                    upload["job"] = None
+        else:
+            fmt, up_dir, cv_dir, job_id, digests = process_params()
+            _start_reaper()
+            mode = "merge" if merge else "concat" if concat else "convert"
+            result_key = fingerprint(digests, fmt, mode) if digests else None
+            if result_key and result_cache.lookup(result_key, cv_dir):
+                # Same files, same target, converted a moment ago: serve that result
+                shutil.rmtree(up_dir, ignore_errors=True)
+                return _cached_job(job_id, fmt, cv_dir)
+            job = (_run_job, _run_conversion, job_id, up_dir, fmt, cv_dir, merge, concat, result_key)
+
+            def release():
+                shutil.rmtree(up_dir, ignore_errors=True)
+
+        progress_store.set(
+            job_id,
+            {
+                "progress": 0,
+                "total": 100,
+                "status": "queued",
+                "error": None,
+                "progress_percent": 0,
+                "last_updated": time.time(),
+            },
         )
-        thread.start()
+        try:
+            position = job_queue.submit(job_id, *job)
+        except QueueFullError as e:
+            # Lost the race for the last slot, drop this job's files again
+            progress_store.delete(job_id)
+            release()
+            shutil.rmtree(cv_dir, ignore_errors=True)
+            return _queue_full_response(e.retry_after)
+        _publish_queue_positions()
         # Return job_id so frontend can poll progress
-        return jsonify({"job_id": job_id}), 202
+        return jsonify({"job_id": job_id, "queue_position": position}), 202
     return endpoint
 
 
-app.add_url_rule(
+def _cached_job(job_id: str, fmt: str, cv_dir: str):
+    now = time.time()
+    metrics_jobs.inc(format=fmt, status="cached")
+    progress_store.set(
+        job_id,
+        {
+            "progress": 100,
+            "total": 100,
+            "status": "done",
+            "error": None,
+            "progress_percent": 100,
+            "cached": True,
+            "outputs": _list_outputs(cv_dir),
+            "completed_at": now,
+            "last_updated": now,
+        },
+    )
+    return jsonify({"job_id": job_id, "queue_position": None, "cached": True}), 202
+
+
+bp.add_url_rule(
     "/convert",
     "convert",
     create_conversion_endpoint(merge=False, concat=False),
     methods=["POST"],
 )
-app.add_url_rule(
+bp.add_url_rule(
     "/merge",
     "merge",
     create_conversion_endpoint(merge=True, concat=False),
     methods=["POST"],
 )
-app.add_url_rule(
+bp.add_url_rule(
     "/concat",
     "concat",
     create_conversion_endpoint(merge=False, concat=True),
@@ -375,37 +1017,80 @@ app.add_url_rule(
 )
 
 
-_last_progress_cache = {} # Tracks the last prog value per job_id for prog estimation
+_JOB_TTL = 300  # Seconds finished jobs stay queryable
+_REAP_INTERVAL = 60
+_reaper = None
+_reaper_lock = threading.Lock()
 
-@app.route("/progress/<job_id>", methods=["GET"])
-def get_progress(job_id: str):
-    if not re.match(r'^[a-f0-9]{8}$', job_id):
-        return jsonify({"error": "Invalid job ID"}), 400
-    
-    with progress_lock:
-        prog = shared_progress_dict.get(
-            job_id,
-            {
-                "progress": 0,
-                "total": 100,
-                "status": "waiting",
-                "error": None,
-                "progress_percent": 0,
-            },
-        )
 
-        total_n_files = prog.get("total_files", 1)
-        current_prog = prog.get("progress", 0)
-        last_prog = _last_progress_cache.get(job_id, 0)
-        
+# Single outputs served directly, kept for range requests until idle: base path -> job id
+_served_outputs = {}
+_served_lock = threading.Lock()
+
+
+def _reap_jobs(now: float = None) -> None:
+    # Forget jobs that finished more than _JOB_TTL seconds ago
+    now = time.time() if now is None else now
+    progress_store.reap(now - _JOB_TTL)
+
+
+def _reap_loop() -> None:
+    while True:
+        time.sleep(_REAP_INTERVAL)
+        try:
+            _reap_jobs()
+            _reap_served_outputs()
+            _purge_stale_uploads()
+            result_cache.purge()
+        except Exception as e:
+            logger.error(f"Error reaping jobs: {str(e)}")
+
+
+def _start_reaper() -> None:
+    # Lazily, so worker processes importing this module don't run one each
+    global _reaper
+    with _reaper_lock:
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap_loop, name="any2any-reaper", daemon=True)
+            _reaper.start()
+
+
+def _progress_payload(job_id: str) -> dict:
+    # Client view of a job's progress
+    prog = progress_store.get(job_id)
+    known = prog is not None
+    if not known:
+        prog = {
+            "progress": 0,
+            "total": 100,
+            "status": "waiting",
+            "error": None,
+            "progress_percent": 0,
+        }
+
+    total_n_files = prog.get("total_files", 1)
+    current_prog = prog.get("progress", 0)
+    # Last prog value seen, kept with the job for prog estimation
+    last_prog = prog.get("last_seen_progress", 0)
+    
+    if prog.get("weighted"):
+        # The job weighs its files by expected work itself, see ProgLogger.start_batch
+        completed_files = prog.get("completed_files", 0)
+        progress_percent = prog.get("progress_percent", 0)
+        cumulative_prog = current_prog = progress_percent * total_n_files
+    else:
+        # Guess from the bar starting over when a file is done
         if current_prog < last_prog and last_prog > 0:
             completed_files = prog.get("completed_files", 0) + 1
-            prog["completed_files"] = completed_files
+            if known:
+                progress_store.update(
+                    job_id, {"completed_files": completed_files, "last_seen_progress": current_prog}
+                )
         else:
             completed_files = prog.get("completed_files", 0)
-        
-        _last_progress_cache[job_id] = current_prog
-        
+            if known and current_prog != last_prog:
+                progress_store.update(job_id, {"last_seen_progress": current_prog})
+
         if total_n_files > 1 and completed_files > 0:
             cumulative_prog = completed_files * 100 + current_prog
             progress_percent = int((cumulative_prog / (total_n_files * 100)) * 100)
@@ -416,63 +1101,174 @@ def get_progress(job_id: str):
             progress_percent = int((current_prog / prog.get("total", 100)) * 100) if prog.get("total", 0) > 0 else 0
             cumulative_prog = current_prog
 
-        current_time = time.time()
-        for jid in list(shared_progress_dict.keys()):
-            job = shared_progress_dict[jid]
-            if (
-                job.get("status") in ["done", "error"]
-                and (current_time - job.get("completed_at", 0)) > 300
-            ):
-                del shared_progress_dict[jid]
-                _last_progress_cache.pop(jid, None)
-
-        return jsonify({
-            "progress": cumulative_prog if total_n_files > 1 else current_prog,
-            "total": total_n_files * 100,
-            "status": prog.get("status", "waiting"),
-            "error": prog.get("error"),
-            "progress_percent": progress_percent,
-            "total_files": total_n_files,
-            "completed_files": completed_files,
-        })
-
-
-@app.route("/download/<job_id>", methods=["GET"])
+    return {
+        "progress": cumulative_prog if total_n_files > 1 else current_prog,
+        "total": total_n_files * 100,
+        "status": prog.get("status", "waiting"),
+        "error": prog.get("error"),
+        "progress_percent": progress_percent,
+        "total_files": total_n_files,
+        "completed_files": completed_files,
+        "current_bar": prog.get("current_bar"),
+        "eta_seconds": prog.get("eta_seconds"),
+        "time_remaining": prog.get("time_remaining"),
+        "queue_position": prog.get("queue_position"),
+        "outputs": [
+            {"name": name, "url": f"/download/{job_id}/{name}"}
+            for name in prog.get("outputs", [])
+        ],
+        "failed_files": prog.get("failed_files", []),
+    }
+
+
+@bp.route("/progress/<job_id>", methods=["GET"])
+def get_progress(job_id: str):
+    if not re.match(r'^[a-f0-9]{8}$', job_id):
+        return jsonify({"error": "Invalid job ID"}), 400
+    return jsonify(_progress_payload(job_id))
+
+
+_SSE_KEEPALIVE = 15
+
+
+@bp.route("/progress/<job_id>/stream", methods=["GET"])
+def stream_progress(job_id: str):
+    # Server-Sent Events: a full progress event first, then only the fields that changed,
+    # each time the job's progress entry changes. Ends once the job is done or failed.
+    if not re.match(r'^[a-f0-9]{8}$', job_id):
+        return jsonify({"error": "Invalid job ID"}), 400
+
+    def generate():
+        last = {}
+        version = progress_store.version(job_id)
+        while True:
+            payload = _progress_payload(job_id)
+            delta = {k: v for k, v in payload.items() if last.get(k, object()) != v}
+            if delta:
+                yield f"data: {json.dumps(delta)}\n\n"
+                last = payload
+            if job_id not in progress_store or payload["status"] in ("done", "error"):
+                return
+            changed = progress_store.wait(job_id, version, _SSE_KEEPALIVE)
+            if changed == version:
+                # Keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+            version = changed
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@bp.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype=METRICS_CONTENT_TYPE)
+
+
+@bp.route("/stats", methods=["GET"])
+def stats():
+    # Queue and result reuse figures, for sizing workers and the result cache
+    return jsonify({"queue": job_queue.stats(), "result_cache": result_cache.stats()})
+
+
+@bp.route("/download/<job_id>", methods=["GET"])
 def download_zip(job_id: str):
     # Validate job_id (prevent path traversal)
     if not re.match(r'^[a-f0-9]{8}$', job_id):
         abort(400)
     
-    base_path = f"{app.config['CONVERTED_FILES_DEST']}_{job_id}"
+    base_path = f"{current_app.config['CONVERTED_FILES_DEST']}_{job_id}"
     if not os.path.exists(base_path):
         abort(404, "Output not found")
 
     # If it's a directory, check if it has any content
+    outputs = []
     if os.path.isdir(base_path):
-        # Check for any files or directories
-        has_content = False
-        for _, dirs, files in os.walk(base_path):
-            if files or dirs:
-                has_content = True
+        for root, _, files in os.walk(base_path):
+            outputs.extend(os.path.join(root, name) for name in files)
+            if len(outputs) > 1:
                 break
 
-        if not has_content:
+        if not outputs:
             abort(404, "No converted files found in output directory")
+    else:
+        outputs = [base_path]
 
-    # If it's a single file, handle it directly
-    if os.path.isfile(base_path):
-        try:
-            # For single files, we'll zip just that file
-            return push_zip(base_path)
-        except Exception as e:
-            app.logger.error(f"Error processing single file: {str(e)}")
-            abort(500, f"Error processing file: {str(e)}")
+    # A single output goes out as is: no zip pass, and Range/ETag let players seek in it
+    # and browsers resume it. It stays around for that until the reaper drops it.
+    if len(outputs) == 1:
+        return _send_single(job_id, base_path, outputs[0])
 
-    # For directories, use the directory as the source
     return push_zip(base_path)
 
 
-@app.route("/language", methods=["POST"])
+@bp.route("/download/<job_id>/<path:name>", methods=["GET"])
+def download_file(job_id: str, name: str):
+    # One output of a job, available as soon as the progress lists it
+    if not re.match(r'^[a-f0-9]{8}$', job_id):
+        abort(400)
+
+    base_path = os.path.abspath(f"{current_app.config['CONVERTED_FILES_DEST']}_{job_id}")
+    path = os.path.abspath(os.path.join(base_path, name))
+    if os.path.commonpath([base_path, path]) != base_path or path == base_path:
+        abort(400)
+    if not os.path.isfile(path):
+        abort(404, "Output not found")
+    return _send_single(job_id, base_path, path)
+
+
+def _list_outputs(base_path: str) -> list:
+    # Output names relative to the job's directory, as the progress lists them
+    return sorted(
+        os.path.relpath(os.path.join(root, name), base_path).replace(os.sep, "/")
+        for root, _, files in os.walk(base_path)
+        for name in files
+    )
+
+
+def _send_single(job_id: str, base_path: str, path: str):
+    try:
+        # Last access, shared by every process serving from this directory
+        os.utime(base_path)
+        with _served_lock:
+            _served_outputs[base_path] = job_id
+        return send_file(
+            os.path.abspath(path),
+            as_attachment=True,
+            download_name=os.path.basename(path),
+            conditional=True,
+            etag=True,
+            max_age=0,
+        )
+    except OSError as e:
+        current_app.logger.error(f"Error processing single file: {str(e)}")
+        abort(500, f"Error processing file: {str(e)}")
+
+
+def _reap_served_outputs(now: float = None) -> None:
+    # Drop single outputs nobody has asked for in _JOB_TTL seconds. Outputs of a job still
+    # running stay, it keeps writing to that directory and its other files are yet to be fetched.
+    now = time.time() if now is None else now
+    with _served_lock:
+        for base_path, job_id in list(_served_outputs.items()):
+            try:
+                idle = now - os.path.getmtime(base_path) > _JOB_TTL
+            except OSError:
+                _served_outputs.pop(base_path, None)
+                continue
+            entry = progress_store.get(job_id)
+            if entry is not None and entry.get("status") not in ("done", "error"):
+                continue
+            if idle:
+                if os.path.isdir(base_path):
+                    shutil.rmtree(base_path, ignore_errors=True)
+                else:
+                    os.unlink(base_path)
+                _served_outputs.pop(base_path, None)
+
+
+@bp.route("/language", methods=["POST"])
 def set_language():
     # Web interface language is set via the browser, *not* via sys language
     # This POST helps retrieve client's language info
@@ -490,6 +1286,41 @@ def set_language():
     return {"success": False}, 400
 
 
+def create_app(config: dict = None) -> Flask:
+    # Build the web app, config overrides the defaults set here. PROGRESS_STORE picks where job
+    # progress lives: "memory" for a single server process, "sqlite:///path/progress.db" to
+    # run several on one host, e.g. `gunicorn -w 4 "web_to_any:create_app()"` with
+    # Any2Any_PROGRESS_STORE and Any2Any_SECRET_KEY set alike for all of them.
+    global progress_store
+    app = Flask(__name__, template_folder=os.path.abspath("templates"))
+    app.secret_key = os.environ.get("Any2Any_SECRET_KEY") or os.urandom(32)
+    app.config["MAX_CONTENT_LENGTH"] = 16 * 1024**3  # 16 GiB effective upload limit, adjust as needed
+
+    # Session cookie to be secure, SameSite policy against CSRF
+    app.config["SESSION_COOKIE_SECURE"] = True
+    app.config["SESSION_COOKIE_HTTPONLY"] = True
+    app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
+
+    app.config["UPLOADED_FILES_DEST"] = "./uploads"
+    app.config["CONVERTED_FILES_DEST"] = "./converted"
+    app.config["PROGRESS_STORE"] = os.environ.get("Any2Any_PROGRESS_STORE", "memory")
+    app.config.update(config or {})
+    app.logger.setLevel(logging.ERROR)
+
+    configure_uploads(app, files)
+    app.register_blueprint(bp)
+    progress_store = open_progress_store(app.config["PROGRESS_STORE"])
+    result_cache.root = f"{app.config['CONVERTED_FILES_DEST']}_cache"
+
+    with app.app_context():
+        # Intended to help allocate memory early
+        _ = controller.supported_formats
+    return app
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
     webbrowser.open(controller.web_host)
     app.run(debug=False, host=host, port=port)